@@ -1,27 +1,35 @@
 import argparse
+import asyncio
 import logging
-import socket
-import json
-from typing import Tuple
-import requests
-import time
-import traceback
 import os
 
 import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
 
 from nerf_turret_utils.logging_utils import map_log_level
-from nerf_turret_utils.image_utils import get_frame_box_dimensions_delta
-from nerf_turret_utils.number_utils import map_range
-from ai_controller_utils import assert_in_int_range, slow_start_fast_end_smoothing, get_priority_target_index, get_elevation_speed, get_elevation_clockwise
+from nerf_turret_utils.socket_utils import format_address
+from nerf_turret_utils.target_codec import ENCODINGS
+from ai_controller_utils import assert_in_int_range
+from command_channel import COMMAND_CHANNELS, create_command_channel
+from controller import STOP_STATE, AIController
 
 
 parser = argparse.ArgumentParser("AI Controller for the Nerf Turret")
 parser.add_argument("--ws-port", help="Set the web socket server port to recieve messages from.", default=6565, type=int)
-parser.add_argument("--ws-host", help="Set the web socket server hostname to recieve messages from.", default="localhost")
+parser.add_argument("--ws-host", help="Set the web socket server hostname to recieve messages from, or a unix:///path/to.sock address to listen on a Unix domain socket.", default="localhost")
 parser.add_argument("--port", help="Set the web server server port to send commands too.", default=5565, type=int)
-parser.add_argument("--host", help="Set the web server server hostname. to send commands too", default="localhost")
+parser.add_argument("--host", help="Set the web server server hostname. to send commands too, or the unix:///path/to.sock address of the serial driver.", default="localhost")
+parser.add_argument("--command-channel", "-cc", help="How to send the commands to the serial driver: a new HTTP connection per command, a persistent HTTP connection or the 2 byte commands over a persistent stream.", choices=COMMAND_CHANNELS, default='keep-alive')
+parser.add_argument("--binary-port", "-bp", help="Set the port of the binary command stream of the serial driver, see its --binary-port.", default=5566, type=int)
+parser.add_argument("--binary-host", "-bh", help="Set the hostname of the binary command stream of the serial driver, or its unix:///path/to.sock address.", default="localhost")
+parser.add_argument("--max-command-rate", "-mcr", help="The maximum amount of commands per second sent to the serial driver, 0 for no limit. Repeated commands are always dropped and stops are always sent right away. The 9600 baud link to the Arduino holds 480 at most.", default=30, type=float)
+parser.add_argument("--control-rate", "-cr", help="Send controller states at this fixed rate per second, spreading the azimuth turn of each frame over the states until the next frame. 0 to send one state per frame. Keep --max-command-rate at least as high, as held back states are merged into larger turns.", default=0, type=float)
+parser.add_argument("--stale-timeout", "-st", help="The targets are stale when no frame arrived for this many seconds: the tracks of --predict and the ranked selection are dropped, and with --control-rate the elevation and firing stop. Keep it above the --heartbeat of the camera vision.", default=1.5, type=float)
+parser.add_argument("--heartbeat", "-hb", help="The --heartbeat of the camera vision, the longest it sends no message for with --publish-on-change.", default=1, type=float)
+parser.add_argument("--bus", help="Subscribe to the camera vision on the local message bus at this Unix socket path instead of accepting its TCP connection.", default=None, type=str)
+parser.add_argument("--bus-topic", help="The message bus topic to subscribe to.", default="targets", type=str)
+parser.add_argument("--camera-timeout", "-ct", help="Stop the turret when no message arrived from the camera vision for this many seconds. 0 to never stop.", default=3, type=float)
+parser.add_argument("--encodings", help="The message encodings to accept when the camera vision offers them on connect.", nargs='+', choices=ENCODINGS, default=ENCODINGS)
 parser.add_argument("--log-level", "-ll" , help="Set the logging level by integer value or string representation.", default=logging.WARNING, type=map_log_level)
 parser.add_argument("--azimuth-dp", help="Set how many decimal places the azimuth is taken too.", default=2, type=int)
 parser.add_argument("--elevation-dp", help="Set how many decimal places the elevation is taken too.", default=0, type=int)
@@ -37,12 +45,21 @@ parser.add_argument("--max-elevation-speed", "-mes",
                     default=10, 
                     type=lambda x: assert_in_int_range(int(x), 1, 10), ) # type: ignore
 
+parser.add_argument("--control-law", "-cl", help="How to compute the azimuth and elevation from the offset of the target: the proportional mapping tuned with --x-speed, --x-smoothing and --y-speed, or a PID controller per axis.", choices=['proportional', 'pid'], default='proportional')
+parser.add_argument("--azimuth-pid", "-apid", help="The kp, ki and kd gains of the azimuth PID controller, see pid_tuner.py.", nargs=3, type=float, default=[0.1, 0.05, 0.005])
+parser.add_argument("--elevation-pid", "-epid", help="The kp, ki and kd gains of the elevation PID controller, see pid_tuner.py.", nargs=3, type=float, default=[3.0, 0.0, 0.1])
+parser.add_argument("--predict", "-pr", help="Track how the targets move and aim and fire where they will be once the turret executes the command.", action='store_true', default=False)
+parser.add_argument("--actuation-delay", "-ad", help="The amount of seconds from sending a command until the turret executed it, added to the age of the frame to aim ahead of moving targets with --predict.", default=0.05, type=float)
+
 parser.add_argument("--benchmark", "-b",help="Wether to measure the script performance and output in the logs.", action='store_true', default=False)
 
 
 parser.add_argument('--targets', nargs='+', type=lambda x: str(x.lower().replace(" ", "_")), 
                     help='List of target ids to track. This will only be valid if a target type of "person" is selected', default=[])
 
+parser.add_argument("--target-selection", "-tsel", help="How to choose the target: the first match of --targets or --target-type, or the best by priority, distance from the crosshair, size and track age, keeping the lock on it.", choices=['first', 'ranked'], default='first')
+parser.add_argument("--switch-margin", "-sm", help="How much higher another target has to score than the locked one to take the lock with --target-selection ranked. A target scores up to 2.", default=0.25, type=float)
+
 parser.add_argument('--search',  action='store_true', help='If this flag is set the gun will try to find targets if there are none currently in sight', default=False)
 
 parser.add_argument("--target-padding", "-p",help="""
@@ -75,217 +92,39 @@ parser.add_argument('--target-type', '-ty', type=lambda x: str(x.lower()), defau
 #                     """ )
 
 
-args = parser.parse_args()
-
-
-
-if args.target_type != 'face' and len(args.targets) > 0 :
-    raise argparse.ArgumentTypeError(
-        f'You can only track specific targets if the target type is set to \'face\', but it is set to \'{args.target_type}\'')
-
-
-logging.basicConfig(level=args.log_level)
-
-logging.debug(f"\nArgs: {args}\n")
+if __name__ == '__main__':
 
-TARGET_PADDING_PERCENTAGE = args.target_padding/100
-TARGET_PADDING_PERCENTAGE = args.target_padding/100
-WS_HOST = args.ws_host  # IP address of the server
-WS_PORT = args.ws_port  # Port number to listen on
+    args = parser.parse_args()
 
 
-url = f"http://{args.host}:{args.port}"
+    if args.target_type != 'face' and len(args.targets) > 0 :
+        raise argparse.ArgumentTypeError(
+            f'You can only track specific targets if the target type is set to \'face\', but it is set to \'{args.target_type}\'')
 
-logging.info(f'{"Mocking" if args.test else "" } Forwarding controller values to host at {url}')
 
-if args.targets:
-    logging.info(f'Tracking targets with ids: {args.targets}')
+    logging.basicConfig(level=args.log_level)
 
-# Cache the controller state to prevent sending the same values over and over again
-cached_controller_state ={
-    'azimuth_angle': 0, # The angle of the gun in the horizontal plane adjustment
-    'is_clockwise': False,
-    'speed': 0,
-    'is_firing': False,
-} 
+    if args.control_rate and args.max_command_rate and args.control_rate > args.max_command_rate:
+        logging.warning(f"The control rate of {args.control_rate} is higher than the maximum command rate of {args.max_command_rate}, held back states are merged into larger azimuth turns")
+    if args.stale_timeout <= args.heartbeat:
+        logging.warning(f"The stale timeout of {args.stale_timeout}s is not longer than the heartbeat of {args.heartbeat}s, with --publish-on-change the turret stops and loses the tracks of still targets")
 
-already_sent_no_targets=False # Flag to prevent sending the same message over and over again
-connection = None
+    logging.debug(f"\nArgs: {args}\n")
 
-search = {
-    'clockwise': True,
-    'heading': 0,
-}
-    
-def try_to_bind_to_socket():
-    """Try to bind to the socket and accept the connection"""
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    global connection
-    logging.info(f"Binding to host {WS_HOST, WS_PORT}")
-    sock.bind((WS_HOST, WS_PORT))
-    sock.listen()
-    connection, addr = sock.accept()
-    logging.info(f'Connected by {addr}')
+    logging.info(f'{"Mocking" if args.test else "" } Forwarding controller values to host at {format_address(args.host, args.port)}')
 
+    if args.targets:
+        logging.info(f'Tracking targets with ids: {args.targets}')
 
-start_time=None
+    command_channel = create_command_channel(args.command_channel, args.host, args.port, args.binary_host, args.binary_port)
+    controller = AIController(args, post=None if args.test else command_channel.send)
 
-
-
-
-while True:
-    time.sleep(args.delay)
-    if args.benchmark:
-        start_time = time.time()
     try:
-        if not connection:
-            try_to_bind_to_socket()
-        
-        else:
-    
-            data = connection.recv(1024)  # Receive data from the client
-            if not data:
-                continue
-            
-            json_data = None
-            try:
-                json_data = json.loads(data.decode('utf-8'))
-            except json.JSONDecodeError as e:
-                logging.error(f"Error decoding JSON: {e}")
-                continue
-            
-            # Check if there are any targets in the frame
-            if len(json_data['targets']) > 0:
-                logging.debug('Data obtained:' + json.dumps(data.decode('utf-8')))
-                already_sent_no_targets=False 
-                center_x, center_y =  json_data['heading_vect']
-                target_index = get_priority_target_index(json_data['targets'], args.target_type, args.targets)
-                
-                if target_index is None:
-                    logging.debug(f'No valid target found from type {args.target_type} with ids {args.targets}')
-                    # If no valid target was found, then just move onto the next frame
-                    continue
-                
-                target = json_data['targets'][target_index] # Extract the first target from the targets list
-                
-                logging.debug('Targeting:' + json.dumps(target))
-
-                left, top, right, bottom = target['box']
-                
-                # calculate box coordinates
-                box_center_x = (left + right) / 2
-                box_center_y = (top + bottom) / 2
-                box_width = right - left
-                box_height = bottom - top
-                
-                view_width = json_data['view_dimensions'][0]
-                view_height = json_data['view_dimensions'][1]
-
-                # Get movement vector to align gun with center of target
-                movement_vector = get_frame_box_dimensions_delta(left, top, right, bottom, view_width, view_height)
-                
-                # Add padding as a percentage of the original dimensions
-                padding_width = box_width * TARGET_PADDING_PERCENTAGE
-                padding_height = box_height * TARGET_PADDING_PERCENTAGE
-
-                # Calculate box coordinates
-                padded_left = left + padding_width
-                padded_right = right - padding_width
-                padded_top = top + padding_height
-                padded_bottom = bottom - padding_height
-                    
-                is_on_target = False  
-                if padded_top <= center_y <= padded_bottom and padded_left <= center_x <= padded_right:
-                    is_on_target=True
-                
-                current_distance_from_the_middle = movement_vector[0]
-                max_distance_from_the_middle_left = -(view_width / 2)
-                max_distance_from_the_middle_right = view_width / 2
-            
-                predicted_azimuth_angle = map_range(
-                    current_distance_from_the_middle - args.accuracy_threshold_x,
-                    max_distance_from_the_middle_left, 
-                    max_distance_from_the_middle_right ,
-                    -args.max_azimuth_angle ,
-                    args.max_azimuth_angle
-                )
-                azimuth_speed_adjusted = min(predicted_azimuth_angle , args.x_speed)
-                smoothed_speed_adjusted_azimuth = slow_start_fast_end_smoothing(azimuth_speed_adjusted, float(args.x_smoothing) + 1.0, 90)
-                azimuth_formatted = round(smoothed_speed_adjusted_azimuth, args.azimuth_dp)
-
-                
-                controller_state = cached_controller_state = {
-                    'azimuth_angle': azimuth_formatted,
-                    'is_clockwise': get_elevation_clockwise(movement_vector),
-                    'speed': get_elevation_speed(args, view_height, movement_vector, target['box']),
-                    'is_firing': is_on_target,
-                }
-                
-                logging.debug("Sending controller state: " + json.dumps(controller_state))
-                
-                if not args.test:
-                    try:
-                        requests.post(url, json=controller_state)       
-                    except:
-                        logging.error("Failed to send controller state to server.")
-
-            else:
-                if args.search:
-                   
-                    requests.post(url, json={
-                        **cached_controller_state,
-                        'azimuth_angle': 1 if search["clockwise"] else -1,
-                        'speed': 0,
-                        'is_firing': False,
-                    }) 
-                      
-                    if search['heading'] > 180:
-                        search['heading'] = 0
-                        search["clockwise"] = not search["clockwise"]
-                    else:
-                        search['heading'] += 1                  
-                        
-                    
-                elif not already_sent_no_targets and not args.test:
-                    ## No targets detected, so stop the gun but hold its current position
-                    requests.post(url, json={
-                        **cached_controller_state,
-                        'speed': 0,
-                        'is_firing': False,
-                    })      
-                    already_sent_no_targets=True 
-    
+        asyncio.run(controller.run())
     except KeyboardInterrupt as e:
-        requests.post(url, json={
-            'azimuth_angle': 0,
-            'speed': 0,
-            'is_firing': False,
-        }) 
         logging.debug("Sending request to stop turret ")
-        raise e 
-    except BrokenPipeError as e:
-        logging.error("Socket pipe broken. Retrying in 5 seconds...")
-        sock = None
-        time.sleep(5)
-        pass 
-    except ConnectionResetError as e:
-        logging.error("Socket connection lost. Retrying in 5 seconds...")
-        sock = None
-        time.sleep(5)
-        pass
-    except ConnectionRefusedError as e:
-        logging.error("Socket connection refused. Retrying in 5 seconds...")
-        sock = None
-        time.sleep(5)
-        pass
-    except Exception as e:
-        logging.error("An unknown error occurred: " + str(e) + ". Retrying in 5 seconds...") 
-        traceback.print_exc()
-        sock = None
-        time.sleep(5)
-        pass
+        if not args.test:
+            command_channel.send(STOP_STATE)
+        raise e
     finally:
-        if start_time and  args.benchmark:
-            logging.debug("Frame processed in " + str(time.time() - start_time) + " seconds")
-        pass
-    
+        command_channel.close()
@@ -117,7 +117,27 @@ def get_elevation_speed(args: Any, view_height:int, movement_vector:Tuple, targe
     # TODO: implement a smoothing function to smooth out the speed
     # smooth_elevation_speed_adjusted = min(0,slow_start_fast_end_smoothing(elevation_speed_adjusted, float(args.y_smoothing) + 1.0, 10))                
     final_speed = round(elevation_speed_adjusted / 2 , args.elevation_dp)
-    return int(final_speed)
+    return max(int(final_speed), 0) # Within the accuracy threshold the speed would be negative, which the serial driver rejects
+
+
+def apply_deadband(value: float, threshold: float) -> float:
+    """
+    Ignores the part of an error within a threshold of zero, so the turret rests once it is accurate enough.
+
+    Args:
+        value: The error, e.g. the movement vector component in pixels.
+        threshold: The amount of the error to ignore on either side of zero.
+
+    Returns:
+        0 within the threshold, otherwise the value moved towards zero by the threshold.
+
+    Example:
+        >>> apply_deadband(-50, 30)
+        -20
+    """
+    if abs(value) <= threshold:
+        return 0
+    return value - threshold if value > 0 else value + threshold
 
 
 def get_elevation_clockwise(movement_vector: Tuple[float, float]) -> bool:
@@ -133,4 +153,23 @@ def get_elevation_clockwise(movement_vector: Tuple[float, float]) -> bool:
     """
 
     is_clockwise = movement_vector[1] < 0
-    return is_clockwise
\ No newline at end of file
+    return is_clockwise
+
+FRAME_DETAIL_KEYS = ('frame_id', 'capture_time', 'publish_time')
+
+
+def get_frame_details(message: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Gets the frame id and timestamps of a camera vision message, to pass them on with the controller state.
+
+    Args:
+        message: The message from the camera vision.
+
+    Returns:
+        A dictionary with the 'frame_id', 'capture_time' and 'publish_time' the message has.
+
+    Example:
+        >>> get_frame_details({'frame_id': 7, 'capture_time': 1.5, 'targets': []})
+        {'frame_id': 7, 'capture_time': 1.5}
+    """
+    return {key: message[key] for key in FRAME_DETAIL_KEYS if key in message}
@@ -1,8 +1,8 @@
 import pytest
-from argparse import ArgumentTypeError
+from argparse import ArgumentTypeError, Namespace
 import logging
 from ai_controller_utils \
-    import assert_in_int_range, slow_start_fast_end_smoothing, map_range
+    import assert_in_int_range, slow_start_fast_end_smoothing, map_range, get_frame_details, apply_deadband, get_elevation_speed
 
 
 
@@ -90,3 +90,22 @@ def test_map_range():
 
     # Test case where input_value is larger than max_input
     assert map_range(105, 0, 100, 0, 1) == pytest.approx(1.05, 1e-5)
+
+
+def test_get_frame_details():
+    message = {'frame_id': 7, 'capture_time': 1.5, 'publish_time': 1.6, 'targets': [], 'heading_vect': [1, 2]}
+    assert get_frame_details(message) == {'frame_id': 7, 'capture_time': 1.5, 'publish_time': 1.6}
+
+def test_get_frame_details_of_old_message():
+    assert get_frame_details({'targets': []}) == {}
+
+
+@pytest.mark.parametrize('value, expected', [(0, 0), (30, 0), (-30, 0), (50, 20), (-50, -20)])
+def test_apply_deadband(value, expected):
+    assert apply_deadband(value, 30) == expected
+
+
+def test_get_elevation_speed_is_never_negative():
+    args = Namespace(accuracy_threshold_y=30, max_elevation_speed=10, y_speed=2, elevation_dp=0)
+    assert get_elevation_speed(args, 480, (0, 10), [270, 140, 370, 340]) == 0
+    assert get_elevation_speed(args, 480, (0, -150), [270, 140, 370, 340]) == 5
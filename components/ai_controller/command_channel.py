@@ -0,0 +1,195 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+import http.client
+import json
+import logging
+import socket
+import time
+from typing import Optional
+from nerf_turret_utils.socket_utils import create_connection, create_http_connection
+from nerf_turret_utils.motor_command import encode
+
+
+COMMAND_CHANNELS = ['http', 'keep-alive', 'binary']
+
+## The elevation stepper motor speed ordinal values the serial driver accepts
+SLOWEST_SPEED = 0
+FASTEST_SPEED = 10
+
+## The errors of a kept alive connection the serial driver closed before it read the command
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+
+def encode_controller_state(controller_state: dict) -> bytes:
+    """
+    Encodes a controller state as the 2 byte command the serial driver writes to the Arduino.
+
+    Args:
+        controller_state: The controller state with the 'azimuth_angle', 'is_clockwise', 'speed' and 'is_firing'.
+
+    Returns:
+        The 2 byte command.
+
+    Raises:
+        ValueError: If the speed is outside the range the serial driver accepts, as the command only has 4 bits for it.
+    """
+    speed = round(controller_state.get('speed', 0))
+    if speed < SLOWEST_SPEED or speed > FASTEST_SPEED:
+        raise ValueError(f"Received a speed that was outside the min({SLOWEST_SPEED}) max({FASTEST_SPEED}) bounds: {speed}")
+    return encode(
+        round(controller_state.get('azimuth_angle', 0)),
+        bool(controller_state.get('is_clockwise', False)),
+        speed,
+        bool(controller_state['is_firing']),
+    )
+
+
+class HTTPCommandChannel:
+    """Posts the controller states to the serial driver as JSON.
+
+    With `keep_alive` a single connection is kept open for all the commands, which saves connecting
+    and the TCP handshake on every command. A connection the serial driver closed in the meantime is
+    replaced once per command. The command is only sent again when the closed connection could not
+    have delivered it, never after a timeout, as the serial driver may have written it to the Arduino
+    already and the Arduino adds up the azimuth angles.
+    """
+
+    def __init__(self, host: str, port: int, keep_alive: bool = True, timeout: Optional[float] = 1) -> None:
+        """
+        Args:
+            host: The hostname or `unix://` socket path of the serial driver.
+            port: The TCP port of the serial driver, ignored for Unix domain sockets.
+            keep_alive: Whether to reuse the connection between the commands.
+            timeout: The maximum amount of seconds to wait for the serial driver.
+        """
+        self.host = host
+        self.port = port
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self._connection: Optional[http.client.HTTPConnection] = None
+
+
+    def send(self, controller_state: dict) -> None:
+        """
+        Sends a controller state and waits for the serial driver to answer.
+
+        Args:
+            controller_state: The controller state to send.
+
+        Raises:
+            ConnectionError: If the serial driver did not accept the controller state.
+            socket.timeout: If the serial driver did not answer in time.
+        """
+        body = json.dumps({**controller_state, 'controller_time': time.time()})
+        is_reused = self._connection is not None
+        try:
+            status, reason = self._post(body)
+        except (http.client.HTTPException, OSError) as e:
+            self.close()
+            if not is_reused or not isinstance(e, STALE_CONNECTION_ERRORS):
+                raise
+            # The serial driver closed the idle connection, e.g. because it restarted
+            status, reason = self._post(body)
+        finally:
+            if not self.keep_alive:
+                self.close()
+        if status != 200:
+            raise ConnectionError(f"The serial driver answered {status} {reason}")
+
+
+    def _post(self, body: str):
+        if self._connection is None:
+            self._connection = create_http_connection(self.host, self.port, timeout=self.timeout)
+        self._connection.request('POST', '/', body=body, headers={'Content-Type': 'application/json'})
+        response = self._connection.getresponse()
+        response.read()
+        if response.will_close:
+            self.close()
+        return response.status, response.reason
+
+
+    def close(self) -> None:
+        """Closes the connection, the next command opens a new one"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class BinaryCommandChannel:
+    """Streams the controller states to the serial driver as the 2 byte commands of the Arduino.
+
+    The commands skip the JSON and HTTP handling on both ends and the serial driver does not answer
+    them. The frame ids and timestamps are not sent, so `GET /status` of the serial driver can not
+    report the age of the frames. The serial driver must be started with `--binary-port`.
+    """
+
+    def __init__(self, host: str, port: int) -> None:
+        """
+        Args:
+            host: The hostname or `unix://` socket path of the binary command stream of the serial driver.
+            port: The TCP port of the binary command stream, ignored for Unix domain sockets.
+        """
+        self.host = host
+        self.port = port
+        self._connection: Optional[socket.socket] = None
+
+
+    def send(self, controller_state: dict) -> None:
+        """
+        Sends a controller state.
+
+        Args:
+            controller_state: The controller state to send.
+
+        Raises:
+            ValueError: If the speed is outside the range of the serial driver.
+        """
+        command = encode_controller_state(controller_state)
+        is_reused = self._connection is not None
+        try:
+            self._send(command)
+        except OSError:
+            self.close()
+            if not is_reused:
+                raise
+            self._send(command)
+
+
+    def _send(self, command: bytes) -> None:
+        if self._connection is None:
+            self._connection = create_connection(self.host, self.port)
+            if self._connection.family != socket.AF_UNIX:
+                self._connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1) # Send every command right away
+        self._connection.sendall(command)
+
+
+    def close(self) -> None:
+        """Closes the connection, the next command opens a new one"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def create_command_channel(kind: str, host: str, port: int, binary_host: str, binary_port: int):
+    """
+    Creates the channel the AI controller sends its controller states to the serial driver with.
+
+    Args:
+        kind: 'http' for a new HTTP connection per command, 'keep-alive' for a persistent HTTP connection or 'binary' for the 2 byte command stream.
+        host: The hostname or `unix://` socket path of the serial driver HTTP server.
+        port: The TCP port of the serial driver HTTP server.
+        binary_host: The hostname or `unix://` socket path of the serial driver binary command stream.
+        binary_port: The TCP port of the serial driver binary command stream.
+
+    Returns:
+        The channel, with a `send(controller_state)` and a `close()` method.
+    """
+    if kind not in COMMAND_CHANNELS:
+        raise ValueError(f"Unknown command channel '{kind}', expected one of {COMMAND_CHANNELS}")
+    logging.info(f"Sending the controller states over the {kind} command channel")
+    if kind == 'binary':
+        return BinaryCommandChannel(binary_host, binary_port)
+    return HTTPCommandChannel(host, port, keep_alive=kind == 'keep-alive')
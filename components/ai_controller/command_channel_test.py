@@ -0,0 +1,102 @@
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+import pytest
+from command_channel import BinaryCommandChannel, HTTPCommandChannel, create_command_channel, encode_controller_state
+from nerf_turret_utils.socket_utils import create_http_server, create_server_socket
+from nerf_turret_utils.motor_command import decode
+
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    """Records the posted states and the client port they came from"""
+
+    protocol_version = 'HTTP/1.1'
+    posted: list = []
+    delay = 0.0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('content-length', 0)))
+        self.posted.append((self.client_address[1], json.loads(body)))
+        time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    RecordingHandler.posted = []
+    RecordingHandler.delay = 0.0
+    server = create_http_server('localhost', 0, RecordingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+STATE = {'azimuth_angle': 12.4, 'is_clockwise': True, 'speed': 3, 'is_firing': False, 'frame_id': 5}
+
+
+def test_encode_controller_state():
+    assert decode(encode_controller_state(STATE)) == {'azimuth': 12, 'is_clockwise': True, 'speed': 3, 'is_firing': False}
+
+def test_encode_rejects_speeds_the_command_can_not_hold():
+    with pytest.raises(ValueError):
+        encode_controller_state({**STATE, 'speed': -1})
+
+
+@pytest.mark.parametrize('keep_alive', [True, False])
+def test_http_channel_reuses_the_connection_with_keep_alive(http_server, keep_alive):
+    channel = HTTPCommandChannel('localhost', http_server.server_address[1], keep_alive=keep_alive)
+    for _ in range(3):
+        channel.send(STATE)
+    channel.close()
+
+    client_ports = {port for port, _ in RecordingHandler.posted}
+    assert len(RecordingHandler.posted) == 3
+    assert len(client_ports) == (1 if keep_alive else 3)
+    assert RecordingHandler.posted[0][1]['frame_id'] == 5
+    assert 'controller_time' in RecordingHandler.posted[0][1]
+
+def test_http_channel_reconnects_after_the_server_closed_the_connection(http_server):
+    channel = HTTPCommandChannel('localhost', http_server.server_address[1])
+    channel.send(STATE)
+    channel._connection.sock.shutdown(socket.SHUT_RDWR) # type: ignore
+    channel.send(STATE)
+    assert len(RecordingHandler.posted) == 2
+
+
+def test_http_channel_does_not_send_again_after_a_timeout(http_server):
+    channel = HTTPCommandChannel('localhost', http_server.server_address[1], timeout=0.2)
+    channel.send(STATE)
+    RecordingHandler.delay = 0.5 # The serial driver got the command but answers too late
+    with pytest.raises(socket.timeout):
+        channel.send(STATE)
+    time.sleep(0.5)
+    assert len(RecordingHandler.posted) == 2
+    assert channel._connection is None
+
+def test_binary_channel_streams_2_byte_commands():
+    server = create_server_socket('localhost', 0)
+    channel = create_command_channel('binary', 'localhost', 0, 'localhost', server.getsockname()[1])
+    assert isinstance(channel, BinaryCommandChannel)
+    channel.send(STATE)
+    channel.send({**STATE, 'is_firing': True})
+
+    connection, _ = server.accept()
+    connection.settimeout(2)
+    data = b''
+    while len(data) < 4:
+        data += connection.recv(4)
+    channel.close()
+    connection.close()
+    server.close()
+
+    assert data[:2] == encode_controller_state(STATE)
+    assert decode(data[2:])['is_firing']
@@ -0,0 +1,162 @@
+import math
+import time
+from typing import Optional, Tuple
+
+
+## A 2 byte command takes about 2ms on the 9600 baud link to the Arduino (10 bits per byte with the start and stop bits)
+LINK_CAPACITY = 9600 / 10 / 2
+## The largest azimuth angle one 2 byte command holds
+MAX_AZIMUTH_ANGLE = 90
+
+
+def get_command_values(controller_state: dict) -> Tuple[int, bool, int, bool]:
+    """
+    Gets the values of a controller state that reach the Arduino, as the serial driver rounds the angle and speed.
+
+    Args:
+        controller_state: The controller state.
+
+    Returns:
+        The rounded azimuth angle, whether the elevation turns clockwise, the rounded speed and whether the gun is firing.
+    """
+    return (
+        round(controller_state.get('azimuth_angle', 0)),
+        bool(controller_state.get('is_clockwise', False)),
+        round(controller_state.get('speed', 0)),
+        bool(controller_state.get('is_firing', False)),
+    )
+
+
+def is_repeat(previous: dict, current: dict) -> bool:
+    """
+    Checks whether sending a controller state again would change nothing on the Arduino.
+
+    The Arduino adds the azimuth angle of every command to the servo position, so only a repeated
+    command that does not turn the azimuth can be dropped.
+
+    Args:
+        previous: The last controller state that was sent.
+        current: The controller state to send.
+
+    Returns:
+        True if the state can be dropped.
+    """
+    values = get_command_values(current)
+    return values[0] == 0 and values == get_command_values(previous)
+
+
+def merge_states(held: dict, newer: dict) -> dict:
+    """
+    Merges a controller state that was not sent into the newer state that replaces it.
+
+    The Arduino adds up the azimuth angles of the commands, so the newer state turns by the angles of
+    both. The rest of the held state is outdated.
+
+    Args:
+        held: The controller state that was not sent.
+        newer: The controller state that replaces it.
+
+    Returns:
+        The newer state with the azimuth angles of both.
+    """
+    return {**newer, 'azimuth_angle': held.get('azimuth_angle', 0) + newer.get('azimuth_angle', 0)}
+
+
+def split_azimuth(controller_state: dict) -> Tuple[dict, Optional[dict]]:
+    """
+    Splits a controller state that turns the azimuth further than one command holds, e.g. after merging.
+
+    Args:
+        controller_state: The controller state.
+
+    Returns:
+        The controller state turning by at most `MAX_AZIMUTH_ANGLE`, and the same state with the rest of the angle or None if there is no rest.
+    """
+    azimuth_angle = controller_state.get('azimuth_angle', 0)
+    if abs(azimuth_angle) <= MAX_AZIMUTH_ANGLE:
+        return controller_state, None
+    sent_angle = math.copysign(MAX_AZIMUTH_ANGLE, azimuth_angle)
+    return {**controller_state, 'azimuth_angle': sent_angle}, {**controller_state, 'azimuth_angle': azimuth_angle - sent_angle}
+
+
+def is_safety_critical(previous: Optional[dict], current: dict) -> bool:
+    """
+    Checks whether a controller state stops the gun from firing or the elevation from moving.
+
+    Args:
+        previous: The last controller state that was sent, or None if none was sent yet.
+        current: The controller state to send.
+
+    Returns:
+        True if the state has to be sent right away.
+    """
+    if previous is None:
+        return True
+    _, _, previous_speed, previous_is_firing = get_command_values(previous)
+    _, _, speed, is_firing = get_command_values(current)
+    return (previous_is_firing and not is_firing) or (previous_speed != 0 and speed == 0)
+
+
+class CommandLimiter:
+    """Keeps the AI controller from flooding the serial link to the Arduino with commands.
+
+    A command that would not change anything on the Arduino compared to the last acknowledged command
+    is dropped, which never applies to commands that turn the azimuth as the Arduino adds up their
+    angles. The other commands are held back to at most `max_rate` per second, so the rapid changes
+    in between are coalesced into the newest one, see `merge_states`. Commands that stop the firing or
+    the elevation are never held back.
+    """
+
+    def __init__(self, max_rate: float = 30) -> None:
+        """
+        Args:
+            max_rate: The maximum amount of commands per second, 0 for no limit. The 9600 baud link holds `LINK_CAPACITY` at most.
+        """
+        self.min_interval = 1 / max_rate if max_rate else 0
+        self.sent_count = 0
+        self.dropped_count = 0
+        self.flushed_count = 0
+        self._last_state: Optional[dict] = None
+        self._last_time = float('-inf')
+
+
+    def get_delay(self, controller_state: dict, now: Optional[float] = None) -> Optional[float]:
+        """
+        Decides when a controller state may be sent.
+
+        Args:
+            controller_state: The newest controller state.
+            now: The current time in seconds, `time.monotonic()` if not given.
+
+        Returns:
+            None if the state repeats the last acknowledged one and should be dropped, otherwise the amount of seconds to wait before sending it, 0 to send it right away.
+        """
+        now = time.monotonic() if now is None else now
+        if self._last_state is not None and is_repeat(self._last_state, controller_state):
+            self.dropped_count += 1
+            return None
+        delay = self._last_time + self.min_interval - now
+        if delay <= 0:
+            return 0
+        if is_safety_critical(self._last_state, controller_state):
+            self.flushed_count += 1
+            return 0
+        return delay
+
+
+    def acknowledge(self, controller_state: dict, now: Optional[float] = None) -> None:
+        """
+        Records a controller state the serial driver accepted.
+
+        Args:
+            controller_state: The controller state that was sent.
+            now: The time in seconds it was sent, `time.monotonic()` if not given.
+        """
+        self._last_state = controller_state
+        self._last_time = time.monotonic() if now is None else now
+        self.sent_count += 1
+
+
+    def summary(self) -> str:
+        """Describes how many commands were sent, dropped as repeats and flushed early"""
+        return f"Sent {self.sent_count} commands, dropped {self.dropped_count} repeats and flushed {self.flushed_count} stops early"
@@ -0,0 +1,66 @@
+import pytest
+from command_limiter import CommandLimiter, get_command_values, is_repeat, is_safety_critical, merge_states, split_azimuth
+
+
+MOVING = {'azimuth_angle': 0.2, 'is_clockwise': True, 'speed': 4, 'is_firing': False}
+FIRING = {**MOVING, 'is_firing': True}
+STOPPED = {**MOVING, 'speed': 0}
+
+
+def test_command_values_are_rounded_like_the_serial_driver():
+    assert get_command_values(MOVING) == (0, True, 4, False)
+    assert get_command_values({**MOVING, 'azimuth_angle': -0.3, 'frame_id': 3}) == get_command_values(MOVING)
+
+def test_only_repeats_without_azimuth_turns_are_dropped():
+    assert is_repeat(MOVING, {**MOVING, 'frame_id': 2})
+    assert not is_repeat(MOVING, FIRING)
+    # Every command turns the servo by its azimuth angle again
+    turning = {**MOVING, 'azimuth_angle': 3}
+    assert not is_repeat(turning, turning)
+
+def test_merged_states_keep_both_turns():
+    merged = merge_states({**MOVING, 'azimuth_angle': 10, 'frame_id': 1}, {**FIRING, 'azimuth_angle': -3, 'frame_id': 2})
+    assert merged == {**FIRING, 'azimuth_angle': 7, 'frame_id': 2}
+
+def test_splits_turns_one_command_can_not_hold():
+    assert split_azimuth({**MOVING, 'azimuth_angle': 60}) == ({**MOVING, 'azimuth_angle': 60}, None)
+    sent, rest = split_azimuth({**MOVING, 'azimuth_angle': -130})
+    assert (sent['azimuth_angle'], rest['azimuth_angle']) == (-90, -40) # type: ignore
+    assert rest['speed'] == MOVING['speed'] # type: ignore
+
+def test_safety_critical_changes():
+    assert is_safety_critical(None, MOVING)
+    assert is_safety_critical(FIRING, MOVING)
+    assert is_safety_critical(MOVING, STOPPED)
+    assert not is_safety_critical(MOVING, FIRING)
+    assert not is_safety_critical(STOPPED, MOVING)
+
+
+def test_drops_repeats_of_the_acknowledged_command():
+    limiter = CommandLimiter(max_rate=0)
+    assert limiter.get_delay(MOVING, now=0) == 0
+    limiter.acknowledge(MOVING, now=0)
+    assert limiter.get_delay({**MOVING, 'azimuth_angle': 0.4, 'frame_id': 2}, now=1) is None
+    assert limiter.get_delay(FIRING, now=1) == 0
+    assert limiter.dropped_count == 1
+
+def test_repeats_are_sent_when_not_acknowledged():
+    limiter = CommandLimiter(max_rate=10)
+    assert limiter.get_delay(MOVING, now=0) == 0
+    # The send failed, so the same command is tried again
+    assert limiter.get_delay(MOVING, now=0.01) == 0
+
+def test_holds_back_changes_to_the_max_rate():
+    limiter = CommandLimiter(max_rate=10)
+    limiter.acknowledge(MOVING, now=0)
+    assert limiter.get_delay({**MOVING, 'azimuth_angle': 20}, now=0.04) == pytest.approx(0.06)
+    assert limiter.get_delay({**MOVING, 'azimuth_angle': 20}, now=0.1) == 0
+
+def test_flushes_stops_right_away():
+    limiter = CommandLimiter(max_rate=10)
+    limiter.acknowledge(FIRING, now=0)
+    assert limiter.get_delay(MOVING, now=0.01) == 0
+    limiter.acknowledge(MOVING, now=0.01)
+    assert limiter.get_delay(STOPPED, now=0.02) == 0
+    assert limiter.flushed_count == 2
+    assert 'flushed 2 stops' in limiter.summary()
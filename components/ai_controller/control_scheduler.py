@@ -0,0 +1,90 @@
+import time
+from typing import Optional
+
+
+class ControlScheduler:
+    """Sends the controller states at a fixed rate instead of once per camera frame.
+
+    The controller state of each frame is held until the next one and sent again every tick, so the
+    elevation speed and the firing follow at the control rate. The Arduino adds up the azimuth angle
+    of every command though, so the azimuth angle of a frame is not repeated but spread over the
+    ticks until the next frame is expected, by the average interval of the frames. Whatever is left
+    when the next frame arrives is added to its angle. Only whole degrees reach the servo, so the
+    fractions are carried over to the next tick instead of being rounded away.
+
+    Once no frame arrived for `stale_timeout` seconds the estimate is stale and a single state that
+    stops the elevation and the firing is sent, until the next frame. With `--publish-on-change` the
+    camera vision sends nothing but a heartbeat while the targets stand still, so the timeout has to
+    be longer than its heartbeat. Those pauses are not taken as frame intervals either.
+    """
+
+    def __init__(self, rate: float, stale_timeout: float = 1.5, frame_interval: float = 1 / 30, max_frame_interval: float = 0.3) -> None:
+        """
+        Args:
+            rate: The amount of controller states per second.
+            stale_timeout: The amount of seconds without a frame after which the turret stops.
+            frame_interval: The expected amount of seconds between the frames until they were measured.
+            max_frame_interval: The longest amount of seconds between two frames that counts as a frame interval, longer ones are pauses.
+        """
+        self.period = 1 / rate
+        self.stale_timeout = stale_timeout
+        self.frame_interval = frame_interval
+        self.max_frame_interval = max_frame_interval
+        self.stale_count = 0
+        self._state: Optional[dict] = None
+        self._last_update_time: Optional[float] = None
+        self._is_stopped = False
+        self._remaining_azimuth = 0.0 # The azimuth angle of the frames that was not spread over the ticks yet
+        self._azimuth_step = 0.0
+        self._pending_azimuth = 0.0 # The fraction of a degree that was spread but not sent yet
+
+
+    def update(self, controller_state: dict, now: Optional[float] = None) -> None:
+        """
+        Takes the controller state computed for a new frame.
+
+        Args:
+            controller_state: The controller state.
+            now: The current time in seconds, `time.monotonic()` if not given.
+        """
+        now = time.monotonic() if now is None else now
+        if self._last_update_time is not None and not self._is_stopped:
+            interval = now - self._last_update_time
+            if interval <= self.max_frame_interval:
+                self.frame_interval += 0.2 * (interval - self.frame_interval)
+        self._remaining_azimuth += controller_state.get('azimuth_angle', 0)
+        tick_count = max(self.frame_interval / self.period, 1)
+        self._azimuth_step = self._remaining_azimuth / tick_count
+        self._state = controller_state
+        self._last_update_time = now
+        self._is_stopped = False
+
+
+    def tick(self, now: Optional[float] = None) -> Optional[dict]:
+        """
+        Gets the controller state to send for this tick.
+
+        Args:
+            now: The current time in seconds, `time.monotonic()` if not given.
+
+        Returns:
+            The controller state, or None if there is nothing to send.
+        """
+        if self._state is None or self._is_stopped:
+            return None
+        now = time.monotonic() if now is None else now
+        if now - self._last_update_time > self.stale_timeout: # type: ignore
+            self._is_stopped = True
+            self._remaining_azimuth = self._azimuth_step = self._pending_azimuth = 0.0
+            self.stale_count += 1
+            return {**self._state, 'azimuth_angle': 0, 'speed': 0, 'is_firing': False}
+
+        # Take the step, or what is left of the azimuth angle of the frames if that is less
+        step = self._azimuth_step
+        if abs(step) > abs(self._remaining_azimuth):
+            step = self._remaining_azimuth
+        self._remaining_azimuth -= step
+        self._pending_azimuth += step
+        azimuth_angle = round(self._pending_azimuth)
+        self._pending_azimuth -= azimuth_angle
+        return {**self._state, 'azimuth_angle': azimuth_angle}
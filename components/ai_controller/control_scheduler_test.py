@@ -0,0 +1,62 @@
+import pytest
+from control_scheduler import ControlScheduler
+
+
+def state(azimuth_angle: float = 0, speed: int = 0, is_firing: bool = False, **details) -> dict:
+    return {'azimuth_angle': azimuth_angle, 'is_clockwise': False, 'speed': speed, 'is_firing': is_firing, **details}
+
+
+def test_sends_nothing_before_the_first_frame():
+    assert ControlScheduler(rate=60).tick(now=0) is None
+
+def test_spreads_the_azimuth_angle_over_the_frame_interval():
+    scheduler = ControlScheduler(rate=90, frame_interval=1 / 30)
+    scheduler.update(state(6, speed=4, frame_id=1), now=0)
+    states = [scheduler.tick(now=tick / 90) for tick in range(1, 5)]
+    assert [state['azimuth_angle'] for state in states] == [2, 2, 2, 0]
+    assert all(state['speed'] == 4 and state['frame_id'] == 1 for state in states)
+
+def test_carries_the_fractions_of_a_degree_over():
+    scheduler = ControlScheduler(rate=90, frame_interval=1 / 30)
+    scheduler.update(state(1.2), now=0)
+    angles = [scheduler.tick(now=tick / 90)['azimuth_angle'] for tick in range(1, 4)]
+    scheduler.update(state(1.2), now=1 / 30)
+    angles += [scheduler.tick(now=1 / 30 + tick / 90)['azimuth_angle'] for tick in range(1, 4)]
+    assert sum(angles) == 2
+    assert max(abs(angle) for angle in angles) == 1
+
+def test_adds_what_is_left_to_the_next_frame():
+    scheduler = ControlScheduler(rate=90, frame_interval=1 / 30)
+    scheduler.update(state(9), now=0)
+    first = scheduler.tick(now=1 / 90)['azimuth_angle']
+    scheduler.update(state(-3), now=1 / 60)
+    rest = [scheduler.tick(now=1 / 60 + tick / 90)['azimuth_angle'] for tick in range(1, 10)]
+    assert first + sum(rest) == 6
+
+def test_learns_the_frame_interval():
+    scheduler = ControlScheduler(rate=60, frame_interval=1 / 30)
+    for frame in range(30):
+        scheduler.update(state(), now=frame / 10)
+    assert scheduler.frame_interval == pytest.approx(1 / 10, rel=0.01)
+
+def test_stops_once_when_the_frames_go_stale():
+    scheduler = ControlScheduler(rate=60, stale_timeout=0.3)
+    scheduler.update(state(6, speed=5, is_firing=True), now=0)
+    assert scheduler.tick(now=0.2)['speed'] == 5
+    stop = scheduler.tick(now=0.4)
+    assert (stop['azimuth_angle'], stop['speed'], stop['is_firing']) == (0, 0, False)
+    assert scheduler.tick(now=0.5) is None
+    assert scheduler.stale_count == 1
+
+    scheduler.update(state(speed=3), now=1)
+    assert scheduler.tick(now=1.01)['speed'] == 3
+    assert scheduler.frame_interval < 0.3 # The pause is not taken as a frame interval
+
+def test_holds_the_state_between_the_heartbeats_of_still_targets():
+    scheduler = ControlScheduler(rate=60, frame_interval=1 / 30)
+    scheduler.update(state(0, speed=0, is_firing=True), now=0)
+    assert all(scheduler.tick(now=tick / 60)['is_firing'] for tick in range(1, 60)) # The heartbeat comes every second
+    scheduler.update(state(0, speed=0, is_firing=True), now=1)
+    assert scheduler.tick(now=1.01)['is_firing']
+    assert scheduler.stale_count == 0
+    assert scheduler.frame_interval == pytest.approx(1 / 30)
@@ -0,0 +1,494 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from nerf_turret_utils.image_utils import get_frame_box_dimensions_delta
+from nerf_turret_utils.number_utils import map_range
+from nerf_turret_utils.mask_utils import is_point_in_mask
+from nerf_turret_utils.socket_utils import create_server_socket, format_address, get_unix_path
+from nerf_turret_utils.data_age import AgeTracker
+from nerf_turret_utils.message_framing import MessageDecoder, encode_json_message
+from nerf_turret_utils.target_codec import TargetCodec, decode_targets_message
+from message_bus.bus_client import BusSubscriber
+from command_limiter import CommandLimiter, merge_states, split_azimuth
+from control_scheduler import ControlScheduler
+from target_ranker import TargetRanker
+from target_tracker import TargetTracker
+from pid_controller import PIDController
+from ai_controller_utils import apply_deadband, slow_start_fast_end_smoothing, get_priority_target_index, get_elevation_speed, get_elevation_clockwise, get_frame_details
+
+
+STOP_STATE = {
+    'azimuth_angle': 0,
+    'speed': 0,
+    'is_firing': False,
+}
+
+
+class LatestValue:
+    """Hands the newest value set by one task to another task.
+
+    Setting a value that was not taken yet replaces it, so the taking task never works through a
+    backlog of outdated messages or controller states. Must be created inside the running event loop.
+    """
+
+    def __init__(self, merge: Optional[Callable[[Any, Any], Any]] = None) -> None:
+        """
+        Args:
+            merge: Merges a value that was not taken yet into the one that replaces it, None to drop it.
+        """
+        self.set_count = 0
+        self.replaced_count = 0
+        self.merge = merge
+        self._value: Any = None
+        self._event = asyncio.Event()
+
+
+    def set(self, value: Any) -> None:
+        """Sets the value, replacing the previous one if it was not taken yet"""
+        if self._value is not None:
+            self.replaced_count += 1
+            if self.merge:
+                value = self.merge(self._value, value)
+        self._value = value
+        self.set_count += 1
+        self._event.set()
+
+
+    async def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Waits for a value and takes it.
+
+        Args:
+            timeout: The maximum amount of seconds to wait, or None to wait forever.
+
+        Returns:
+            The newest value, or None if the timeout passed.
+        """
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._event.clear()
+        value, self._value = self._value, None
+        return value
+
+
+class AIController:
+    """Turns the targets of the camera vision into controller states for the serial driver.
+
+    The decisions are made by the synchronous `compute`, `handle_hello` and `handle_camera_timeout`
+    methods, so the controller can be tested and benchmarked without any sockets. `run` serves them
+    with concurrent tasks:
+
+    - ingest: accepts the camera vision (or subscribes to it on the message bus) and reconnects,
+    - control: decodes the newest message and computes the controller state,
+    - schedule: with a control rate, passes the controller state on at that rate between the frames,
+    - output: sends the newest controller state to the serial driver.
+
+    A slow request to the serial driver therefore never delays reading the camera vision, and both
+    the messages and the controller states that were outdated before they were taken are skipped.
+    """
+
+    def __init__(self, args: Any, post: Optional[Callable[[dict], None]] = None) -> None:
+        """
+        Args:
+            args: The parsed arguments of the AI controller, see `ai_controller.py`.
+            post: Sends a controller state to the serial driver, called in a worker thread. None to only log the states.
+        """
+        self.args = args
+        self.post = post
+        self.target_padding_percentage = args.target_padding / 100
+        # Cache the controller state to keep the azimuth when the elevation or firing has to stop
+        self.cached_controller_state = {
+            'azimuth_angle': 0, # The angle of the gun in the horizontal plane adjustment
+            'is_clockwise': False,
+            'speed': 0,
+            'is_firing': False,
+        }
+        self.already_sent_no_targets = False # Flag to prevent sending the same message over and over again
+        self.camera_timed_out = False # Flag to only stop the turret once while the camera vision is silent
+        self.search = {
+            'clockwise': True,
+            'heading': 0,
+        }
+        self.target_codec: Optional[TargetCodec] = None # Decodes the binary messages once the camera vision negotiated them
+        self.receive_age = AgeTracker() # How old the camera frames are when their targets arrive
+        self.limiter = CommandLimiter(args.max_command_rate) # Drops repeated commands and limits the rate of the others
+        # Sends the controller states at a fixed rate between the frames instead of once per frame
+        self.scheduler = ControlScheduler(args.control_rate, args.stale_timeout) if args.control_rate else None
+        # Chooses the target by its score and keeps the lock on it instead of taking the first match
+        self.ranker = TargetRanker(args.target_type, args.targets, switch_margin=args.switch_margin) if args.target_selection == 'ranked' else None
+        # Estimates how the targets move to aim ahead of them, and follows them for the lock of the ranker.
+        # The tracks outlive the heartbeat of the camera vision, so still targets keep their track and lock
+        self.tracker = TargetTracker(max_age=args.stale_timeout) if args.predict or self.ranker else None
+        is_pid = args.control_law == 'pid'
+        self.azimuth_pid = PIDController.from_gains(args.azimuth_pid) if is_pid else None
+        self.elevation_pid = PIDController.from_gains(args.elevation_pid) if is_pid else None
+        self.last_message_time = time.time()
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._messages: Optional[LatestValue] = None
+        self._states: Optional[LatestValue] = None
+
+
+    @property
+    def silence(self) -> float:
+        """The amount of seconds since the last message arrived from the camera vision"""
+        return time.time() - self.last_message_time
+
+
+    def handle_hello(self, hello: dict) -> Optional[dict]:
+        """
+        Picks the encoding of the camera vision messages from its hello.
+
+        Args:
+            hello: The decoded hello message.
+
+        Returns:
+            The reply for the camera vision, or None on the message bus where it can not be answered.
+        """
+        offered = hello['hello'].get('encodings', [])
+        reply = None
+        if self.args.bus:
+            # On the bus the camera vision can not be answered and uses the first encoding it offers
+            encoding = offered[0] if offered else 'json'
+            if encoding not in self.args.encodings:
+                logging.warning(f"The camera vision publishes {encoding} messages, which is not in {self.args.encodings}")
+        else:
+            encoding = 'binary' if 'binary' in offered and 'binary' in self.args.encodings else 'json'
+            reply = {'encoding': encoding}
+        self.target_codec = TargetCodec.from_hello(hello) if encoding == 'binary' else None
+        logging.info(f"Receiving {encoding} messages from the camera vision")
+        return reply
+
+
+    def compute(self, message: Dict[str, Any]) -> Optional[dict]:
+        """
+        Computes the controller state for the targets of a camera vision message.
+
+        Args:
+            message: The decoded targets message.
+
+        Returns:
+            The controller state to send to the serial driver, or None if nothing needs to be sent.
+        """
+        self.last_message_time = time.time()
+        self.camera_timed_out = False
+        args = self.args
+
+        frame_details = get_frame_details(message)
+        age_ms = self.receive_age.update(frame_details.get('frame_id'), frame_details.get('capture_time'))
+        if age_ms is not None:
+            logging.debug(f"Frame {frame_details['frame_id']} is {age_ms:.1f}ms old")
+
+        # Check if there are any targets in the frame
+        if len(message['targets']) == 0:
+            return self._compute_without_targets(frame_details)
+
+        is_debug = logging.getLogger().isEnabledFor(logging.DEBUG) # Skip serialising the messages for the logs when unused
+        if is_debug:
+            logging.debug('Data obtained:' + json.dumps(message))
+        self.already_sent_no_targets = False
+        center_x, center_y = message['heading_vect']
+        now = time.time()
+        capture_time = frame_details.get('capture_time') or now
+        tracks = self.tracker.update(message['targets'], capture_time) if self.tracker else None
+        if self.ranker:
+            target_index = self.ranker.select(message['targets'], (center_x, center_y), message['view_dimensions'][:2], tracks)
+        else:
+            target_index = get_priority_target_index(message['targets'], args.target_type, args.targets)
+
+        if target_index is None:
+            logging.debug(f'No valid target found from type {args.target_type} with ids {args.targets}')
+            # If no valid target was found, then just move onto the next frame
+            return None
+
+        target = message['targets'][target_index]
+        if is_debug:
+            logging.debug('Targeting:' + json.dumps(target))
+
+        box = target['box']
+        lead_x = lead_y = 0.0
+        if tracks and args.predict:
+            # Aim where the target will be once the turret executes the command, not where the frame saw it
+            lead_x, lead_y = tracks[target_index].get_lead(target, now - capture_time + args.actuation_delay)
+            box = [box[0] + lead_x, box[1] + lead_y, box[2] + lead_x, box[3] + lead_y]
+            logging.debug(f"Leading track {tracks[target_index].track_id} by {lead_x:.1f}, {lead_y:.1f} pixels")
+
+        left, top, right, bottom = box
+        box_width = right - left
+        box_height = bottom - top
+        view_width, view_height = message['view_dimensions'][:2]
+
+        # Get movement vector to align gun with center of target
+        movement_vector = get_frame_box_dimensions_delta(left, top, right, bottom, view_width, view_height)
+
+        # Add padding as a percentage of the original dimensions
+        padding_width = box_width * self.target_padding_percentage
+        padding_height = box_height * self.target_padding_percentage
+        padded_left = left + padding_width
+        padded_right = right - padding_width
+        padded_top = top + padding_height
+        padded_bottom = bottom - padding_height
+
+        is_on_target = False
+        if padded_top <= center_y <= padded_bottom and padded_left <= center_x <= padded_right:
+            # When the camera vision sends the segmentation mask only fire if the crosshair is on the object itself
+            # The mask is where the frame saw the target, so the crosshair moves back by the lead instead
+            is_on_target = is_point_in_mask(target['mask'], center_x - lead_x, center_y - lead_y) if 'mask' in target else True
+
+        if self.azimuth_pid and self.elevation_pid:
+            azimuth_angle, is_clockwise, speed = self._compute_pid(movement_vector, view_width, view_height, capture_time)
+        else:
+            azimuth_angle, is_clockwise, speed = self._compute_proportional(movement_vector, view_width, view_height, target['box'])
+
+        controller_state = self.cached_controller_state = {
+            'azimuth_angle': azimuth_angle,
+            'is_clockwise': is_clockwise,
+            'speed': speed,
+            'is_firing': is_on_target,
+            **frame_details,
+        }
+        return controller_state
+
+
+    def _compute_proportional(self, movement_vector: Tuple[float, float], view_width: float, view_height: float, box: List[float]) -> Tuple[float, bool, int]:
+        args = self.args
+        predicted_azimuth_angle = map_range(
+            movement_vector[0] - args.accuracy_threshold_x,
+            -(view_width / 2),
+            view_width / 2,
+            -args.max_azimuth_angle,
+            args.max_azimuth_angle
+        )
+        azimuth_speed_adjusted = min(predicted_azimuth_angle, args.x_speed)
+        smoothed_speed_adjusted_azimuth = slow_start_fast_end_smoothing(azimuth_speed_adjusted, float(args.x_smoothing) + 1.0, 90)
+        return (
+            round(smoothed_speed_adjusted_azimuth, args.azimuth_dp),
+            get_elevation_clockwise(movement_vector),
+            get_elevation_speed(args, view_height, movement_vector, box),
+        )
+
+
+    def _compute_pid(self, movement_vector: Tuple[float, float], view_width: float, view_height: float, timestamp: float) -> Tuple[float, bool, int]:
+        args = self.args
+        # The errors are normalised to [-1, 1] by half the view, the accuracy thresholds are left alone
+        error_x = apply_deadband(movement_vector[0], args.accuracy_threshold_x) / (view_width / 2)
+        error_y = apply_deadband(movement_vector[1], args.accuracy_threshold_y) / (view_height / 2)
+        azimuth = self.azimuth_pid.update(error_x, timestamp) * args.max_azimuth_angle # type: ignore
+        elevation = self.elevation_pid.update(error_y, timestamp) * args.max_elevation_speed # type: ignore
+        return (
+            round(azimuth, args.azimuth_dp),
+            elevation < 0, # Like `get_elevation_clockwise`, a positive error turns the elevation counterclockwise
+            int(round(abs(elevation))),
+        )
+
+
+    def _compute_without_targets(self, frame_details: dict) -> Optional[dict]:
+        for pid in (self.azimuth_pid, self.elevation_pid):
+            if pid:
+                pid.reset() # The integral and derivative of the lost target must not carry over to the next one
+        if self.args.search:
+            controller_state = {
+                **self.cached_controller_state,
+                'azimuth_angle': 1 if self.search['clockwise'] else -1,
+                'speed': 0,
+                'is_firing': False,
+                **frame_details,
+            }
+            if self.search['heading'] > 180:
+                self.search['heading'] = 0
+                self.search['clockwise'] = not self.search['clockwise']
+            else:
+                self.search['heading'] += 1
+            return controller_state
+
+        if self.already_sent_no_targets:
+            return None
+        ## No targets detected, so stop the gun but hold its current position
+        self.already_sent_no_targets = True
+        return {
+            **self.cached_controller_state,
+            'speed': 0,
+            'is_firing': False,
+            **frame_details,
+        }
+
+
+    def handle_camera_timeout(self) -> Optional[dict]:
+        """
+        Checks whether the camera vision has been silent for longer than the camera timeout.
+
+        Returns:
+            The controller state that stops the turret the first time the timeout passed, otherwise None.
+        """
+        if not self.args.camera_timeout or self.camera_timed_out or self.silence < self.args.camera_timeout:
+            return None
+        ## The camera vision sends at least a heartbeat, so it is stuck or dead and the targets are stale
+        logging.warning(f"No message from the camera vision for {self.silence:.1f} seconds, stopping the turret")
+        self.camera_timed_out = True
+        return {**self.cached_controller_state, **STOP_STATE} # The Arduino adds up the azimuth angles, so do not turn again
+
+
+    async def run(self) -> None:
+        """Runs the ingest, control and output tasks until one of them fails or they are cancelled"""
+        self._messages = LatestValue()
+        self._states = LatestValue(merge=merge_states) # The Arduino adds up the azimuth angles, so replaced states keep their turn
+        self.last_message_time = time.time()
+        tasks = [self._ingest(), self._control(), self._output()]
+        if self.scheduler:
+            tasks.append(self._schedule())
+        await asyncio.gather(*tasks)
+
+
+    async def _ingest(self) -> None:
+        if self.args.bus:
+            await self._subscribe_to_bus()
+            return
+        logging.info(f"Binding to host {format_address(self.args.ws_host, self.args.ws_port)}")
+        sock = create_server_socket(self.args.ws_host, self.args.ws_port)
+        if get_unix_path(self.args.ws_host):
+            server = await asyncio.start_unix_server(self._receive, sock=sock)
+        else:
+            server = await asyncio.start_server(self._receive, sock=sock)
+        async with server:
+            await server.serve_forever()
+
+
+    async def _subscribe_to_bus(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            logging.info(f"Subscribing to the '{self.args.bus_topic}' topic of the message bus @ {self.args.bus}")
+            try:
+                subscriber = await loop.run_in_executor(None, BusSubscriber, self.args.bus, self.args.bus_topic)
+            except (OSError, ConnectionError) as e:
+                logging.error(f"Failed to subscribe to the message bus: {e}. Retrying in 1 second...")
+                await asyncio.sleep(1)
+                continue
+            self.target_codec = None
+            if subscriber.retained:
+                self._messages.set(subscriber.retained) # type: ignore
+            reader, writer = await asyncio.open_unix_connection(sock=subscriber.connection)
+            await self._receive(reader, writer)
+            await asyncio.sleep(1)
+
+
+    async def _receive(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        logging.info(f"Connected by {writer.get_extra_info('peername') or 'unix socket'}")
+        self._writer = writer
+        self.target_codec = None
+        decoder = MessageDecoder()
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                for payload in decoder.feed(data):
+                    self._messages.set(payload) # type: ignore
+        except ConnectionError as e:
+            logging.error(f"Socket connection lost: {e}")
+        except ValueError as e:
+            # The message boundaries are lost, so the camera vision has to reconnect
+            logging.error(f"Dropping the connection after a bad message: {e}")
+        finally:
+            logging.info("The camera vision disconnected")
+            if self._writer is writer:
+                self._writer = None
+            writer.close()
+
+
+    async def _control(self) -> None:
+        while True:
+            payload = await self._messages.get(timeout=self.args.camera_timeout or None) # type: ignore
+            start_time = time.time()
+            if payload is None:
+                controller_state = self.handle_camera_timeout()
+                if controller_state:
+                    self._states.set(controller_state) # type: ignore
+                continue
+
+            try:
+                message = decode_targets_message(payload, self.target_codec)
+            except ValueError as e:
+                logging.error(f"Error decoding message: {e}")
+                continue
+
+            if 'hello' in message:
+                reply = self.handle_hello(message)
+                if reply and self._writer:
+                    self._writer.write(encode_json_message(reply))
+                continue
+
+            try:
+                controller_state = self.compute(message)
+            except Exception as e:
+                logging.exception(f"Failed to compute the controller state: {e}")
+                continue
+            if controller_state:
+                if logging.getLogger().isEnabledFor(logging.DEBUG):
+                    logging.debug("Sending controller state: " + json.dumps(controller_state))
+                if self.scheduler:
+                    self.scheduler.update(controller_state)
+                else:
+                    self._states.set(controller_state) # type: ignore
+
+            if self.args.benchmark:
+                logging.debug("Frame processed in " + str(time.time() - start_time) + " seconds")
+                logging.debug(f"Skipped {self._messages.replaced_count} of {self._messages.set_count} received messages") # type: ignore
+                logging.debug(f"Age of the frames when received: {self.receive_age.summary()}")
+            if self.args.delay:
+                await asyncio.sleep(self.args.delay)
+
+
+    async def _schedule(self) -> None:
+        next_tick_time = time.monotonic()
+        while True:
+            next_tick_time += self.scheduler.period # type: ignore
+            delay = next_tick_time - time.monotonic()
+            if delay < -self.scheduler.period: # type: ignore
+                next_tick_time -= delay # Fell behind, skip the missed ticks instead of sending them in a burst
+            await asyncio.sleep(max(delay, 0))
+            controller_state = self.scheduler.tick() # type: ignore
+            if controller_state:
+                self._states.set(controller_state) # type: ignore
+
+
+    async def _output(self) -> None:
+        loop = asyncio.get_running_loop()
+        controller_state = None
+        while True:
+            if controller_state is None:
+                controller_state = await self._states.get() # type: ignore
+            if self.post is None:
+                controller_state = None
+                continue
+
+            delay = self.limiter.get_delay(controller_state)
+            if delay is None:
+                controller_state = None # Nothing would change on the Arduino
+                continue
+            if delay > 0:
+                # Hold the state back, a newer one replaces it with both turns and is checked again as it may stop the turret
+                newer_state = await self._states.get(timeout=delay) # type: ignore
+                if newer_state:
+                    controller_state = merge_states(controller_state, newer_state)
+                continue
+
+            # The rest of a turn beyond what one command holds is sent with the next command
+            sent_state, controller_state = split_azimuth(controller_state)
+            start_time = time.time()
+            try:
+                await loop.run_in_executor(None, self.post, sent_state)
+            except Exception as e:
+                logging.error(f"Failed to send controller state to server: {e}")
+                continue
+            self.limiter.acknowledge(sent_state)
+            if self.args.benchmark:
+                logging.debug(f"Controller state sent in {time.time() - start_time} seconds, skipped {self._states.replaced_count} of {self._states.set_count} states") # type: ignore
+                logging.debug(self.limiter.summary())
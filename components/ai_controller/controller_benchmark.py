@@ -0,0 +1,37 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+import logging
+import random
+import timeit
+from argparse import ArgumentParser, Namespace
+from typing import Any
+from nerf_turret_utils.target_codec_benchmark import make_message
+from controller import AIController
+from ai_controller import parser as ai_controller_parser
+
+
+def make_args(**overrides: Any) -> Namespace:
+    """The default arguments of `ai_controller.py`, with some of them overridden"""
+    return Namespace(**{**vars(ai_controller_parser.parse_args([])), **overrides})
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser(description="Measures how long the AI controller takes to compute a controller state, without any sockets")
+    parser.add_argument("--target-counts", "-tc", help="The amounts of targets per message to measure", nargs='+', type=int, default=[0, 1, 5, 20, 100])
+    parser.add_argument("--runs", "-r", help="The amount of times each message is computed", type=int, default=5000)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    rng = random.Random(0)
+
+    print("| Targets | Compute |")
+    print("|---|---|")
+    for target_count in args.target_counts:
+        message = make_message(target_count, rng)
+        controller = AIController(make_args())
+        seconds = timeit.timeit(lambda: controller.compute(message), number=args.runs)
+        print(f"| {target_count} | {seconds / args.runs * 1e6:.1f}µs |")
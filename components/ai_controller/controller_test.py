@@ -0,0 +1,253 @@
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import time
+from controller import AIController, LatestValue
+from controller_benchmark import make_args
+from nerf_turret_utils.message_framing import MessageDecoder, encode_json_message
+
+
+def make_message(targets, frame_id=1):
+    return {'frame_id': frame_id, 'targets': targets, 'heading_vect': [320, 240], 'view_dimensions': [640, 480]}
+
+
+def test_fires_at_a_centered_target():
+    controller = AIController(make_args())
+    state = controller.compute(make_message([{'type': 'person', 'box': [270, 140, 370, 340]}], frame_id=4))
+    assert state['is_firing']
+    assert state['frame_id'] == 4
+    assert controller.cached_controller_state is state
+
+def test_turns_towards_the_side_of_the_target():
+    controller = AIController(make_args())
+    right = controller.compute(make_message([{'type': 'person', 'box': [540, 140, 640, 340]}]))
+    left = controller.compute(make_message([{'type': 'person', 'box': [0, 140, 100, 340]}]))
+    assert right['azimuth_angle'] * left['azimuth_angle'] < 0
+    assert not right['is_firing'] and not left['is_firing']
+
+def test_predict_aims_ahead_of_a_moving_target():
+    def moving_person(step):
+        left = 270 - 300 * (30 - step) / 30 # Moves right at 300 pixels per second and is centered on the last frame
+        return {**make_message([{'type': 'person', 'box': [left, 140, left + 100, 340]}], frame_id=step), 'capture_time': step / 30}
+
+    states = {}
+    for predict in (False, True):
+        controller = AIController(make_args(predict=predict, actuation_delay=0.2))
+        for step in range(31):
+            message = moving_person(step)
+            message['capture_time'] += time.time() - 1
+            state = controller.compute(message)
+        states[predict] = state
+
+    assert states[False]['is_firing']
+    assert not states[True]['is_firing'] # The target moved on by the time the gun fires
+    assert states[True]['azimuth_angle'] != states[False]['azimuth_angle']
+
+def test_pid_turns_towards_the_side_of_the_target():
+    controller = AIController(make_args(control_law='pid'))
+    right = controller.compute({**make_message([{'type': 'person', 'box': [540, 40, 640, 240]}]), 'capture_time': 1})
+    assert right['azimuth_angle'] < 0
+    assert not right['is_clockwise'] and right['speed'] > 0
+    left = controller.compute({**make_message([{'type': 'person', 'box': [0, 240, 100, 440]}]), 'capture_time': 2})
+    assert left['azimuth_angle'] > 0
+    assert left['is_clockwise'] and left['speed'] > 0
+
+def test_pid_rests_within_the_accuracy_thresholds():
+    controller = AIController(make_args(control_law='pid', accuracy_threshold_x=10))
+    state = controller.compute({**make_message([{'type': 'person', 'box': [275, 160, 375, 360]}]), 'capture_time': 1})
+    assert (state['azimuth_angle'], state['speed']) == (0, 0)
+
+def test_ranked_selection_keeps_aiming_at_the_same_person():
+    left = {'type': 'person', 'box': [200, 140, 300, 340]}
+    right = {'type': 'person', 'box': [340, 140, 440, 340]}
+    azimuth_signs = {}
+    for selection in ('first', 'ranked'):
+        controller = AIController(make_args(target_selection=selection))
+        states = [
+            controller.compute({**make_message(targets, frame_id=frame_id), 'capture_time': 1 + frame_id / 30})
+            for frame_id, targets in enumerate([[left, right], [right, left], [left, right], [right, left]])
+        ]
+        azimuth_signs[selection] = {state['azimuth_angle'] > 0 for state in states}
+    assert azimuth_signs == {'first': {True, False}, 'ranked': {True}}
+
+def test_ignores_targets_of_other_types():
+    controller = AIController(make_args(target_type='dog'))
+    assert controller.compute(make_message([{'type': 'person', 'box': [270, 140, 370, 340]}])) is None
+
+def test_stops_once_without_targets():
+    controller = AIController(make_args())
+    controller.compute(make_message([{'type': 'person', 'box': [540, 140, 640, 340]}]))
+    state = controller.compute(make_message([], frame_id=2))
+    assert state['speed'] == 0 and not state['is_firing']
+    assert state['azimuth_angle'] == controller.cached_controller_state['azimuth_angle']
+    assert controller.compute(make_message([])) is None
+
+def test_searches_without_targets():
+    controller = AIController(make_args(search=True))
+    assert controller.compute(make_message([]))['azimuth_angle'] == 1
+    assert controller.compute(make_message([]))['azimuth_angle'] == 1
+
+def test_replies_to_the_hello_only_when_connected_directly():
+    hello = {'hello': {'version': 2, 'encodings': ['json', 'binary'], 'class_names': ['person'], 'target_ids': []}}
+    controller = AIController(make_args())
+    assert controller.handle_hello(hello) == {'encoding': 'binary'}
+    assert controller.target_codec is not None
+
+    controller = AIController(make_args(bus='/tmp/bus.sock'))
+    assert controller.handle_hello(hello) is None
+
+def test_stops_once_when_the_camera_is_silent():
+    controller = AIController(make_args(camera_timeout=0.01))
+    controller.compute(make_message([{'type': 'person', 'box': [0, 140, 100, 340]}]))
+    assert controller.cached_controller_state['azimuth_angle'] != 0
+    controller.last_message_time -= 1
+    state = controller.handle_camera_timeout()
+    assert (state['azimuth_angle'], state['speed'], state['is_firing']) == (0, 0, False)
+    assert controller.handle_camera_timeout() is None
+
+    controller.compute(make_message([]))
+    assert not controller.camera_timed_out
+
+
+def test_latest_value_replaces_values_not_taken_yet():
+    async def run():
+        latest = LatestValue()
+        for value in range(3):
+            latest.set(value + 1)
+        assert await latest.get() == 3
+        assert await latest.get(timeout=0.01) is None
+        return latest
+
+    latest = asyncio.run(run())
+    assert (latest.set_count, latest.replaced_count) == (3, 2)
+
+
+def test_run_sends_controller_states_of_a_connected_camera():
+    posted = []
+    path = os.path.join(tempfile.mkdtemp(), 'ai_controller.sock')
+
+    async def run():
+        controller = AIController(make_args(ws_host=f'unix://{path}'), post=posted.append)
+        task = asyncio.ensure_future(controller.run())
+        for _ in range(100):
+            if os.path.exists(path):
+                break
+            await asyncio.sleep(0.01)
+
+        reader, writer = await asyncio.open_unix_connection(path)
+        writer.write(encode_json_message({'hello': {'version': 2, 'encodings': ['json'], 'class_names': ['person'], 'target_ids': []}}))
+        reply = MessageDecoder().feed(await reader.read(1024))
+        writer.write(encode_json_message(make_message([{'type': 'person', 'box': [270, 140, 370, 340]}], frame_id=7)))
+        for _ in range(100):
+            if posted:
+                break
+            await asyncio.sleep(0.01)
+        writer.close()
+        task.cancel()
+        return reply
+
+    reply = asyncio.run(run())
+    assert json.loads(reply[0]) == {'encoding': 'json'}
+    assert posted[0]['frame_id'] == 7
+    assert posted[0]['is_firing']
+
+
+def test_drops_a_connection_that_sends_a_bad_header():
+    camera, controller_end = socket.socketpair()
+
+    async def run():
+        controller = AIController(make_args())
+        reader, writer = await asyncio.open_unix_connection(sock=controller_end)
+        camera.sendall(b'\xff\xff\xff\xff') # Longer than any message
+        # Returns instead of raising, which would end the ingest task of a bus subscription
+        await asyncio.wait_for(controller._receive(reader, writer), 2)
+
+    asyncio.run(run())
+    assert camera.recv(1) == b'' # Disconnected
+    camera.close()
+
+
+def test_run_drops_repeated_controller_states():
+    posted = []
+
+    async def run():
+        path = os.path.join(tempfile.mkdtemp(), 'ai_controller.sock')
+        controller = AIController(make_args(ws_host=f'unix://{path}', max_command_rate=0), post=posted.append)
+        task = asyncio.ensure_future(controller.run())
+        await asyncio.sleep(0)
+        for frame_id in range(3):
+            controller._states.set({'azimuth_angle': 0, 'is_clockwise': False, 'speed': 0, 'is_firing': False, 'frame_id': frame_id})
+            await asyncio.sleep(0.05)
+        task.cancel()
+        return controller
+
+    controller = asyncio.run(run())
+    assert [state['frame_id'] for state in posted] == [0]
+    assert controller.limiter.dropped_count == 2
+
+
+def test_run_keeps_the_azimuth_turns_of_held_back_states():
+    posted = []
+
+    async def run():
+        path = os.path.join(tempfile.mkdtemp(), 'ai_controller.sock')
+        controller = AIController(make_args(ws_host=f'unix://{path}', max_command_rate=10), post=posted.append)
+        task = asyncio.ensure_future(controller.run())
+        await asyncio.sleep(0)
+        for frame_id, azimuth_angle in enumerate([5, 3, 4, -60, -50]):
+            # All but the first state come within the interval of the max command rate
+            controller._states.set({'azimuth_angle': azimuth_angle, 'is_clockwise': False, 'speed': 2, 'is_firing': False, 'frame_id': frame_id})
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.4)
+        task.cancel()
+
+    asyncio.run(run())
+    assert sum(state['azimuth_angle'] for state in posted) == 5 + 3 + 4 - 60 - 50
+    assert all(abs(state['azimuth_angle']) <= 90 for state in posted)
+    assert posted[-1]['frame_id'] == 4
+
+
+def test_run_sends_controller_states_at_the_control_rate():
+    posted = []
+
+    async def run():
+        path = os.path.join(tempfile.mkdtemp(), 'ai_controller.sock')
+        controller = AIController(make_args(ws_host=f'unix://{path}', control_rate=100, stale_timeout=0.2, max_command_rate=0), post=posted.append)
+        task = asyncio.ensure_future(controller.run())
+        for _ in range(100):
+            if os.path.exists(path):
+                break
+            await asyncio.sleep(0.01)
+
+        _, writer = await asyncio.open_unix_connection(path)
+        # A single frame of a target to the left and above the crosshair
+        writer.write(encode_json_message({**make_message([{'type': 'person', 'box': [100, 40, 200, 240]}]), 'capture_time': time.time()}))
+        await asyncio.sleep(0.4)
+        writer.close()
+        task.cancel()
+        return controller
+
+    controller = asyncio.run(run())
+    assert len(posted) > 2 # The elevation speed was sent on until the frame went stale
+    assert all(state['azimuth_angle'] == round(state['azimuth_angle']) for state in posted)
+    assert posted[-1]['speed'] == 0 and not posted[-1]['is_firing']
+    assert controller.scheduler.stale_count == 1
+
+def test_run_keeps_the_whole_turn_when_the_control_rate_is_above_the_command_rate():
+    posted = []
+
+    async def run():
+        path = os.path.join(tempfile.mkdtemp(), 'ai_controller.sock')
+        controller = AIController(make_args(ws_host=f'unix://{path}', control_rate=100, max_command_rate=20), post=posted.append)
+        controller.scheduler.frame_interval = 0.2 # type: ignore # Spread the turn over 20 ticks, more than the 4 commands sent meanwhile
+        task = asyncio.ensure_future(controller.run())
+        await asyncio.sleep(0)
+        controller.scheduler.update({'azimuth_angle': 30, 'is_clockwise': False, 'speed': 2, 'is_firing': False}) # type: ignore
+        await asyncio.sleep(0.4)
+        task.cancel()
+
+    asyncio.run(run())
+    assert sum(state['azimuth_angle'] for state in posted) == 30
+    assert len(posted) < 20
@@ -0,0 +1,74 @@
+from typing import List, Optional
+
+
+class PIDController:
+    """A PID controller for one axis of the turret, with anti-windup and a filtered derivative.
+
+    The error and the output are normalised, the error is the offset of the target from the
+    crosshair divided by half the view and the output is clamped to [-1, 1] before it is scaled to
+    the azimuth angle or the elevation speed. The integral stops growing while the output is
+    saturated in the direction of the error, so it does not keep pushing past the target once the
+    turret catches up. The derivative is low pass filtered, as the boxes of the detections jitter from
+    frame to frame.
+    """
+
+    def __init__(self, kp: float, ki: float = 0, kd: float = 0, derivative_time_constant: float = 0.05, integral_limit: float = 1) -> None:
+        """
+        Args:
+            kp: The proportional gain.
+            ki: The integral gain, per second.
+            kd: The derivative gain, in seconds.
+            derivative_time_constant: The time constant in seconds of the low pass filter on the derivative, 0 to not filter it.
+            integral_limit: The maximum absolute contribution of the integral to the output.
+        """
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.derivative_time_constant = derivative_time_constant
+        self.integral_limit = integral_limit
+        self.reset()
+
+
+    @classmethod
+    def from_gains(cls, gains: List[float]) -> 'PIDController':
+        """Creates a controller from the [kp, ki, kd] gains, as passed on the command line"""
+        kp, ki, kd = gains
+        return cls(kp, ki, kd)
+
+
+    def reset(self) -> None:
+        """Forgets the integral and the previous error, e.g. when the target was lost"""
+        self.integral = 0.0
+        self.derivative = 0.0
+        self._previous_error: Optional[float] = None
+        self._previous_time: Optional[float] = None
+
+
+    def update(self, error: float, timestamp: float) -> float:
+        """
+        Computes the output for the error measured at a time.
+
+        Args:
+            error: The normalised error, positive when the output should be positive.
+            timestamp: The time in seconds the error was measured at, e.g. the capture time of the frame.
+
+        Returns:
+            The output between -1 and 1.
+        """
+        dt = 0.0 if self._previous_time is None else timestamp - self._previous_time
+        if dt > 0 and self._previous_error is not None:
+            raw_derivative = (error - self._previous_error) / dt
+            smoothing = dt / (self.derivative_time_constant + dt)
+            self.derivative += smoothing * (raw_derivative - self.derivative)
+
+        integral = max(-self.integral_limit, min(self.integral_limit, self.integral + self.ki * error * max(dt, 0)))
+        unclamped = self.kp * error + integral + self.kd * self.derivative
+        output = max(-1.0, min(1.0, unclamped))
+        is_winding_up = output != unclamped and (error > 0) == (unclamped > 0)
+        if not is_winding_up:
+            self.integral = integral
+
+        if dt >= 0:
+            self._previous_error = error
+            self._previous_time = timestamp
+        return output
@@ -0,0 +1,53 @@
+import pytest
+from pid_controller import PIDController
+
+
+def test_proportional_output_is_clamped():
+    pid = PIDController(kp=2)
+    assert pid.update(0.25, timestamp=0) == 0.5
+    assert pid.update(0.75, timestamp=0.1) == 1
+    assert pid.update(-0.75, timestamp=0.2) == -1
+
+def test_integral_accumulates_the_error_over_time():
+    pid = PIDController(kp=0, ki=2)
+    pid.update(0.5, timestamp=0)
+    assert pid.update(0.5, timestamp=0.1) == pytest.approx(0.1)
+    assert pid.update(0.5, timestamp=0.2) == pytest.approx(0.2)
+
+def test_integral_stops_growing_while_saturated():
+    pid = PIDController(kp=1, ki=10)
+    for step in range(50):
+        pid.update(2, timestamp=step / 10)
+    assert pid.integral == 0
+    # Without windup the output drops as soon as the error changes sign
+    assert pid.update(-0.5, timestamp=5) < 0
+
+def test_integral_is_limited():
+    pid = PIDController(kp=0, ki=10, integral_limit=0.3)
+    for step in range(50):
+        pid.update(0.5, timestamp=step / 10)
+    assert pid.integral == pytest.approx(0.3)
+
+def test_derivative_is_filtered():
+    unfiltered = PIDController(kp=0, kd=0.1, derivative_time_constant=0)
+    filtered = PIDController(kp=0, kd=0.1, derivative_time_constant=0.1)
+    for pid in (unfiltered, filtered):
+        pid.update(0, timestamp=0)
+    assert unfiltered.update(0.1, timestamp=0.1) == pytest.approx(0.1)
+    assert filtered.update(0.1, timestamp=0.1) == pytest.approx(0.05)
+
+def test_ignores_older_timestamps():
+    pid = PIDController(kp=0, ki=1, kd=1)
+    pid.update(0.5, timestamp=1)
+    pid.update(0.9, timestamp=0.5)
+    assert (pid.integral, pid.derivative) == (0, 0)
+    pid.update(0.5, timestamp=1.5)
+    assert pid.integral == pytest.approx(0.25)
+    assert pid.derivative == pytest.approx(0)
+
+def test_reset_forgets_the_integral_and_derivative():
+    pid = PIDController.from_gains([0, 1, 1])
+    pid.update(0, timestamp=0)
+    pid.update(0.5, timestamp=1)
+    pid.reset()
+    assert pid.update(0.5, timestamp=2) == 0
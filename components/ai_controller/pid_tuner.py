@@ -0,0 +1,168 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+import itertools
+import logging
+from argparse import ArgumentParser, Namespace
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from controller import AIController
+from controller_benchmark import make_args
+from turret_model import TurretModel
+
+
+START_TIME = 1700000000.0 # The capture times are wall clock times, the controller takes a capture time of 0 as missing
+
+
+class StepResponse(NamedTuple):
+    settle_time: float
+    overshoot: float
+
+
+def simulate_step(
+    args: Namespace,
+    model_options: Dict[str, Any],
+    axis: int,
+    offset: float,
+    tolerance: float,
+    duration: float = 3,
+    frame_rate: float = 30,
+) -> StepResponse:
+    """
+    Simulates how the AI controller turns the turret towards a target that appears off the crosshair.
+
+    Args:
+        args: The arguments of the AI controller.
+        model_options: The keyword arguments of the `TurretModel`.
+        axis: 0 to offset the target on the azimuth, 1 on the elevation.
+        offset: The angle in degrees the turret has to turn by to aim at the target.
+        tolerance: The amount of pixels from the crosshair that count as on target.
+        duration: The amount of seconds to simulate.
+        frame_rate: The amount of frames per second of the camera vision.
+
+    Returns:
+        The amount of seconds until the target stayed within the tolerance, `duration` if it never did,
+        and how far the turret turned past the target as a fraction of the offset.
+    """
+    model = TurretModel(**model_options)
+    model.set_target(offset if axis == 0 else 0, offset if axis == 1 else 0)
+    controller = AIController(args)
+    pixels_per_degree = model.pixels_per_degree[axis]
+    frame_time = 1 / frame_rate
+    settle_time = 0.0
+    overshoot = 0.0
+    for frame_id in range(int(duration * frame_rate)):
+        controller_state = controller.compute(model.get_targets_message(frame_id, START_TIME + model.time))
+        if controller_state:
+            model.command(controller_state)
+        model.advance(frame_time)
+        remaining = model.offset[axis]
+        if abs(remaining) * pixels_per_degree > tolerance:
+            settle_time = model.time
+        overshoot = max(overshoot, -remaining / offset)
+    if settle_time >= model.time - frame_time:
+        settle_time = duration
+    return StepResponse(settle_time, overshoot)
+
+
+def evaluate(
+    args: Namespace,
+    model_options: Dict[str, Any],
+    axis: int,
+    offsets: List[float],
+    tolerance: float,
+    overshoot_weight: float,
+    **simulate_options: Any,
+) -> Tuple[float, float, float]:
+    """
+    Simulates the step responses to several offsets on an axis.
+
+    Returns:
+        The cost to minimise, the mean settle time in seconds and the mean overshoot.
+    """
+    responses = [simulate_step(args, model_options, axis, offset, tolerance, **simulate_options) for offset in offsets]
+    settle_time = sum(response.settle_time for response in responses) / len(responses)
+    overshoot = sum(response.overshoot for response in responses) / len(responses)
+    return settle_time + overshoot_weight * overshoot, settle_time, overshoot
+
+
+def search_gains(
+    args: Namespace,
+    model_options: Dict[str, Any],
+    axis: int,
+    grid: Dict[str, List[float]],
+    offsets: List[float],
+    tolerance: float,
+    overshoot_weight: float,
+    **simulate_options: Any,
+) -> Tuple[List[float], Tuple[float, float, float]]:
+    """
+    Searches the gains of the PID controller of an axis with the lowest cost on a grid.
+
+    Args:
+        args: The arguments of the AI controller, with the gains of the other axis.
+        model_options: The keyword arguments of the `TurretModel`.
+        axis: 0 for the azimuth, 1 for the elevation.
+        grid: The 'kp', 'ki' and 'kd' values to try.
+        offsets: The angles in degrees of the steps to simulate.
+        tolerance: The amount of pixels from the crosshair that count as on target.
+        overshoot_weight: The amount of seconds of settle time that a full offset of overshoot costs as much as.
+
+    Returns:
+        The best [kp, ki, kd] gains and their cost, mean settle time and mean overshoot.
+    """
+    gains_arg = 'azimuth_pid' if axis == 0 else 'elevation_pid'
+    best_gains: Optional[List[float]] = None
+    best_result = (float('inf'), 0.0, 0.0)
+    for gains in itertools.product(grid['kp'], grid['ki'], grid['kd']):
+        candidate_args = Namespace(**{**vars(args), 'control_law': 'pid', gains_arg: list(gains)})
+        result = evaluate(candidate_args, model_options, axis, offsets, tolerance, overshoot_weight, **simulate_options)
+        if result[0] < best_result[0]:
+            best_gains, best_result = list(gains), result
+    return best_gains, best_result # type: ignore
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser(description="Tunes the gains of the PID control law of the AI controller against a kinematic model of the turret")
+    parser.add_argument("--azimuth-offsets", "-ao", help="The azimuth steps in degrees to simulate.", nargs='+', type=float, default=[5, 15, -25])
+    parser.add_argument("--elevation-offsets", "-eo", help="The elevation steps in degrees to simulate.", nargs='+', type=float, default=[5, 10, -15])
+    parser.add_argument("--tolerance", "-t", help="The amount of pixels from the crosshair that count as settled on the azimuth and the elevation, more than a degree of the azimuth servo and the --accuracy-threshold-y of the controller.", nargs=2, type=float, default=[16, 40])
+    parser.add_argument("--overshoot-weight", "-ow", help="How many seconds of settle time an overshoot of the whole offset costs as much as.", type=float, default=2)
+    parser.add_argument("--duration", "-d", help="The amount of seconds to simulate each step for.", type=float, default=3)
+    parser.add_argument("--frame-rate", "-fr", help="The amount of frames per second of the camera vision.", type=float, default=30)
+    parser.add_argument("--latency", "-l", help="The amount of seconds from capturing a frame until the turret executes its command.", type=float, default=0.1)
+    parser.add_argument("--servo-rate", "-sr", help="How fast the azimuth servo turns in degrees per second.", type=float, default=300)
+    parser.add_argument("--elevation-gear-ratio", "-egr", help="How many turns of the stepper motor turn the elevation once.", type=float, default=10)
+    parser.add_argument("--field-of-view", "-fov", help="The horizontal and vertical field of view of the camera in degrees.", nargs=2, type=float, default=[60, 45])
+    parser.add_argument("--kp", help="The proportional gains to try.", nargs='+', type=float, default=[0.05, 0.1, 0.15, 0.2, 0.5, 1, 2, 3, 4])
+    parser.add_argument("--ki", help="The integral gains to try.", nargs='+', type=float, default=[0, 0.05, 0.1, 0.2, 0.5, 1])
+    parser.add_argument("--kd", help="The derivative gains to try.", nargs='+', type=float, default=[0, 0.005, 0.01, 0.02, 0.05, 0.1])
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    model_options = {
+        'field_of_view': tuple(args.field_of_view),
+        'servo_rate': args.servo_rate,
+        'elevation_gear_ratio': args.elevation_gear_ratio,
+        'latency': args.latency,
+    }
+    simulate_options = {'duration': args.duration, 'frame_rate': args.frame_rate}
+    grid = {'kp': args.kp, 'ki': args.ki, 'kd': args.kd}
+    controller_args = make_args()
+    axes = [('Azimuth', args.azimuth_offsets), ('Elevation', args.elevation_offsets)]
+
+    print("| Axis | Control law | Gains | Settle time | Overshoot |")
+    print("|---|---|---|---|---|")
+    tuned_gains = []
+    for axis, (name, offsets) in enumerate(axes):
+        tolerance = args.tolerance[axis]
+        _, settle_time, overshoot = evaluate(controller_args, model_options, axis, offsets, tolerance, args.overshoot_weight, **simulate_options)
+        print(f"| {name} | proportional | | {settle_time:.2f}s | {overshoot:.0%} |")
+        gains, (_, settle_time, overshoot) = search_gains(controller_args, model_options, axis, grid, offsets, tolerance, args.overshoot_weight, **simulate_options)
+        print(f"| {name} | pid | {' '.join(f'{gain:g}' for gain in gains)} | {settle_time:.2f}s | {overshoot:.0%} |")
+        tuned_gains.append(gains)
+
+    print()
+    print(f"--control-law pid --azimuth-pid {' '.join(f'{gain:g}' for gain in tuned_gains[0])} --elevation-pid {' '.join(f'{gain:g}' for gain in tuned_gains[1])}")
@@ -0,0 +1,22 @@
+from controller_benchmark import make_args
+from pid_tuner import evaluate, search_gains, simulate_step
+
+
+def test_tuned_gains_settle_faster_than_the_proportional_law():
+    for axis, offsets, tolerance in ((0, [5, 15, -25], 16), (1, [5, 10, -15], 40)):
+        _, proportional_settle_time, _ = evaluate(make_args(), {}, axis, offsets, tolerance, overshoot_weight=2)
+        cost, settle_time, overshoot = evaluate(make_args(control_law='pid'), {}, axis, offsets, tolerance, overshoot_weight=2)
+        assert settle_time < proportional_settle_time / 2
+        assert overshoot < 0.2
+
+def test_unstable_gains_never_settle():
+    args = make_args(control_law='pid', azimuth_pid=[1, 0, 0])
+    response = simulate_step(args, {}, axis=0, offset=15, tolerance=16, duration=2)
+    assert response.settle_time == 2
+    assert response.overshoot > 1
+
+def test_search_picks_the_lowest_cost():
+    grid = {'kp': [0.02, 0.1, 1], 'ki': [0], 'kd': [0]}
+    gains, (cost, _, _) = search_gains(make_args(), {}, 0, grid, [15], tolerance=16, overshoot_weight=2, duration=2)
+    assert gains == [0.1, 0, 0]
+    assert cost < 2
@@ -0,0 +1,223 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+import asyncio
+import logging
+import random
+import tempfile
+import threading
+import time
+from argparse import ArgumentParser, Namespace
+from typing import List, NamedTuple, Optional, Tuple
+from nerf_turret_utils.message_framing import encode_json_message
+from nerf_turret_utils.motor_command import decode
+from command_channel import encode_controller_state
+from controller import AIController
+from controller_benchmark import make_args
+from turret_model import TurretModel
+
+
+class Engagement(NamedTuple):
+    azimuth_offset: float
+    elevation_offset: float
+    velocity: Tuple[float, float]
+
+
+class EngagementResult(NamedTuple):
+    time_to_lock: Optional[float] # None if the gun never fired at the target
+    hit_rate: Optional[float] # None if the gun never fired
+    command_count: int
+    max_azimuth_step: int # The largest azimuth angle of a command in degrees, what makes the motion jerky
+
+
+def make_engagements(count: int, max_offsets: Tuple[float, float], max_speed: float, rng: random.Random) -> List[Engagement]:
+    """Creates targets that appear at random offsets from the crosshair and move sideways at random speeds"""
+    return [
+        Engagement(rng.uniform(-max_offsets[0], max_offsets[0]), rng.uniform(-max_offsets[1], max_offsets[1]), (rng.uniform(-max_speed, max_speed), 0))
+        for _ in range(count)
+    ]
+
+
+class TurretSimulator:
+    """Runs the AI controller end to end against a `TurretModel` instead of the camera vision, serial driver and Arduino.
+
+    The simulator connects to the AI controller like the camera vision and sends it the targets
+    message of the model every frame. The AI controller posts its controller states to the simulator,
+    which encodes them as the 2 byte commands of the serial driver and executes them on the model. The
+    model moves on in real time, as the AI controller uses the wall clock for the frame ages, the
+    command rate and the camera timeout.
+    """
+
+    def __init__(self, model: TurretModel, frame_rate: float = 30) -> None:
+        """
+        Args:
+            model: The model of the turret and its target.
+            frame_rate: The amount of frames per second of the virtual camera.
+        """
+        self.model = model
+        self.frame_rate = frame_rate
+        self.command_count = 0
+        self.max_azimuth_step = 0
+        self._lock = threading.Lock() # The AI controller posts from a worker thread
+        self._clock: Optional[float] = None
+        self._frame_id = 0
+
+
+    def execute(self, controller_state: dict) -> None:
+        """Executes a controller state like the serial driver and the Arduino would, the `post` of the AI controller"""
+        command = encode_controller_state(controller_state)
+        with self._lock:
+            self._advance()
+            self.model.execute(command)
+            self.command_count += 1
+            self.max_azimuth_step = max(self.max_azimuth_step, abs(decode(command)['azimuth']))
+
+
+    def _advance(self) -> None:
+        now = time.monotonic()
+        if self._clock is not None and now > self._clock:
+            self.model.advance(now - self._clock)
+        self._clock = now
+
+
+    async def _send_frames(self, writer: asyncio.StreamWriter, duration: float, is_visible: bool) -> None:
+        frame_time = 1 / self.frame_rate
+        next_frame_time = time.monotonic()
+        end_time = next_frame_time + duration
+        while next_frame_time < end_time:
+            await asyncio.sleep(max(next_frame_time - time.monotonic(), 0))
+            with self._lock:
+                self._advance()
+                message = self.model.get_targets_message(self._frame_id, time.time() - self.model.latency)
+            if not is_visible:
+                message['targets'] = []
+            writer.write(encode_json_message(message))
+            await writer.drain()
+            self._frame_id += 1
+            next_frame_time += frame_time
+
+
+    async def run_engagement(self, writer: asyncio.StreamWriter, engagement: Engagement, duration: float) -> EngagementResult:
+        """
+        Shows the AI controller a target for a while.
+
+        Args:
+            writer: The connection to the AI controller.
+            engagement: Where the target appears and how it moves.
+            duration: The amount of seconds the target is visible for.
+
+        Returns:
+            The amount of seconds until the gun first fired at the target, the fraction of the firing time it hit the target, the amount of commands executed and the largest azimuth angle of them.
+        """
+        with self._lock:
+            self._advance()
+            self.model.set_target(engagement.azimuth_offset, engagement.elevation_offset, engagement.velocity)
+            start_time = self.model.time
+            start_command_count = self.command_count
+            self.max_azimuth_step = 0
+
+        await self._send_frames(writer, duration, is_visible=True)
+
+        with self._lock:
+            self._advance()
+            model = self.model
+            return EngagementResult(
+                None if model.first_hit_time is None else model.first_hit_time - start_time,
+                model.hit_time / model.firing_time if model.firing_time else None,
+                self.command_count - start_command_count,
+                self.max_azimuth_step,
+            )
+
+
+    async def run(self, controller_args: Namespace, engagements: List[Engagement], duration: float = 3, gap: float = 0.5) -> List[EngagementResult]:
+        """
+        Starts the AI controller and runs the engagements one after the other.
+
+        Args:
+            controller_args: The arguments of the AI controller, its camera vision host and port are replaced.
+            engagements: The targets to show the AI controller.
+            duration: The amount of seconds each target is visible for.
+            gap: The amount of seconds without targets before each engagement, so the turret stops.
+
+        Returns:
+            The result of each engagement.
+        """
+        path = os.path.join(tempfile.mkdtemp(), 'ai_controller.sock')
+        controller = AIController(Namespace(**{**vars(controller_args), 'ws_host': f'unix://{path}', 'bus': None}), post=self.execute)
+        task = asyncio.ensure_future(controller.run())
+        try:
+            for _ in range(100):
+                if os.path.exists(path):
+                    break
+                await asyncio.sleep(0.01)
+            _, writer = await asyncio.open_unix_connection(path)
+            results = []
+            for engagement in engagements:
+                await self._send_frames(writer, gap, is_visible=False)
+                results.append(await self.run_engagement(writer, engagement, duration))
+            writer.close()
+            return results
+        finally:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+def summarise(results: List[EngagementResult]) -> Tuple[float, Optional[float], Optional[float], float, int]:
+    """
+    Summarises the results of several engagements.
+
+    Returns:
+        The fraction of the engagements the gun fired at the target in, the mean time to lock, the mean hit rate, the mean amount of commands and the largest azimuth angle of a command.
+    """
+    lock_times = [result.time_to_lock for result in results if result.time_to_lock is not None]
+    hit_rates = [result.hit_rate for result in results if result.hit_rate is not None]
+    return (
+        len(lock_times) / len(results),
+        sum(lock_times) / len(lock_times) if lock_times else None,
+        sum(hit_rates) / len(hit_rates) if hit_rates else None,
+        sum(result.command_count for result in results) / len(results),
+        max(result.max_azimuth_step for result in results),
+    )
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser(description="Runs the AI controller end to end against a simulated turret and camera, without any hardware")
+    parser.add_argument("--engagements", "-e", help="The amount of targets to engage.", type=int, default=10)
+    parser.add_argument("--duration", "-d", help="The amount of seconds each target is visible for.", type=float, default=3)
+    parser.add_argument("--gap", "-g", help="The amount of seconds without targets between the engagements.", type=float, default=0.5)
+    parser.add_argument("--max-offsets", "-mo", help="The maximum azimuth and elevation angles in degrees of the targets from the crosshair when they appear.", nargs=2, type=float, default=[25, 10])
+    parser.add_argument("--target-speed", "-ts", help="The maximum speed in degrees per second the targets move sideways at.", type=float, default=5)
+    parser.add_argument("--seed", "-s", help="The seed of the random targets.", type=int, default=0)
+    parser.add_argument("--frame-rate", "-fr", help="The amount of frames per second of the virtual camera.", type=float, default=30)
+    parser.add_argument("--latency", "-l", help="The amount of seconds from capturing a frame until the turret executes its command.", type=float, default=0.1)
+    parser.add_argument("--servo-rate", "-sr", help="How fast the azimuth servo turns in degrees per second.", type=float, default=300)
+    parser.add_argument("--elevation-gear-ratio", "-egr", help="How many turns of the stepper motor turn the elevation once.", type=float, default=10)
+    parser.add_argument("--control-law", "-cl", help="The control law of the AI controller, see ai_controller.py.", choices=['proportional', 'pid'], default='proportional')
+    parser.add_argument("--predict", "-pr", help="Aim ahead of the moving targets, see ai_controller.py.", action='store_true', default=False)
+    parser.add_argument("--control-rate", "-cr", help="The fixed rate of the controller states of the AI controller, see ai_controller.py.", type=float, default=0)
+    parser.add_argument("--max-command-rate", "-mcr", help="The maximum amount of commands per second of the AI controller, see ai_controller.py.", type=float, default=30)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    model = TurretModel(servo_rate=args.servo_rate, elevation_gear_ratio=args.elevation_gear_ratio, latency=args.latency)
+    engagements = make_engagements(args.engagements, tuple(args.max_offsets), args.target_speed, random.Random(args.seed)) # type: ignore
+    controller_args = make_args(control_law=args.control_law, predict=args.predict, control_rate=args.control_rate, max_command_rate=args.max_command_rate)
+    results = asyncio.run(TurretSimulator(model, args.frame_rate).run(controller_args, engagements, args.duration, args.gap))
+
+    print("| Engagement | Azimuth offset | Elevation offset | Speed | Time to lock | Hit rate | Commands | Largest azimuth step |")
+    print("|---|---|---|---|---|---|---|---|")
+    for index, (engagement, result) in enumerate(zip(engagements, results)):
+        time_to_lock = '-' if result.time_to_lock is None else f"{result.time_to_lock:.2f}s"
+        hit_rate = '-' if result.hit_rate is None else f"{result.hit_rate:.0%}"
+        print(f"| {index} | {engagement.azimuth_offset:.1f}° | {engagement.elevation_offset:.1f}° | {engagement.velocity[0]:.1f}°/s | {time_to_lock} | {hit_rate} | {result.command_count} | {result.max_azimuth_step}° |")
+
+    lock_rate, time_to_lock, hit_rate, command_count, max_azimuth_step = summarise(results)
+    print()
+    print(f"Locked on {lock_rate:.0%} of the targets" + ('' if time_to_lock is None else f" after {time_to_lock:.2f}s on average"))
+    print(f"Hit the target {'-' if hit_rate is None else f'{hit_rate:.0%}'} of the firing time, with {command_count:.1f} commands per engagement and azimuth steps of up to {max_azimuth_step}°")
@@ -0,0 +1,30 @@
+import asyncio
+import pytest
+import random
+from controller_benchmark import make_args
+from simulator import Engagement, EngagementResult, TurretSimulator, make_engagements, summarise
+from turret_model import TurretModel
+
+
+def test_make_engagements_stays_within_the_limits():
+    engagements = make_engagements(20, (25, 10), 5, random.Random(0))
+    assert len(engagements) == 20
+    assert all(abs(engagement.azimuth_offset) <= 25 and abs(engagement.elevation_offset) <= 10 for engagement in engagements)
+    assert all(abs(engagement.velocity[0]) <= 5 and engagement.velocity[1] == 0 for engagement in engagements)
+
+def test_summarise_skips_engagements_without_a_lock():
+    results = [EngagementResult(0.2, 1.0, 10, 3), EngagementResult(None, None, 0, 0), EngagementResult(0.4, 0.5, 20, 5)]
+    lock_rate, time_to_lock, hit_rate, command_count, max_azimuth_step = summarise(results)
+    assert lock_rate == 2 / 3
+    assert time_to_lock == pytest.approx(0.3)
+    assert (hit_rate, command_count, max_azimuth_step) == (0.75, 10, 5)
+
+def test_pid_locks_on_end_to_end():
+    simulator = TurretSimulator(TurretModel())
+    engagements = [Engagement(15, 5, (0, 0)), Engagement(-10, -5, (2, 0))]
+    results = asyncio.run(simulator.run(make_args(control_law='pid'), engagements, duration=1, gap=0.2))
+    for result in results:
+        assert result.time_to_lock is not None and result.time_to_lock < 0.6
+        assert result.hit_rate > 0.8
+        assert 0 < result.command_count < 30
+    assert simulator.command_count >= sum(result.command_count for result in results)
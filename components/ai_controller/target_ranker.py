@@ -0,0 +1,124 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from target_tracker import Track
+
+
+class TargetRanker:
+    """Chooses the target to aim at by scoring every candidate and keeps the lock on the chosen track.
+
+    The candidates are the targets with one of the chosen face ids, or of the chosen type otherwise,
+    where a face counts as a person and is preferred as it is part of one. Each candidate scores
+    between 0 and 1 on:
+
+    - priority: the earlier its id is in the chosen ids, or 1 for a face and 0.5 for a person,
+    - distance: how close it is to the crosshair, relative to half the view diagonal,
+    - size: the square root of the fraction of the view its box covers,
+    - age: for how many frames its track has been followed, up to `mature_age`,
+
+    and the weighted scores add up. The track of the chosen target stays locked until another
+    candidate scores more than `switch_margin` higher, so the turret does not swing between two
+    similar targets from frame to frame.
+    """
+
+    def __init__(
+        self,
+        target_type: str,
+        target_ids: Sequence[str] = (),
+        priority_weight: float = 1,
+        distance_weight: float = 0.5,
+        size_weight: float = 0.3,
+        age_weight: float = 0.2,
+        mature_age: int = 30,
+        switch_margin: float = 0.25,
+    ) -> None:
+        """
+        Args:
+            target_type: The type of the targets to aim at.
+            target_ids: The face ids of the targets to aim at, in the order of their priority.
+            priority_weight: The weight of the priority score.
+            distance_weight: The weight of the distance score.
+            size_weight: The weight of the size score.
+            age_weight: The weight of the age score.
+            mature_age: The amount of frames after which a track scores the full age score.
+            switch_margin: How much higher than the locked track another candidate has to score to take the lock.
+        """
+        if target_ids:
+            self.priorities: Dict[Tuple[str, Optional[str]], float] = {
+                ('face', target_id): 1 - rank / len(target_ids) for rank, target_id in enumerate(target_ids)
+            }
+        else:
+            self.priorities = {(target_type, None): 0.5}
+            if target_type == 'person':
+                self.priorities[('face', None)] = 1
+        self.is_by_id = bool(target_ids)
+        self.priority_weight = priority_weight
+        self.distance_weight = distance_weight
+        self.size_weight = size_weight
+        self.age_weight = age_weight
+        self.mature_age = mature_age
+        self.switch_margin = switch_margin
+        self.locked_track_id: Optional[int] = None
+        self.switch_count = 0
+
+
+    def score(self, targets: List[dict], center: Tuple[float, float], view_dimensions: Tuple[float, float], tracks: Optional[List[Track]] = None) -> np.ndarray:
+        """
+        Scores the targets of a frame.
+
+        Args:
+            targets: The targets of the frame.
+            center: The x and y of the crosshair in pixels.
+            view_dimensions: The width and height of the view in pixels.
+            tracks: The track of each target, None to score them all as new.
+
+        Returns:
+            The score of each target, -inf for the targets that are no candidates.
+        """
+        # One row of the priority and the box of each target, to score them all at once
+        get_id = (lambda target: target.get('id')) if self.is_by_id else (lambda target: None)
+        rows = np.array([(self.priorities.get((target['type'], get_id(target)), 0), *target['box'][:4]) for target in targets], dtype=float).reshape(-1, 5)
+        priority, left, top, right, bottom = rows.T
+        view_width, view_height = view_dimensions
+        distance = np.hypot((left + right) / 2 - center[0], (top + bottom) / 2 - center[1]) / (np.hypot(view_width, view_height) / 2)
+        area = np.maximum(right - left, 0) * np.maximum(bottom - top, 0)
+        age = 0.0 if tracks is None else np.array([track.update_count for track in tracks], dtype=float) / self.mature_age
+
+        scores = (
+            self.priority_weight * priority
+            + self.distance_weight * (1 - np.minimum(distance, 1))
+            + self.size_weight * np.sqrt(np.minimum(area / (view_width * view_height), 1))
+            + self.age_weight * np.minimum(age, 1)
+        )
+        scores[priority <= 0] = -np.inf
+        return scores
+
+
+    def select(self, targets: List[dict], center: Tuple[float, float], view_dimensions: Tuple[float, float], tracks: Optional[List[Track]] = None) -> Optional[int]:
+        """
+        Chooses the target to aim at and locks on its track.
+
+        Args:
+            targets: The targets of the frame.
+            center: The x and y of the crosshair in pixels.
+            view_dimensions: The width and height of the view in pixels.
+            tracks: The track of each target from a `TargetTracker`, None to not keep a lock.
+
+        Returns:
+            The index of the chosen target, or None if no target is a candidate.
+        """
+        if not targets:
+            return None
+        scores = self.score(targets, center, view_dimensions, tracks)
+        best_index = int(np.argmax(scores))
+        if scores[best_index] == -np.inf:
+            return None
+        if tracks is None:
+            return best_index
+
+        locked_index = next((index for index, track in enumerate(tracks) if track.track_id == self.locked_track_id), None)
+        if locked_index is not None and scores[locked_index] > -np.inf and scores[best_index] - scores[locked_index] <= self.switch_margin:
+            return locked_index
+        if self.locked_track_id is not None:
+            self.switch_count += 1
+        self.locked_track_id = tracks[best_index].track_id
+        return best_index
@@ -0,0 +1,76 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+import random
+from argparse import ArgumentParser
+from typing import List
+from nerf_turret_utils.target_codec_benchmark import make_message, time_per_call
+from ai_controller_utils import get_priority_target_index
+from target_ranker import TargetRanker
+from target_tracker import TargetTracker
+
+
+def count_switches(selection: str, frame_count: int, rng: random.Random) -> int:
+    """
+    Counts how often the chosen person changes while two people stand either side of the crosshair.
+
+    The camera vision lists the detections in no particular order and their boxes jitter by a few pixels.
+
+    Args:
+        selection: 'first' for `get_priority_target_index`, 'ranked' for the `TargetRanker`.
+        frame_count: The amount of frames to simulate.
+        rng: The random generator of the order and the jitter.
+
+    Returns:
+        The amount of frames the chosen person was another one than in the frame before.
+    """
+    ranker = TargetRanker('person')
+    tracker = TargetTracker()
+    previous_name = None
+    switch_count = 0
+    for frame_id in range(frame_count):
+        people = []
+        for name, center_x in (('left', 250), ('right', 390)):
+            jitter_x, jitter_y = rng.uniform(-3, 3), rng.uniform(-3, 3)
+            people.append((name, {'type': 'person', 'box': [center_x - 50 + jitter_x, 140 + jitter_y, center_x + 50 + jitter_x, 340 + jitter_y]}))
+        rng.shuffle(people)
+        targets = [target for _, target in people]
+        if selection == 'ranked':
+            index = ranker.select(targets, (320, 240), (640, 480), tracker.update(targets, frame_id / 30))
+        else:
+            index = get_priority_target_index(targets, 'person')
+        name = people[index][0] # type: ignore
+        switch_count += previous_name is not None and name != previous_name
+        previous_name = name
+    return switch_count
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser(description="Measures how long choosing the target takes and how often the choice changes between two similar people")
+    parser.add_argument("--target-counts", "-tc", help="The amounts of candidates per frame to measure", nargs='+', type=int, default=[1, 5, 20, 50, 100, 200])
+    parser.add_argument("--runs", "-r", help="The amount of times each frame is ranked", type=int, default=500)
+    parser.add_argument("--frames", "-f", help="The amount of frames of the two people", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+
+    print("| Candidates | First match | Ranking | Tracking and ranking |")
+    print("|---|---|---|---|")
+    for target_count in args.target_counts:
+        targets: List[dict] = make_message(target_count, rng)['targets']
+        for target in targets:
+            target['type'] = 'person'
+        ranker = TargetRanker('person')
+        tracker = TargetTracker()
+        frame_times = iter(range(10 ** 9))
+        first = time_per_call(lambda: get_priority_target_index(targets, 'person'), args.runs)
+        ranking = time_per_call(lambda: ranker.select(targets, (320, 240), (640, 480)), args.runs)
+        tracking = time_per_call(lambda: ranker.select(targets, (320, 240), (640, 480), tracker.update(targets, next(frame_times) / 30)), args.runs)
+        print(f"| {target_count} | {first:.1f}µs | {ranking:.1f}µs | {tracking:.1f}µs |")
+
+    print()
+    for selection in ('first', 'ranked'):
+        print(f"{selection}: the chosen person changed in {count_switches(selection, args.frames, random.Random(0))} of {args.frames} frames")
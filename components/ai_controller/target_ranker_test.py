@@ -0,0 +1,64 @@
+import pytest
+from target_ranker import TargetRanker
+from target_tracker import TargetTracker
+
+
+def box(center_x: float, center_y: float = 240, width: float = 100, height: float = 200) -> list:
+    return [center_x - width / 2, center_y - height / 2, center_x + width / 2, center_y + height / 2]
+
+
+def test_prefers_faces_over_people():
+    ranker = TargetRanker('person')
+    targets = [{'type': 'person', 'box': box(320)}, {'type': 'dog', 'box': box(320)}, {'type': 'face', 'box': box(500, 100, 40, 40)}]
+    assert ranker.select(targets, (320, 240), (640, 480)) == 2
+
+def test_only_targets_of_the_type_are_candidates():
+    ranker = TargetRanker('dog')
+    scores = ranker.score([{'type': 'person', 'box': box(320)}, {'type': 'dog', 'box': box(100)}], (320, 240), (640, 480))
+    assert scores[0] == -float('inf') and scores[1] > 0
+    assert ranker.select([{'type': 'person', 'box': box(320)}], (320, 240), (640, 480)) is None
+    assert ranker.select([], (320, 240), (640, 480)) is None
+
+def test_prefers_ids_in_their_order():
+    ranker = TargetRanker('face', ['bob', 'alice'])
+    targets = [{'type': 'face', 'box': box(320), 'id': 'alice'}, {'type': 'face', 'box': box(600), 'id': 'bob'}, {'type': 'face', 'box': box(320), 'id': 'eve'}]
+    assert ranker.select(targets, (320, 240), (640, 480)) == 1
+
+def test_prefers_close_big_and_old_targets():
+    ranker = TargetRanker('person')
+    center, view = (320, 240), (640, 480)
+    scores = ranker.score([{'type': 'person', 'box': box(320)}, {'type': 'person', 'box': box(500)}], center, view)
+    assert scores[0] > scores[1]
+    scores = ranker.score([{'type': 'person', 'box': box(320, width=50)}, {'type': 'person', 'box': box(320)}], center, view)
+    assert scores[1] > scores[0]
+
+    tracker = TargetTracker()
+    tracker.update([{'type': 'person', 'box': box(200)}], timestamp=0)
+    targets = [{'type': 'person', 'box': box(200)}, {'type': 'person', 'box': box(440)}]
+    scores = ranker.score(targets, center, view, tracker.update(targets, timestamp=0.1))
+    assert scores[0] > scores[1]
+
+def test_keeps_the_lock_until_another_target_scores_the_margin_higher():
+    ranker = TargetRanker('person', switch_margin=0.25)
+    tracker = TargetTracker()
+    def select(targets, timestamp):
+        return ranker.select(targets, (320, 240), (640, 480), tracker.update(targets, timestamp))
+
+    # Two people either side of the crosshair, the detections come in either order
+    assert select([{'type': 'person', 'box': box(300)}, {'type': 'person', 'box': box(360)}], timestamp=0) == 0
+    assert select([{'type': 'person', 'box': box(362)}, {'type': 'person', 'box': box(300)}], timestamp=0.1) == 1
+    assert select([{'type': 'person', 'box': box(298)}, {'type': 'person', 'box': box(340)}], timestamp=0.2) == 0
+    assert ranker.switch_count == 0
+
+    # The locked person walks away from the crosshair
+    assert select([{'type': 'person', 'box': box(20)}, {'type': 'person', 'box': box(330)}], timestamp=0.3) == 1
+    assert ranker.switch_count == 1
+
+def test_locks_on_another_target_once_the_locked_one_is_gone():
+    ranker = TargetRanker('person')
+    tracker = TargetTracker(max_distance=50)
+    ranker.select([{'type': 'person', 'box': box(320)}], (320, 240), (640, 480), tracker.update([{'type': 'person', 'box': box(320)}], timestamp=0))
+    locked_track_id = ranker.locked_track_id
+    targets = [{'type': 'person', 'box': box(100)}]
+    assert ranker.select(targets, (320, 240), (640, 480), tracker.update(targets, timestamp=0.1)) == 0
+    assert ranker.locked_track_id != locked_track_id
@@ -0,0 +1,199 @@
+import math
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+
+MAX_LEAD_TIME = 0.5 # Predicting further ahead than this mostly extrapolates noise
+VECTORIZE_MIN_PAIRS = 100 # Below this amount of targets times tracks the overhead of numpy outweighs the vectorized pass
+
+
+def get_box_center(box: List[float]) -> Tuple[float, float]:
+    """Gets the center of a [left, top, right, bottom] box"""
+    left, top, right, bottom = box[:4]
+    return (left + right) / 2, (top + bottom) / 2
+
+
+class Track:
+    """Follows the box center of one target with a constant velocity (alpha-beta) filter.
+
+    Each measurement moves the estimated position and velocity towards what was measured. A higher
+    `alpha` trusts the measured position more, a higher `beta` lets the velocity follow changes in
+    speed faster, both at the cost of passing on more of the jitter of the detections.
+    """
+
+    def __init__(self, track_id: int, target: dict, timestamp: float, alpha: float = 0.6, beta: float = 0.3) -> None:
+        """
+        Args:
+            track_id: The id of the track, unique within its tracker.
+            target: The first target of the track, with its 'type', 'box' and optional 'id'.
+            timestamp: The time in seconds the frame of the target was captured at.
+            alpha: The position gain of the filter, between 0 and 1.
+            beta: The velocity gain of the filter, between 0 and 1.
+        """
+        self.track_id = track_id
+        self.type = target['type']
+        self.target_id = target.get('id')
+        self.alpha = alpha
+        self.beta = beta
+        self.x, self.y = get_box_center(target['box'])
+        self.velocity_x = 0.0
+        self.velocity_y = 0.0
+        self.timestamp = timestamp
+        self.update_count = 1
+
+
+    def update(self, target: dict, timestamp: float) -> None:
+        """
+        Corrects the estimate with the target measured in a newer frame.
+
+        Args:
+            target: The target of the frame.
+            timestamp: The time in seconds the frame was captured at.
+        """
+        measured_x, measured_y = get_box_center(target['box'])
+        dt = timestamp - self.timestamp
+        if dt <= 0:
+            # A frame without a newer timestamp can not tell the velocity
+            self.x, self.y = measured_x, measured_y
+            return
+        predicted_x, predicted_y = self.predict(timestamp)
+        residual_x, residual_y = measured_x - predicted_x, measured_y - predicted_y
+        self.x = predicted_x + self.alpha * residual_x
+        self.y = predicted_y + self.alpha * residual_y
+        self.velocity_x += self.beta * residual_x / dt
+        self.velocity_y += self.beta * residual_y / dt
+        self.timestamp = timestamp
+        self.update_count += 1
+
+
+    def predict(self, timestamp: float) -> Tuple[float, float]:
+        """
+        Predicts the box center at a time, at most `MAX_LEAD_TIME` after the last frame.
+
+        Args:
+            timestamp: The time in seconds to predict the center at.
+
+        Returns:
+            The x and y of the predicted center in pixels.
+        """
+        dt = min(timestamp - self.timestamp, MAX_LEAD_TIME)
+        return self.x + self.velocity_x * dt, self.y + self.velocity_y * dt
+
+
+    def get_lead(self, target: dict, lead_time: float) -> Tuple[float, float]:
+        """
+        Gets how far the target will have moved from where it was measured in the last frame.
+
+        Args:
+            target: The target of the last frame.
+            lead_time: The amount of seconds after the capture of the last frame, e.g. until the turret executes the command.
+
+        Returns:
+            The x and y offsets in pixels to move the box of the target by.
+        """
+        center_x, center_y = get_box_center(target['box'])
+        predicted_x, predicted_y = self.predict(self.timestamp + lead_time)
+        return predicted_x - center_x, predicted_y - center_y
+
+
+class TargetTracker:
+    """Assigns the targets of consecutive frames to tracks, to estimate how each of them moves.
+
+    Targets with an 'id' stay on the track of that id. The others go to the nearest track of the
+    same type within `max_distance` pixels of its predicted center, or start a new track. Tracks
+    without a target for `max_age` seconds are dropped.
+    """
+
+    def __init__(self, max_distance: float = 100, max_age: float = 0.5, alpha: float = 0.6, beta: float = 0.3) -> None:
+        """
+        Args:
+            max_distance: The maximum distance in pixels between a target and the predicted center of its track.
+            max_age: The amount of seconds a track is kept without a target.
+            alpha: The position gain of the track filters.
+            beta: The velocity gain of the track filters.
+        """
+        self.max_distance = max_distance
+        self.max_age = max_age
+        self.alpha = alpha
+        self.beta = beta
+        self.tracks: Dict[int, Track] = {}
+        self._next_track_id = 0
+
+
+    def update(self, targets: List[dict], timestamp: float) -> List[Track]:
+        """
+        Assigns the targets of a frame to tracks and corrects the tracks with them.
+
+        Args:
+            targets: The targets of the frame.
+            timestamp: The time in seconds the frame was captured at.
+
+        Returns:
+            The track of each target, in the order of the targets.
+        """
+        self.tracks = {track_id: track for track_id, track in self.tracks.items() if timestamp - track.timestamp <= self.max_age}
+        unmatched = dict(self.tracks)
+        assigned: List[Optional[Track]] = [None] * len(targets)
+
+        # Targets with an id keep their track, the others take the nearest free track first
+        tracks = list(unmatched.values())
+        if len(targets) * len(tracks) < VECTORIZE_MIN_PAIRS:
+            candidates = self._get_candidates(targets, tracks, timestamp)
+        else:
+            candidates = self._get_candidates_vectorized(targets, tracks, timestamp)
+        assigned_count = 0
+        for index, track in candidates:
+            if assigned[index] is not None or track.track_id not in unmatched:
+                continue
+            del unmatched[track.track_id]
+            track.update(targets[index], timestamp)
+            assigned[index] = track
+            assigned_count += 1
+            if assigned_count == len(targets) or not unmatched:
+                break
+
+        for index, target in enumerate(targets):
+            if assigned[index] is None:
+                track = Track(self._next_track_id, target, timestamp, self.alpha, self.beta)
+                self.tracks[track.track_id] = track
+                self._next_track_id += 1
+                assigned[index] = track
+        return assigned # type: ignore
+
+
+    def _get_candidates(self, targets: List[dict], tracks: List[Track], timestamp: float) -> List[Tuple[int, Track]]:
+        """Gets the pairs of target indices and tracks a target may be assigned to, in the order to assign them"""
+        candidates = []
+        for index, target in enumerate(targets):
+            center_x, center_y = get_box_center(target['box'])
+            for track in tracks:
+                if track.type != target['type'] or track.target_id != target.get('id'):
+                    continue
+                predicted_x, predicted_y = track.predict(timestamp)
+                distance = math.hypot(center_x - predicted_x, center_y - predicted_y)
+                if track.target_id is not None or distance <= self.max_distance:
+                    candidates.append((track.target_id is None, distance, index, track.track_id, track))
+        return [(index, track) for _, _, index, _, track in sorted(candidates, key=lambda candidate: candidate[:4])]
+
+
+    def _get_candidates_vectorized(self, targets: List[dict], tracks: List[Track], timestamp: float) -> Iterator[Tuple[int, Track]]:
+        """Like `_get_candidates`, comparing every target with every track in one pass for crowded frames"""
+        key_codes: Dict[Tuple[str, Optional[str]], int] = {}
+        target_keys = np.array([key_codes.setdefault((target['type'], target.get('id')), len(key_codes)) for target in targets])
+        track_keys = np.array([key_codes.setdefault((track.type, track.target_id), len(key_codes)) for track in tracks])
+        centers = np.array([get_box_center(target['box']) for target in targets], dtype=float)
+        predicted = np.array([track.predict(timestamp) for track in tracks], dtype=float)
+        delta_x = centers[:, 0, None] - predicted[:, 0]
+        delta_y = centers[:, 1, None] - predicted[:, 1]
+        squared_distances = delta_x * delta_x + delta_y * delta_y # Cheaper than np.hypot, only the candidates need the root
+        has_id = np.array([track.target_id is not None for track in tracks])
+        is_candidate = (target_keys[:, None] == track_keys) & (has_id | (squared_distances <= self.max_distance ** 2))
+        indices, track_indices = np.nonzero(is_candidate)
+        # Sort the tracks with an id first and then by distance, np.nonzero already ordered the ties by target and track id
+        sort_keys = np.sqrt(squared_distances[indices, track_indices])
+        is_id_candidate = has_id[track_indices]
+        if is_id_candidate.any():
+            sort_keys[is_id_candidate] -= sort_keys.max() + 1
+        order = np.argsort(sort_keys, kind='stable')
+        # Lazily, as the assignment usually stops long before the last candidate
+        return ((index, tracks[track_index]) for index, track_index in zip(indices[order].tolist(), track_indices[order].tolist()))
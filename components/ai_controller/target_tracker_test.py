@@ -0,0 +1,72 @@
+import pytest
+import random
+from target_tracker import MAX_LEAD_TIME, TargetTracker, Track
+
+
+def person(center_x: float, center_y: float = 200, **details) -> dict:
+    return {'type': 'person', 'box': [center_x - 50, center_y - 100, center_x + 50, center_y + 100], **details}
+
+
+def test_track_learns_a_constant_velocity():
+    track = Track(0, person(100), timestamp=0)
+    for step in range(1, 30):
+        track.update(person(100 + 300 * step / 30), timestamp=step / 30)
+
+    assert track.velocity_x == pytest.approx(300, rel=0.01)
+    assert track.velocity_y == pytest.approx(0, abs=1e-6)
+    assert track.predict(track.timestamp + 0.1)[0] == pytest.approx(track.x + 30, rel=0.01)
+
+def test_track_limits_the_lead_time():
+    track = Track(0, person(100), timestamp=0)
+    track.velocity_x = 100
+    assert track.predict(10)[0] == pytest.approx(100 + 100 * MAX_LEAD_TIME)
+
+def test_track_ignores_frames_without_a_newer_timestamp():
+    track = Track(0, person(100), timestamp=1)
+    track.update(person(110), timestamp=1)
+    assert (track.x, track.velocity_x) == (110, 0)
+
+def test_lead_is_relative_to_the_measured_box():
+    track = Track(0, person(100), timestamp=0)
+    track.update(person(110), timestamp=0.1)
+    lead_x, lead_y = track.get_lead(person(110), lead_time=0.2)
+    assert lead_x > 0
+    assert lead_y == pytest.approx(0)
+
+
+def test_tracker_follows_targets_by_distance():
+    tracker = TargetTracker(max_distance=100)
+    first = tracker.update([person(100), person(400)], timestamp=0)
+    # The targets swapped places in the list but not in the view
+    second = tracker.update([person(410), person(90)], timestamp=0.1)
+    assert [track.track_id for track in first] == [0, 1]
+    assert [track.track_id for track in second] == [1, 0]
+
+def test_tracker_starts_new_tracks_for_far_or_other_targets():
+    tracker = TargetTracker(max_distance=100)
+    tracker.update([person(100)], timestamp=0)
+    tracks = tracker.update([person(300), {**person(100), 'type': 'dog'}], timestamp=0.1)
+    assert [track.track_id for track in tracks] == [1, 2]
+
+def test_tracker_keeps_the_track_of_an_id():
+    tracker = TargetTracker(max_distance=10)
+    tracker.update([person(100, id='a'), person(500, id='b')], timestamp=0)
+    tracks = tracker.update([person(520, id='a'), person(120, id='b')], timestamp=0.1)
+    assert [track.track_id for track in tracks] == [0, 1]
+
+def test_tracker_drops_old_tracks():
+    tracker = TargetTracker(max_age=0.5)
+    tracker.update([person(100)], timestamp=0)
+    tracks = tracker.update([person(100)], timestamp=1)
+    assert tracks[0].track_id == 1
+    assert list(tracker.tracks) == [1]
+
+def test_crowds_are_assigned_like_few_targets():
+    rng = random.Random(0)
+    tracker = TargetTracker()
+    targets = [{**person(rng.uniform(0, 640), rng.uniform(0, 480)), 'type': rng.choice(['person', 'face'])} for _ in range(30)]
+    tracker.update(targets, timestamp=0)
+    moved = [{**target, 'box': [value + rng.uniform(-20, 20) for value in target['box']]} for target in targets]
+    tracks = list(tracker.tracks.values())
+    assert list(tracker._get_candidates_vectorized(moved, tracks, 0.1)) == tracker._get_candidates(moved, tracks, 0.1)
+    assert [track.track_id for track in tracker.update(moved, timestamp=0.1)] == list(range(30))
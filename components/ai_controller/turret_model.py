@@ -0,0 +1,214 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+from nerf_turret_utils.motor_command import decode
+from nerf_turret_utils.number_utils import map_range
+
+
+## The constants of the Arduino sketch in arduino/src/control_via_serial
+STEP_ANGLE = 360 / 200 # stepsPerRevolution
+SLOWEST_HALF_STEP_MILLISECONDS = 5
+FASTEST_HALF_STEP_MILLISECONDS = 1
+SLOWEST_STEP_SPEED = 80
+MAX_AZIMUTH_DEG_RANGE = 180
+
+
+def get_steps_per_second(speed: int) -> float:
+    """
+    Gets how many steps per second the Arduino makes the elevation stepper motor take at a speed.
+
+    Args:
+        speed: The elevation speed of the command, between 0 and 10.
+
+    Returns:
+        The amount of full steps per second, 0 if the motor stands still.
+    """
+    if speed < 1:
+        return 0
+    interval_ms = max(int(map_range(speed, 0, 10, SLOWEST_STEP_SPEED, FASTEST_HALF_STEP_MILLISECONDS)), FASTEST_HALF_STEP_MILLISECONDS)
+    # Slow speeds make a full step per interval, fast ones a half step
+    return 1000 / interval_ms if interval_ms > SLOWEST_HALF_STEP_MILLISECONDS else 1000 / (2 * interval_ms)
+
+
+class TurretModel:
+    """A kinematic model of the turret as seen through its camera, to simulate the control laws offline.
+
+    The azimuth servo is sent to its current angle plus the azimuth angle of every command and turns
+    there at `servo_rate`. The elevation stepper turns at the rate of the speed of the latest
+    command for as long as it lasts. The model tracks the offset of a target from the crosshair in
+    degrees and reports it in pixels as the camera would have seen it `latency` seconds ago, which
+    stands for the whole camera vision, controller and serial link pipeline. It also keeps count of
+    how long the gun fired since the target was placed, how much of that it hit the target and when
+    it hit it first.
+    """
+
+    def __init__(
+        self,
+        view_dimensions: Tuple[int, int] = (640, 480),
+        field_of_view: Tuple[float, float] = (60, 45),
+        servo_rate: float = 300,
+        elevation_gear_ratio: float = 10,
+        latency: float = 0.1,
+        target_size: Tuple[float, float] = (100, 200),
+    ) -> None:
+        """
+        Args:
+            view_dimensions: The width and height of the camera view in pixels.
+            field_of_view: The horizontal and vertical field of view of the camera in degrees.
+            servo_rate: How fast the azimuth servo turns in degrees per second.
+            elevation_gear_ratio: How many turns of the stepper motor turn the elevation once.
+            latency: The amount of seconds from capturing a frame until the command computed from it is executed.
+            target_size: The width and height in pixels of the box of the target, the default is roughly a person a few meters away.
+        """
+        self.view_dimensions = view_dimensions
+        self.pixels_per_degree = (view_dimensions[0] / field_of_view[0], view_dimensions[1] / field_of_view[1])
+        self.servo_rate = servo_rate
+        self.elevation_gear_ratio = elevation_gear_ratio
+        self.latency = latency
+        self.target_size = target_size
+        self.time = 0.0
+        self.servo_angle = MAX_AZIMUTH_DEG_RANGE / 2
+        self.servo_target_angle = self.servo_angle
+        self.elevation_angle = 0.0
+        self.elevation_rate = 0.0
+        self.target_angles = (self.servo_angle, 0.0)
+        self.target_velocity = (0.0, 0.0)
+        self.is_firing = False
+        self.firing_time = 0.0
+        self.hit_time = 0.0
+        self.first_hit_time: Optional[float] = None
+        self._history: Deque[Tuple[float, float, float]] = deque()
+
+
+    def set_target(self, azimuth_offset: float, elevation_offset: float, velocity: Tuple[float, float] = (0, 0)) -> None:
+        """
+        Places the target relative to where the turret points.
+
+        Args:
+            azimuth_offset: The angle in degrees the turret has to turn the azimuth by to aim at the target.
+            elevation_offset: The angle in degrees the turret has to turn the elevation by to aim at the target.
+            velocity: How fast the target moves on both axes in degrees per second.
+        """
+        self.target_angles = (self.servo_angle + azimuth_offset, self.elevation_angle + elevation_offset)
+        self.target_velocity = velocity
+        self.firing_time = 0.0
+        self.hit_time = 0.0
+        self.first_hit_time = None
+        self._history.clear()
+
+
+    @property
+    def offset(self) -> Tuple[float, float]:
+        """The angles in degrees the turret has to turn the azimuth and elevation by to aim at the target"""
+        return self.target_angles[0] - self.servo_angle, self.target_angles[1] - self.elevation_angle
+
+
+    @property
+    def is_on_target(self) -> bool:
+        """Whether the crosshair is within the box of the target right now"""
+        offset_x, offset_y = self.offset
+        return (
+            abs(offset_x) * self.pixels_per_degree[0] <= self.target_size[0] / 2
+            and abs(offset_y) * self.pixels_per_degree[1] <= self.target_size[1] / 2
+        )
+
+
+    def get_pixel_offset(self) -> Tuple[float, float]:
+        """
+        Gets where the camera saw the target relative to the crosshair `latency` seconds ago.
+
+        Returns:
+            The x and y offsets in pixels of the target center from the crosshair.
+        """
+        offset_x, offset_y = self.offset
+        observed_time = self.time - self.latency
+        while len(self._history) > 1 and self._history[1][0] <= observed_time:
+            self._history.popleft()
+        if self._history:
+            # The oldest offset left is the one at the observed time, or where the target started
+            _, offset_x, offset_y = self._history[0]
+        # The target appears on the other side of the crosshair than the way the turret has to turn
+        return -offset_x * self.pixels_per_degree[0], -offset_y * self.pixels_per_degree[1]
+
+
+    def get_targets_message(self, frame_id: int, capture_time: float) -> Dict[str, Any]:
+        """
+        Creates the targets message the camera vision would send for the target, as it saw it `latency` seconds ago.
+
+        Args:
+            frame_id: The id of the frame.
+            capture_time: The time the frame was captured at, `latency` seconds before the current time.
+
+        Returns:
+            The targets message with the target as a person.
+        """
+        view_width, view_height = self.view_dimensions
+        center_x, center_y = view_width / 2, view_height / 2
+        offset_x, offset_y = self.get_pixel_offset()
+        box_x, box_y = center_x + offset_x, center_y + offset_y
+        width, height = self.target_size
+        return {
+            'frame_id': frame_id,
+            'capture_time': capture_time,
+            'targets': [{'type': 'person', 'box': [box_x - width / 2, box_y - height / 2, box_x + width / 2, box_y + height / 2]}],
+            'heading_vect': [center_x, center_y],
+            'view_dimensions': [view_width, view_height],
+        }
+
+
+    def command(self, controller_state: dict) -> None:
+        """
+        Executes a controller state like the serial driver and the Arduino would.
+
+        Args:
+            controller_state: The controller state with the 'azimuth_angle', 'is_clockwise' and 'speed'.
+        """
+        new_angle = self.servo_target_angle + round(controller_state.get('azimuth_angle', 0))
+        if 0 <= new_angle <= MAX_AZIMUTH_DEG_RANGE:
+            self.servo_target_angle = new_angle
+        degrees_per_second = get_steps_per_second(round(controller_state.get('speed', 0))) * STEP_ANGLE / self.elevation_gear_ratio
+        self.elevation_rate = -degrees_per_second if controller_state.get('is_clockwise') else degrees_per_second
+        self.is_firing = bool(controller_state.get('is_firing'))
+
+
+    def execute(self, command: bytes) -> None:
+        """
+        Executes a 2 byte command like the Arduino would.
+
+        Args:
+            command: The command the serial driver writes to the Arduino.
+        """
+        values = decode(command)
+        self.command({'azimuth_angle': values['azimuth'], 'is_clockwise': values['is_clockwise'], 'speed': values['speed'], 'is_firing': values['is_firing']})
+
+
+    def advance(self, dt: float, substeps: int = 4) -> None:
+        """
+        Moves the turret and the target on.
+
+        Args:
+            dt: The amount of seconds to move on.
+            substeps: The amount of integration steps.
+        """
+        step = dt / substeps
+        for _ in range(substeps):
+            self._history.append((self.time, *self.offset))
+            servo_delta = self.servo_target_angle - self.servo_angle
+            max_delta = self.servo_rate * step
+            self.servo_angle += max(-max_delta, min(max_delta, servo_delta))
+            if self.is_firing:
+                self.firing_time += step
+                if self.is_on_target:
+                    self.hit_time += step
+                    if self.first_hit_time is None:
+                        self.first_hit_time = self.time
+            self.elevation_angle += self.elevation_rate * step
+            self.target_angles = (
+                self.target_angles[0] + self.target_velocity[0] * step,
+                self.target_angles[1] + self.target_velocity[1] * step,
+            )
+            self.time += step
@@ -0,0 +1,72 @@
+import pytest
+from nerf_turret_utils.motor_command import encode
+from turret_model import TurretModel, get_steps_per_second
+
+
+def test_steps_per_second_follow_the_arduino_speeds():
+    assert get_steps_per_second(0) == 0
+    assert get_steps_per_second(1) == pytest.approx(1000 / 72)
+    assert get_steps_per_second(10) == 500 # Half steps every millisecond
+    assert all(get_steps_per_second(speed) < get_steps_per_second(speed + 1) for speed in range(10))
+
+def test_target_appears_opposite_to_the_turn():
+    model = TurretModel(view_dimensions=(600, 450), field_of_view=(60, 45), latency=0)
+    model.set_target(10, -5)
+    assert model.get_pixel_offset() == (-100, 50)
+
+def test_azimuth_turns_by_the_angle_at_the_servo_rate():
+    model = TurretModel(servo_rate=100)
+    model.set_target(30, 0)
+    model.command({'azimuth_angle': 20.4, 'is_clockwise': False, 'speed': 0})
+    model.advance(0.1)
+    assert model.offset[0] == pytest.approx(20)
+    model.advance(0.5)
+    assert model.offset[0] == pytest.approx(10)
+
+def test_azimuth_ignores_angles_out_of_range():
+    model = TurretModel()
+    model.command({'azimuth_angle': 100, 'is_clockwise': False, 'speed': 0})
+    model.advance(1)
+    assert model.servo_angle == 90
+
+def test_elevation_turns_while_the_speed_lasts():
+    model = TurretModel(elevation_gear_ratio=10)
+    model.set_target(0, 10)
+    model.command({'azimuth_angle': 0, 'is_clockwise': False, 'speed': 10})
+    model.advance(0.1)
+    assert model.offset[1] == pytest.approx(10 - 9) # 500 steps of 1.8 degrees per second through the gears
+    model.command({'azimuth_angle': 0, 'is_clockwise': True, 'speed': 10})
+    model.advance(0.1)
+    assert model.offset[1] == pytest.approx(10)
+
+def test_camera_sees_the_offset_of_the_latency_ago():
+    model = TurretModel(view_dimensions=(600, 450), field_of_view=(60, 45), latency=0.2)
+    model.set_target(0, 0, velocity=(10, 0))
+    for _ in range(10):
+        model.advance(0.05)
+    assert model.offset[0] == pytest.approx(5)
+    assert model.get_pixel_offset()[0] == pytest.approx(-30)
+
+def test_executes_the_2_byte_commands():
+    model = TurretModel()
+    model.execute(encode(-10, True, 10, True))
+    model.advance(0.1)
+    assert model.servo_target_angle == 80
+    assert model.elevation_rate < 0
+    assert model.is_firing
+
+def test_counts_the_firing_time_on_target():
+    model = TurretModel(view_dimensions=(600, 450), field_of_view=(60, 45), target_size=(100, 200))
+    model.set_target(4, 0, velocity=(2, 0))
+    model.command({'azimuth_angle': 0, 'is_clockwise': False, 'speed': 0, 'is_firing': True})
+    model.advance(1, substeps=100) # The target leaves the box 5 degrees from the crosshair after half a second
+    assert model.firing_time == pytest.approx(1)
+    assert model.hit_time == pytest.approx(0.5, abs=0.02)
+    assert model.first_hit_time == 0
+
+def test_targets_message_shows_the_target_box():
+    model = TurretModel(view_dimensions=(600, 450), field_of_view=(60, 45), latency=0, target_size=(100, 200))
+    model.set_target(10, 0)
+    message = model.get_targets_message(frame_id=3, capture_time=1.5)
+    assert message['targets'] == [{'type': 'person', 'box': [150, 125, 250, 325]}]
+    assert (message['frame_id'], message['capture_time'], message['heading_vect']) == (3, 1.5, [300, 225])
@@ -0,0 +1,107 @@
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+
+class AsyncDetector:
+    """Runs a detection function on a worker thread so the caller can capture, draw and publish meanwhile.
+
+    Frames are submitted with a frame id and the results come back together with the id and the
+    exact frame they were computed on, in submission order, so results are never matched to the wrong frame.
+    The number of frames waiting for or in detection is bounded by `max_in_flight`.
+    """
+
+    def __init__(self, detect: Callable[..., Any], max_in_flight: int = 1) -> None:
+        """
+        Args:
+            detect: The function run on the worker thread. It is called with the frame and any extra submit arguments.
+            max_in_flight: The maximum amount of frames that have been submitted but whose results were not collected yet.
+        """
+        assert max_in_flight >= 1, 'max_in_flight must be at least 1'
+        self.detect = detect
+        self.max_in_flight = max_in_flight
+        self._pending_frames: Dict[int, np.ndarray] = {}
+        self._last_submitted_id = None
+        self._inputs: queue.Queue = queue.Queue()
+        self._results: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='async-detector', daemon=True)
+        self._thread.start()
+
+
+    @property
+    def in_flight(self) -> int:
+        """The amount of frames that were submitted and whose results were not collected yet"""
+        return len(self._pending_frames)
+
+
+    def submit(self, frame_id: int, frame: np.ndarray, *args: Any) -> bool:
+        """
+        Queues a frame for detection unless the in flight limit is reached.
+
+        Args:
+            frame_id: A frame id that is larger than the id of every previously submitted frame.
+            frame: The frame to run the detection on. It must not be modified until its result is collected.
+            *args: Extra arguments passed on to the detection function.
+
+        Returns:
+            True if the frame was queued, False if it was dropped because too many frames are in flight.
+        """
+        assert self._last_submitted_id is None or frame_id > self._last_submitted_id, 'frame ids must increase'
+        if self.in_flight >= self.max_in_flight:
+            return False
+
+        self._last_submitted_id = frame_id
+        self._pending_frames[frame_id] = frame
+        self._inputs.put((frame_id, frame, args))
+        return True
+
+
+    def get_results(self, block: bool = False, timeout: Optional[float] = None) -> List[Tuple[int, np.ndarray, Any]]:
+        """
+        Collects the results of all frames that finished detection.
+
+        Args:
+            block: Whether to wait for at least one result when none is ready and a frame is in flight.
+            timeout: The maximum time in seconds to wait when blocking.
+
+        Returns:
+            A list of (frame id, frame, detection result) tuples in submission order.
+        """
+        completed = []
+        try:
+            if block and self.in_flight > 0:
+                completed.append(self._results.get(timeout=timeout))
+            while True:
+                completed.append(self._results.get_nowait())
+        except queue.Empty:
+            pass
+
+        matched = []
+        for frame_id, result in completed:
+            expected_id = min(self._pending_frames)
+            assert frame_id == expected_id, f'got the result for frame {frame_id} but expected frame {expected_id}'
+            matched.append((frame_id, self._pending_frames.pop(frame_id), result))
+        return matched
+
+
+    def stop(self) -> None:
+        """Stops the worker thread after the frames in flight are processed"""
+        self._inputs.put(None)
+        self._thread.join()
+
+
+    def _run(self) -> None:
+        while True:
+            item = self._inputs.get()
+            if item is None:
+                return
+
+            frame_id, frame, args = item
+            try:
+                result = self.detect(frame, *args)
+            except Exception:
+                logging.exception(f"Detection failed on frame {frame_id}")
+                result = []
+            self._results.put((frame_id, result))
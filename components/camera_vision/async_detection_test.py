@@ -0,0 +1,69 @@
+import threading
+import numpy as np
+
+from async_detection import AsyncDetector
+
+
+def frame_with_id(frame_id: int) -> np.ndarray:
+    return np.full((4, 4), frame_id, dtype=np.int32)
+
+
+def detect_frame_id(frame: np.ndarray) -> int:
+    return int(frame[0, 0])
+
+
+def test_results_are_matched_to_their_frames():
+    detector = AsyncDetector(detect_frame_id, max_in_flight=3)
+    for frame_id in range(1, 4):
+        assert detector.submit(frame_id, frame_with_id(frame_id))
+
+    results = []
+    while len(results) < 3:
+        results += detector.get_results(block=True, timeout=1)
+    detector.stop()
+
+    assert [frame_id for frame_id, _, _ in results] == [1, 2, 3]
+    assert all(frame_id == result == detect_frame_id(frame) for frame_id, frame, result in results)
+
+
+def test_in_flight_is_bounded():
+    release = threading.Event()
+
+    def slow_detect(frame):
+        release.wait(1)
+        return detect_frame_id(frame)
+
+    detector = AsyncDetector(slow_detect, max_in_flight=1)
+    assert detector.submit(1, frame_with_id(1))
+    assert not detector.submit(2, frame_with_id(2))
+    assert detector.in_flight == 1
+    assert detector.get_results() == []
+
+    release.set()
+    results = detector.get_results(block=True, timeout=1)
+    detector.stop()
+
+    assert [result for _, _, result in results] == [1]
+    assert detector.in_flight == 0
+
+
+def test_extra_arguments_are_passed_on():
+    detector = AsyncDetector(lambda frame, offset: detect_frame_id(frame) + offset)
+    detector.submit(5, frame_with_id(5), 10)
+    results = detector.get_results(block=True, timeout=1)
+    detector.stop()
+
+    assert results[0][2] == 15
+
+
+def test_failed_detection_returns_no_targets():
+    def failing_detect(frame):
+        raise ValueError('bad frame')
+
+    detector = AsyncDetector(failing_detect)
+    detector.submit(1, frame_with_id(1))
+    results = detector.get_results(block=True, timeout=1)
+    detector.stop()
+
+    assert results[0][0] == 1
+    assert results[0][2] == []
@@ -3,7 +3,7 @@ import socket
 import time
 import os
 import sys
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
@@ -18,11 +18,23 @@ import numpy as np
 # Local/application-specific imports
 from argparse import ArgumentParser
 from nerf_turret_utils.args_utils import map_log_level, str2bool
-from camera_vision_utils import get_face_location_details, get_target_id, find_faces_in_frame, draw_face_box, draw_cross_hair
-from yolo_object_detection.object_detection import YoloObjectDetector
-from yolo_object_detection.object_detection import ObjectDetector
-from yolo_object_detection.utils import draw_object_mask, draw_object_box
-from yolo_object_detection.opencv_onnx_python import ONNXObjectDetector
+from nerf_turret_utils.mask_utils import transform_encoded_mask
+from nerf_turret_utils.message_framing import MessageDecoder, encode_json_message, encode_message
+from nerf_turret_utils.socket_utils import create_connection
+from nerf_turret_utils.data_age import AgeTracker
+from nerf_turret_utils.target_codec import TargetCodec, encode_targets_message
+from message_bus.bus_client import BusPublisher
+from async_detection import AsyncDetector
+from motion_gate import MotionGate
+from publish_policy import PublishPolicy
+from camera_vision_utils import get_face_location_details, get_target_id, find_faces_in_frame
+from display import PreviewDisplay
+from latest_frame import LatestFrame
+from mjpeg_server import MjpegServer
+from recorder import Recorder
+from yolo_object_detection.object_detector_interface import ObjectDetector
+from yolo_object_detection.detector_selection import DETECTOR_FACTORIES, select_fastest_detector
+from yolo_object_detection.tiled_detection import DynamicResolutionDetector
 
 
 parser = ArgumentParser(description="Track faces with bounding boxes")
@@ -32,18 +44,45 @@ parser.add_argument('--camera', '-c', type=int, default=0, help="Choose the came
 parser.add_argument('--crosshair_size', '-ch', type=int, default=10, help="The size of the crosshair" )
 
 parser.add_argument("--port", help="Set the web socket server port to send messages to.", default=6565, type=int)
-parser.add_argument("--host", help="Set the web socket server hostname to send messages to.", default="localhost")
+parser.add_argument("--host", help="Set the web socket server hostname to send messages to, or a unix:///path/to.sock address to connect to the AI controller over a Unix domain socket.", default="localhost")
 
-parser.add_argument("--detector", "-d" , help="The detector to use with inference.", default='yolo', type=str)
+parser.add_argument("--bus", help="Publish the messages to the local message bus at this Unix socket path instead of sending them to the AI controller over TCP, so any number of subscribers can read them.", default=None, type=str)
+parser.add_argument("--bus-topic", help="The message bus topic to publish the targets to.", default="targets", type=str)
+parser.add_argument("--encoding", "-e", help="The message encoding to offer the AI controller on connect. Binary messages are smaller and faster to encode and decode, messages with masks are always sent as JSON.", 
+                        default='json', choices=['json', 'binary'], type=str)
+
+parser.add_argument("--detector", "-d" , help="The detector to use with inference. Use 'auto' to benchmark the available detectors on startup and use the fastest.", 
+                        default='yolo', choices=[*DETECTOR_FACTORIES, 'auto'], type=str)
+parser.add_argument("--rebenchmark-detector", help="Ignore the cached detector benchmark of this machine when using '--detector auto'.", action='store_true', default=False)
 
 parser.add_argument("--log-level", "-ll" , help="Set the logging level by integer value.", default=logging.INFO, type=map_log_level)
 parser.add_argument("--delay", help="Delay to limit the data flow into the websocket server.", default=0, type=int)
 parser.add_argument("--headless", help="Whether to run the service in headless mode.", action='store_true', default=False)
+parser.add_argument("--display-fps", help="The maximum rate the preview window is refreshed at when not headless.", type=float, default=30)
+parser.add_argument("--mjpeg-port", help="Serve the annotated frames as an MJPEG stream over HTTP on this port, e.g. to watch a headless turret.", type=int, default=None)
+parser.add_argument("--mjpeg-host", help="The hostname to serve the MJPEG stream on. Use 0.0.0.0 to watch from other machines.", default="localhost")
+parser.add_argument("--mjpeg-fps", help="The maximum rate the MJPEG stream is encoded at.", type=float, default=10)
+parser.add_argument("--mjpeg-quality", help="The JPEG quality (0-100) of the MJPEG stream.", type=int, default=70)
+parser.add_argument("--record", "-r", help="Record the camera frames to this video file (e.g. engagement.mp4) with the targets of every frame in a '.jsonl' file next to it.", type=str, default=None)
+parser.add_argument("--record-annotated", "-ra", help="Draw the targets and crosshair on the recorded frames.", action='store_true', default=False)
+parser.add_argument("--record-queue-size", help="The maximum amount of frames waiting to be written before frames are dropped from the recording.", type=int, default=64)
 parser.add_argument("--id-targets", "-it", help="Whether to id targets that are stored in the './data/targets' folder.", action='store_true', default=False)
 parser.add_argument("--test", "-t", help="Test without trying to emit data.", action='store_true', default=False)
 parser.add_argument("--benchmark", "-b", help="Wether to measure the script performance and output in the logs.", action='store_true', default=False)
 parser.add_argument("--image-compression", "-ic", 
                         help="The amount to compress the image. Eg give a value of 2 and the image for inference will have half the pixels", type=int, default=4)
+parser.add_argument("--dynamic-resolution", "-dr",
+                        help="Pick the inference resolution per frame from the size of the tracked targets and scan in native resolution tiles when there are none", action='store_true', default=False)
+parser.add_argument("--min-target-size", "-mts",
+                        help="The minimum height in pixels a tracked target should keep after compression in dynamic resolution mode", type=int, default=64)
+parser.add_argument("--tile-size", "-ts", help="The size in pixels of the tiles for the tiled scan in dynamic resolution mode", type=int, default=640)
+parser.add_argument("--tile-overlap", "-to", help="The overlap in pixels between the tiles for the tiled scan in dynamic resolution mode", type=int, default=128)
+parser.add_argument("--async-detection", "-ad",
+                        help="Run the detection of a frame on a worker thread while the previous frame is drawn and published", action='store_true', default=False)
+parser.add_argument("--max-in-flight", "-mif", help="The maximum amount of frames waiting for detection in async detection mode", type=int, default=1)
+parser.add_argument("--motion-gate", "-mg",
+                        help="Skip the detection while nothing moves and no target is tracked, and only detect in the moving region when it is small", action='store_true', default=False)
+parser.add_argument("--motion-threshold", "-mt", help="The gray level change (0-255) a pixel needs to count as moved for the motion gate", type=int, default=25)
 parser.add_argument("--skip-frames", "-sk", help="Skip x amount of frames to process to increase performance", type=int, default=500)
 
 parser.add_argument("--detect-faces", "-df", 
@@ -55,6 +94,14 @@ parser.add_argument("--detect-objects", "-do",
 parser.add_argument("--object-confidence", "-oc", 
                         help="Ho confidence the camera vision should be", type=float, default=0.7)
 
+parser.add_argument("--send-masks", "-sm",
+                        help="Whether to include the run length encoded segmentation masks in the messages to the AI controller", action='store_true', default=False)
+
+parser.add_argument("--publish-on-change", "-poc",
+                        help="Only send a message to the AI controller when the targets changed, plus a heartbeat while they do not", action='store_true', default=False)
+parser.add_argument("--publish-tolerance", "-pt", help="The amount of pixels a target box may move before the targets count as changed with --publish-on-change", type=float, default=2)
+parser.add_argument("--heartbeat", "-hb", help="The maximum amount of seconds between two messages with --publish-on-change", type=float, default=1)
+
 parser.add_argument("--box-targets", "-bt",
                         help="What objects to draw boxes around", nargs='+', type=str, default=['person', 'face'])
 
@@ -93,10 +140,6 @@ if args.id_targets:
     logging.info(f" Labeling targets {target_names}")
             
 
-object_detector: Optional[ObjectDetector]        
-if args.detect_objects:
-    object_detector = ONNXObjectDetector() if args.detector == 'onnx' else YoloObjectDetector() 
-                       
 ## Setup ready to send data to subscribers
 HOST = args.host  # IP address of the server
 PORT = args.port  # Port number to listen on
@@ -112,9 +155,33 @@ if HEADLESS:
 
 cap = cv2.VideoCapture(CAMERA_ID)
 
+object_detector: Optional[ObjectDetector]        
+if args.detect_objects:
+    if args.detector == 'auto':
+        # Trial the backends at the size of the frames they will get and reuse the winner on this machine
+        camera_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or 640
+        camera_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or 480
+        if args.dynamic_resolution:
+            input_size = (min(camera_width, args.tile_size), min(camera_height, args.tile_size))
+        else:
+            input_size = (camera_width // image_compression, camera_height // image_compression)
+        _, object_detector = select_fastest_detector(input_size, use_cache=not args.rebenchmark_detector)
+    else:
+        object_detector = DETECTOR_FACTORIES[args.detector]()
+    if args.dynamic_resolution:
+        object_detector = DynamicResolutionDetector(
+            object_detector, 
+            max_compression=image_compression, 
+            min_target_size=args.min_target_size, 
+            tile_size=args.tile_size, 
+            tile_overlap=args.tile_overlap
+        )
+
 scaling_factor = 0.5
 web_socket_client_connection = None
-face_locations = []
+bus_publisher: Optional[BusPublisher] = None
+target_codec: Optional[TargetCodec] = None # The binary codec once the AI controller accepted it
+HELLO_TIMEOUT = 2 # Seconds to wait for the AI controller to pick the encoding
 
 skip_frames =  args.skip_frames + 1
 frame_count = 0
@@ -126,9 +193,10 @@ def try_to_create_socket():
     logging.info(f"Connecting to web socket host @ {HOST, PORT}")
     try:
         # Create a new socket and connect to the server
-        web_socket_client_connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        web_socket_client_connection.connect((HOST, PORT))
+        web_socket_client_connection = create_connection(HOST, PORT)
         logging.info(f"Successfully Connected to socket @ {HOST, PORT}")
+        if args.encoding == 'binary':
+            negotiate_encoding(web_socket_client_connection)
     except Exception as e:
         time.sleep(1)
         web_socket_client_connection = None
@@ -138,141 +206,279 @@ def try_to_create_socket():
         pass
 
 
-start_time=time.time()
-targets = [] # List of targets in the frame to keep out here for skipped frame processing
+def try_to_connect_to_bus():
+    global bus_publisher, target_codec
+    logging.info(f"Connecting to the message bus @ {args.bus}")
+    try:
+        bus_publisher = BusPublisher(args.bus, args.bus_topic)
+        logging.info(f"Publishing to the '{args.bus_topic}' topic of the message bus @ {args.bus}")
+        if args.encoding == 'binary':
+            # Subscribers can not answer an offer, so the hello is retained for all of them and binary is always used
+            target_codec = create_target_codec()
+            bus_publisher.publish(json.dumps(target_codec.hello(['binary'])).encode('utf-8'), retain=True)
+    except Exception as e:
+        time.sleep(1)
+        bus_publisher = None
+        logging.error("Failed on trying to connect to the message bus. Attempting to try again")
+        print(e)
 
-while True:
-    time.sleep(args.delay)
-    if args.benchmark:
-        print(f'Performance benchmark on 1 loop:{ round(time.time() - start_time, 3) * 1000 }ms', )
-        start_time = time.time()
 
-    if not web_socket_client_connection and not args.test:
-        try_to_create_socket()
-        
-    try:
-        frame_count += 1
-        skip_frame = frame_count % skip_frames == 0
-        logging.debug(f"Skipping frame: {skip_frame}")
-        
-        ret, frame = cap.read()
-                
-        # Get the image height and width
-        frame_height, frame_width, _ = frame.shape   
-        
-        compressed_image = cv2.resize(frame, (0, 0), fx=1/image_compression, fy=1/image_compression) #type: ignore
+def create_target_codec() -> TargetCodec:
+    """Creates the binary codec with the class names of the detectors and the target ids"""
+    class_names = ['face', *[name for name in object_detector.class_names.values() if name != 'face']] if 'object_detector' in globals() else ['face'] #type: ignore
+    return TargetCodec(class_names, target_names)
 
-        if not skip_frame:
-            targets = []
-            if args.detect_faces:
-                face_locations = find_faces_in_frame(compressed_image)
 
-        
+def send_message(payload: bytes):
+    """Sends a message payload to the AI controller or publishes it on the message bus"""
+    if args.test:
+        return
+    if bus_publisher:
+        bus_publisher.publish(payload)
+    elif web_socket_client_connection:
+        web_socket_client_connection.sendall(encode_message(payload)) # Send the length prefixed byte string to the server
+
+
+def negotiate_encoding(connection: socket.socket):
+    """Offers the binary encoding with the class names and target ids to the AI controller and uses it if accepted"""
+    global target_codec
+    codec = create_target_codec()
+    connection.sendall(encode_json_message(codec.hello()))
+
+    decoder = MessageDecoder()
+    replies = []
+    connection.settimeout(HELLO_TIMEOUT)
+    try:
+        while not replies:
+            data = connection.recv(1024)
+            if not data:
+                break
+            replies = decoder.feed(data)
+    except socket.timeout:
+        logging.warning("The AI controller did not reply to the encoding offer")
+    finally:
+        connection.settimeout(None)
+
+    accepted = bool(replies) and json.loads(replies[0]).get('encoding') == 'binary'
+    target_codec = codec if accepted else None
+    logging.info(f"Sending {'binary' if accepted else 'json'} messages to the AI controller")
+
+
+def detect_targets(frame: np.ndarray, previous_targets: List[dict], region: Optional[Tuple[int, int, int, int]] = None) -> List[dict]:
+    """
+    Detects the faces and objects in a frame.
+
+    Args:
+        frame: The full resolution frame from the camera.
+        previous_targets: The targets of the last processed frame, used to pick the resolution in dynamic resolution mode.
+        region: An optional [left, top, right, bottom] part of the frame to limit the detection to.
+
+    Returns:
+        A list of targets with a 'box' in full frame coordinates and a 'type'.
+    """
+    if region:
+        left, top, right, bottom = region
+        region_targets = detect_targets(frame[top:bottom, left:right], [])
+        for target in region_targets:
+            box_left, box_top, box_right, box_bottom = target["box"]
+            target["box"] = [box_left + left, box_top + top, box_right + left, box_bottom + top]
+            if "mask" in target:
+                target["mask"] = transform_encoded_mask(target["mask"], offset_x=left, offset_y=top)
+        return region_targets
+    
+    frame_targets = []
+    compressed_image = cv2.resize(frame, (0, 0), fx=1/image_compression, fy=1/image_compression) #type: ignore
+
+    if args.detect_faces:
         # Loop through each face in this frame of video that were detected
-        for face_location in face_locations:
+        for face_location in find_faces_in_frame(compressed_image):
             # Scale back up face locations since the frame we detected in was scaled to 1/4 size
             target = get_face_location_details(image_compression, face_location)
             
             if args.id_targets:
                 target["id"]  = get_target_id(frame, target["box"], target_names, target_images)
                 
-            targets.append(target)
-            
-        if 'object_detector' in globals() and not skip_frame: 
+            frame_targets.append(target)
+        
+    if 'object_detector' in globals(): 
+        if args.dynamic_resolution:
+            # The dynamic resolution detector works on the full frame and returns full frame boxes
+            tracked_boxes = [target["box"] for target in previous_targets if target["type"] != 'face']
+            results = object_detector.detect(frame, args.object_confidence, tracked_boxes=tracked_boxes) #type: ignore
+            result_scale = 1
+        else:
             results =  object_detector.detect(compressed_image, args.object_confidence) #type: ignore
-            for result in results:
+            result_scale = image_compression
+            
+        for result in results:
 
-                # target = { "box": result["box"], "type": result["class_name"], "mask": result["mask"].tolist()}
-                target = { "box": (np.array(result["box"]) * image_compression).tolist(), "type": result["class_name"],}
-                targets.append(target)
-                
-        if not HEADLESS: ## Draw targets
-            is_on_target = False
+            target = { "box": (np.array(result["box"]) * result_scale).tolist(), "type": result["class_name"],}
+            if "mask" in result:
+                target["mask"] = transform_encoded_mask(result["mask"], scale=result_scale)
+            frame_targets.append(target)
+            
+    return frame_targets
+
+
+start_time=time.time()
+targets = [] # List of targets in the frame to keep out here for skipped frame processing
+targets_frame_id: Optional[int] = None # The id and capture time of the frame the targets were detected in, skipped frames reuse them
+targets_capture_time: Optional[float] = None
+
+async_detector = AsyncDetector(detect_targets, max_in_flight=args.max_in_flight) if args.async_detection else None
+get_target_color = object_detector.get_color_for_class_name if 'object_detector' in globals() else lambda _: (0, 255, 0) #type: ignore
+latest_frame = LatestFrame() # The latest frame and targets for the preview consumers that run on their own threads
+display = None if HEADLESS else PreviewDisplay(latest_frame, get_target_color, args.box_targets, CROSS_HAIR_SIZE, fps=args.display_fps).start()
+mjpeg_server = None
+if args.mjpeg_port:
+    mjpeg_server = MjpegServer(
+        latest_frame, 
+        get_target_color, 
+        args.box_targets, 
+        CROSS_HAIR_SIZE, 
+        host=args.mjpeg_host, 
+        port=args.mjpeg_port, 
+        fps=args.mjpeg_fps, 
+        quality=args.mjpeg_quality
+    ).start()
+recorder = None
+if args.record:
+    recorder = Recorder(
+        args.record, 
+        fps=cap.get(cv2.CAP_PROP_FPS) or 30, 
+        annotate=args.record_annotated, 
+        get_color=get_target_color, 
+        box_targets=args.box_targets, 
+        cross_hair_size=CROSS_HAIR_SIZE, 
+        max_queue_size=args.record_queue_size
+    ).start()
+motion_gate = MotionGate(threshold=args.motion_threshold) if args.motion_gate else None
+gated_frame_count = 0
+capture_times: Dict[int, float] = {} # The capture times of the frames waiting for async detection by frame id
+publish_age = AgeTracker() # How old the frames are when their targets are published
+publish_policy = PublishPolicy(args.publish_tolerance, args.heartbeat) if args.publish_on_change else None
+
+try:
+    while True:
+        time.sleep(args.delay)
+        if args.benchmark:
+            print(f'Performance benchmark on 1 loop:{ round(time.time() - start_time, 3) * 1000 }ms', )
+            start_time = time.time()
+
+        if args.bus and not bus_publisher and not args.test:
+            try_to_connect_to_bus()
+        elif not args.bus and not web_socket_client_connection and not args.test:
+            try_to_create_socket()
+        
+        try:
+            frame_count += 1
+            skip_frame = frame_count % skip_frames == 0
+            logging.debug(f"Skipping frame: {skip_frame}")
+        
+            ret, frame = cap.read()
+            frame_id, capture_time = frame_count, time.time()
                 
-            for target in targets:
-                logging.debug("Target: " + str(target))
+            # Get the image height and width
+            frame_height, frame_width, _ = frame.shape   
+        
+            run_detection, detection_region = not skip_frame, None
+            if run_detection and motion_gate:
+                run_detection, detection_region = motion_gate.get_detection_region(frame, len(targets) > 0)
+                if not run_detection:
+                    gated_frame_count += 1
+                    logging.debug(f"No motion, skipped detection on {gated_frame_count} of {frame_count} frames")
+        
+            if async_detector:
+                # Wait for a result only when the detector is saturated so capturing overlaps with the detection
+                completed = async_detector.get_results(block=async_detector.in_flight >= async_detector.max_in_flight)
+                if run_detection and async_detector.submit(frame_count, frame, targets, detection_region):
+                    capture_times[frame_count] = capture_time
                 
-                if len(args.box_targets or []) == 0 or target['type'] not in args.box_targets:
-                    continue # skip this target if it's not in the list of targets to draw boxes around
+                if completed:
+                    # Draw and publish the newest result on the frame it was detected in
+                    frame_id, frame, targets = completed[-1]
+                    capture_time = capture_times[frame_id]
+                    targets_frame_id, targets_capture_time = frame_id, capture_time
+                    for completed_frame_id, _, _ in completed:
+                        del capture_times[completed_frame_id]
+                elif run_detection:
+                    continue # The results of this frame are drawn once the detection is done
+            
+            elif run_detection:
+                targets = detect_targets(frame, targets, detection_region)
+                targets_frame_id, targets_capture_time = frame_id, capture_time
+            if targets_frame_id is None: # Nothing was detected yet, there are no targets of an older frame
+                targets_frame_id, targets_capture_time = frame_id, capture_time
                 
-                left, top, right, bottom = target["box"]
+            if display or mjpeg_server: ## The targets are drawn on the preview threads
+                latest_frame.update(frame, targets)
+            if recorder: ## Never blocks, frames are dropped when the disk is too slow
+                recorder.record(frame_id, frame, targets, timestamp=capture_time, targets_frame_id=targets_frame_id)
+        
+            publish_time = time.time()
+            frame_details = { "frame_id": targets_frame_id, "capture_time": targets_capture_time, "publish_time": publish_time }
+            if publish_policy and not publish_policy.should_publish(targets, publish_time):
+                logging.debug(f"Targets of frame {frame_id} did not change, not publishing")
+            elif len(targets) > 0:
                 center_x = frame_width // 2
                 center_y = frame_height // 2
-                
-                
-                if top <= center_y <= bottom and left <= center_x <= right:
-                    is_on_target=True 
-                     
-                if target['type'] == 'face':
-                    frame = draw_face_box(frame, target, is_on_target)
-                    
-                elif object_detector: # type: ignore
-                    
-                    class_color = object_detector.get_color_for_class_name(target['type'])
-
-                    if 'mask' in target:
-                        frame = draw_object_mask(frame, class_color, np.array(target['mask']))
-                    
-                    if 'box' in target:
-                        frame = draw_object_box(frame, left, top, right, bottom, target['type'], class_color)
-                    
-                # Always draw the cross hai.rindex() if not headless        
-            frame =  draw_cross_hair(frame, CROSS_HAIR_SIZE, is_on_target)
-
- 
-        
-        if len(targets) > 0:
-            center_x = frame_width // 2
-            center_y = frame_height // 2
-            data = {
-                "targets": targets,
-                "heading_vect": [center_x, center_y],
-                "view_dimensions": [frame_width, frame_height],
-            }
-            json_data = json.dumps(data).encode('utf-8') # Encode the JSON object as a byte string
+                data = {
+                    **frame_details,
+                    "targets": targets if args.send_masks else [ { k: v for k, v in target.items() if k != "mask" } for target in targets ],
+                    "heading_vect": [center_x, center_y],
+                    "view_dimensions": [frame_width, frame_height],
+                }
+                payload = encode_targets_message(data, target_codec) # Encode the message as a byte string
             
-            # logging.debug(f'{ "Mock: "if args.test else ""}Sending data({len(json_data)}) to the AI controller:' + json.dumps(data))
-            logging.debug(f'{ "Mock: "if args.test else ""}Sending data({len(json_data)}) to the AI controller:' + json.dumps(data))
-            if web_socket_client_connection and not args.test:
-                web_socket_client_connection.sendall(json_data) # Send the byte string to the server
+                logging.debug(f'{ "Mock: "if args.test else ""}Sending data({len(payload)}) to the AI controller:' + json.dumps(data))
+                send_message(payload)
+                publish_age.update(targets_frame_id, targets_capture_time, publish_time)
                 
-        else:
-            if web_socket_client_connection and not args.test:
-                web_socket_client_connection.sendall(json.dumps({"targets": []}).encode('utf-8'))
+            else:
+                send_message(json.dumps({ **frame_details, "targets": [] }).encode('utf-8'))
+                publish_age.update(targets_frame_id, targets_capture_time, publish_time)
             
-        if not HEADLESS:
-            cv2.imshow('Face Detector', frame)
-
-        c = cv2.waitKey(1)
-        ## S 'key'
-        if c == 27:
-            break
-        
+            if display and display.is_closed:
+                break
         
-    except KeyboardInterrupt as e:
-        raise e
-    except AttributeError as e:
-        logging.error("Wrong property accessed. See logs below. Retrying in 5 seconds...")
-        print(e)
-        time.sleep(5)
-        pass
-    except BrokenPipeError as e:
-        logging.error("Socket pipe broken. Retrying in 5 seconds...")
-        time.sleep(5)
-        web_socket_client_connection = None
-        pass 
-    except ConnectionResetError as e:
-        logging.error("Socket connection lost. Retrying in 5 seconds...")
-        time.sleep(5)
-        web_socket_client_connection = None
-        pass
-    finally:
-        # Record the time taken to process the frame
-        if start_time and args.benchmark:
-            logging.debug("Frame processed in " + str(time.time() - start_time) + " seconds")
-        pass
         
-cap.release()
-
+        except KeyboardInterrupt as e:
+            raise e
+        except AttributeError as e:
+            logging.error("Wrong property accessed. See logs below. Retrying in 5 seconds...")
+            print(e)
+            time.sleep(5)
+            pass
+        except BrokenPipeError as e:
+            logging.error("Socket pipe broken. Retrying in 5 seconds...")
+            time.sleep(5)
+            web_socket_client_connection = None
+            bus_publisher = None
+            pass 
+        except ConnectionResetError as e:
+            logging.error("Socket connection lost. Retrying in 5 seconds...")
+            time.sleep(5)
+            web_socket_client_connection = None
+            bus_publisher = None
+            pass
+        finally:
+            # Record the time taken to process the frame
+            if start_time and args.benchmark:
+                logging.debug("Frame processed in " + str(time.time() - start_time) + " seconds")
+                logging.debug(f"Age of the frames when published: {publish_age.summary()}")
+                if publish_policy:
+                    logging.debug(publish_policy.summary())
+            pass
         
-cv2.destroyAllWindows()
\ No newline at end of file
+finally:
+    if async_detector:
+        async_detector.stop()
+    if display:
+        display.stop()
+    if mjpeg_server:
+        mjpeg_server.stop()
+    if recorder:
+        recorder.stop()
+    cap.release()
+    if publish_policy:
+        logging.info(publish_policy.summary())
@@ -0,0 +1,95 @@
+import logging
+import os
+import subprocess
+import sys
+import threading
+from typing import Callable, Optional, Sequence, Tuple
+from overlay_renderer import OverlayRenderer
+from latest_frame import LatestFrame
+from display_window import encode_frame
+
+
+WINDOW_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'display_window.py')
+
+
+class PreviewDisplay:
+    """Shows the camera preview in a window process, with the drawing on its own thread.
+
+    The detection loop only updates the latest frame and targets. The render thread draws the targets
+    on the newest frame at up to `fps` and writes it to the window process. HighGUI only works from
+    the main thread on some platforms, e.g. macOS, so `cv2.imshow` and `cv2.waitKey` run on the main
+    thread of that process, see `display_window.py`, and the detection loop never waits on them.
+    """
+
+    def __init__(
+        self,
+        latest_frame: LatestFrame,
+        get_color: Callable[[str], Tuple[int, int, int]],
+        box_targets: Sequence[str],
+        cross_hair_size: int,
+        window_name: str = 'Face Detector',
+        fps: float = 30,
+    ) -> None:
+        """
+        Args:
+            latest_frame: The latest frame and targets of the camera vision.
+            get_color: Gets the color to draw a target type with.
+            box_targets: The target types to draw.
+            cross_hair_size: The size of the crosshair in pixels.
+            window_name: The title of the window.
+            fps: The maximum rate the window is refreshed at.
+        """
+        self.latest_frame = latest_frame
+        self.window_name = window_name
+        self.fps = fps
+        self._renderer = OverlayRenderer(get_color, box_targets, cross_hair_size)
+        self._process: Optional[subprocess.Popen] = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='preview-render', daemon=True)
+
+
+    @property
+    def is_closed(self) -> bool:
+        """Whether the user closed the preview with ESC"""
+        return self._process is not None and self._process.poll() is not None
+
+
+    def start(self) -> 'PreviewDisplay':
+        """Starts the window process and the render thread"""
+        self._process = subprocess.Popen(
+            [sys.executable, WINDOW_SCRIPT, '--window-name', self.window_name, '--fps', str(self.fps)],
+            stdin=subprocess.PIPE,
+        )
+        self._thread.start()
+        return self
+
+
+    def stop(self, timeout: float = 2) -> None:
+        """Stops the render thread and closes the window"""
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+        if self._process is None:
+            return
+        try:
+            self._process.stdin.close() # type: ignore # The window closes at the end of its frames
+            self._process.wait(timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            self._process.kill()
+
+
+    def _run(self) -> None:
+        frame_time = 1 / self.fps
+        frame_id = 0
+        while not self._stopped.is_set():
+            snapshot = self.latest_frame.wait_for_newer(frame_id, timeout=frame_time)
+            if not snapshot:
+                continue
+            frame_id, frame, targets = snapshot
+            try:
+                self._process.stdin.write(encode_frame(self._renderer.render(frame.copy(), targets))) # type: ignore
+                self._process.stdin.flush() # type: ignore
+            except OSError:
+                logging.debug("The preview window closed")
+                return
+            self._stopped.wait(frame_time) # Draws at most `fps` frames per second
@@ -0,0 +1,56 @@
+import io
+import time
+import numpy as np
+
+import display
+from display import PreviewDisplay
+from display_window import read_frame
+from latest_frame import LatestFrame
+
+
+class FakeProcess:
+    """Collects the frames written to the window process instead of showing them"""
+
+    def __init__(self, *args, **kwargs):
+        self.stdin = io.BytesIO()
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self, timeout=None):
+        self.returncode = 0
+        return 0
+
+    def kill(self):
+        self.returncode = -9
+
+
+def test_draws_the_frames_for_the_window_process(monkeypatch):
+    monkeypatch.setattr(display.subprocess, 'Popen', FakeProcess)
+    latest_frame = LatestFrame()
+    preview = PreviewDisplay(latest_frame, lambda _: (0, 255, 0), ['person'], 10, fps=100).start()
+    process = preview._process
+    written = process.stdin.write
+    frames = []
+    process.stdin.write = lambda data: (frames.append(data), written(data))
+    process.stdin.close = lambda: None # Keeps the written frames readable after stopping
+
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    latest_frame.update(frame, [{'type': 'person', 'box': [10, 10, 30, 30]}])
+    end = time.time() + 2
+    while not frames and time.time() < end:
+        time.sleep(0.01)
+    preview.stop()
+
+    shown = read_frame(io.BytesIO(frames[0]))
+    assert shown.shape == frame.shape # type: ignore
+    assert shown.any() and not frame.any() # type: ignore # The targets are drawn on a copy
+
+def test_is_closed_once_the_window_process_exited(monkeypatch):
+    monkeypatch.setattr(display.subprocess, 'Popen', FakeProcess)
+    preview = PreviewDisplay(LatestFrame(), lambda _: (0, 255, 0), ['person'], 10).start()
+    assert not preview.is_closed
+    preview._process.returncode = 0 # type: ignore # The user pressed ESC
+    assert preview.is_closed
+    preview.stop()
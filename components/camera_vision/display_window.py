@@ -0,0 +1,103 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+import struct
+import threading
+from argparse import ArgumentParser
+from typing import BinaryIO, Optional
+import cv2
+import numpy as np
+from nerf_turret_utils.message_framing import HEADER, encode_message
+from latest_frame import LatestFrame
+
+
+FRAME_HEADER = struct.Struct('>HH') # The height and width of a 3 channel frame
+
+
+def encode_frame(frame: np.ndarray) -> bytes:
+    """
+    Frames a 3 channel frame with its dimensions and a length prefix to send it to the window process.
+
+    Args:
+        frame: The frame to show.
+
+    Returns:
+        The framed frame.
+    """
+    frame_height, frame_width = frame.shape[:2]
+    return encode_message(FRAME_HEADER.pack(frame_height, frame_width) + np.ascontiguousarray(frame).tobytes())
+
+
+def read_frame(stream: BinaryIO) -> Optional[np.ndarray]:
+    """
+    Reads one frame written by `encode_frame`.
+
+    Args:
+        stream: The stream to read from.
+
+    Returns:
+        The frame, or None at the end of the stream.
+    """
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    (size,) = HEADER.unpack(header)
+    payload = stream.read(size)
+    if len(payload) < size:
+        return None
+    frame_height, frame_width = FRAME_HEADER.unpack_from(payload)
+    return np.frombuffer(payload, dtype=np.uint8, offset=FRAME_HEADER.size).reshape(frame_height, frame_width, 3)
+
+
+def show_frames(stream: BinaryIO, window_name: str, fps: float = 30) -> None:
+    """
+    Shows the frames read from a stream until ESC is pressed or the stream ends.
+
+    HighGUI only works from the main thread on some platforms, e.g. macOS, so this runs on the main
+    thread of its own process and the frames are read on a worker thread.
+
+    Args:
+        stream: The stream of frames written by `encode_frame`.
+        window_name: The title of the window.
+        fps: The maximum rate the window is refreshed at.
+    """
+    latest_frame = LatestFrame()
+    ended = threading.Event()
+
+    def read_frames() -> None:
+        while True:
+            frame = read_frame(stream)
+            if frame is None:
+                break
+            latest_frame.update(frame, [])
+        ended.set()
+
+    threading.Thread(target=read_frames, name='preview-reader', daemon=True).start()
+    wait_ms = max(1, int(1000 / fps))
+    frame_id = 0
+    while True:
+        is_ended = ended.is_set() # Checked first, so the last frame is still shown
+        snapshot = latest_frame.wait_for_newer(frame_id, timeout=0)
+        if snapshot:
+            frame_id, frame, _ = snapshot
+            cv2.imshow(window_name, frame)
+        elif is_ended:
+            break
+
+        # Also keeps the window responsive while no new frames arrive
+        if cv2.waitKey(wait_ms) == 27:
+            break
+
+    cv2.destroyAllWindows()
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser(description="Shows the camera vision preview frames written to stdin, see display.py")
+    parser.add_argument("--window-name", "-wn", help="The title of the window.", default='Face Detector')
+    parser.add_argument("--fps", help="The maximum rate the window is refreshed at.", type=float, default=30)
+    args = parser.parse_args()
+
+    show_frames(sys.stdin.buffer, args.window_name, args.fps)
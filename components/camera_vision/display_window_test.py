@@ -0,0 +1,57 @@
+import io
+import os
+import threading
+import numpy as np
+
+import display_window
+from display_window import encode_frame, read_frame, show_frames
+
+
+class FakeHighGUI:
+    """Records the threads the window calls are made from"""
+
+    def __init__(self, key=-1):
+        self.key = key
+        self.shown = []
+        self.threads = set()
+
+    def imshow(self, window_name, frame):
+        self.threads.add(threading.current_thread())
+        self.shown.append(frame)
+
+    def waitKey(self, delay):
+        self.threads.add(threading.current_thread())
+        return self.key
+
+    def destroyAllWindows(self):
+        self.threads.add(threading.current_thread())
+
+
+def fake_highgui(monkeypatch, key=-1) -> FakeHighGUI:
+    gui = FakeHighGUI(key)
+    for name in ('imshow', 'waitKey', 'destroyAllWindows'):
+        monkeypatch.setattr(display_window.cv2, name, getattr(gui, name))
+    return gui
+
+
+def test_frames_survive_the_stream():
+    frame = np.random.default_rng(0).integers(0, 255, (48, 64, 3), dtype=np.uint8)
+    stream = io.BytesIO(encode_frame(frame) + encode_frame(frame[:, :32]))
+    assert np.array_equal(read_frame(stream), frame) # type: ignore
+    assert np.array_equal(read_frame(stream), frame[:, :32]) # type: ignore
+    assert read_frame(stream) is None
+
+def test_shows_the_frames_from_the_calling_thread_until_the_stream_ends(monkeypatch):
+    gui = fake_highgui(monkeypatch)
+    frame = np.full((48, 64, 3), 7, dtype=np.uint8)
+    show_frames(io.BytesIO(encode_frame(frame)), 'preview', fps=100)
+    assert len(gui.shown) == 1 and np.array_equal(gui.shown[0], frame)
+    assert gui.threads == {threading.current_thread()}
+
+def test_escape_closes_the_window(monkeypatch):
+    gui = fake_highgui(monkeypatch, key=27)
+    read_end, write_end = os.pipe() # A stream that does not end, so only ESC closes the window
+    with open(read_end, 'rb') as stream:
+        show_frames(stream, 'preview')
+        os.close(write_end) # Ends the reader thread
+    assert gui.threads == {threading.current_thread()}
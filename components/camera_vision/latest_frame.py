@@ -0,0 +1,46 @@
+import threading
+from typing import List, Optional, Tuple
+import numpy as np
+
+
+class LatestFrame:
+    """Holds the latest frame and its targets for consumers that run at their own rate.
+
+    The producer replaces the snapshot without waiting; consumers take the newest one and skip any
+    they were too slow for.
+    """
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._snapshot: Optional[Tuple[int, np.ndarray, List[dict]]] = None
+        self._frame_id = 0
+
+
+    def update(self, frame: np.ndarray, targets: List[dict]) -> None:
+        """
+        Replaces the snapshot with a new frame and its targets.
+
+        Args:
+            frame: The new frame. It must not be modified afterwards as consumers read it from their threads.
+            targets: The targets found in the frame.
+        """
+        with self._condition:
+            self._frame_id += 1
+            self._snapshot = (self._frame_id, frame, targets)
+            self._condition.notify_all()
+
+
+    def wait_for_newer(self, frame_id: int, timeout: Optional[float] = None) -> Optional[Tuple[int, np.ndarray, List[dict]]]:
+        """
+        Waits until there is a snapshot newer than the given one.
+
+        Args:
+            frame_id: The id of the last snapshot the consumer saw, 0 for none.
+            timeout: The maximum time in seconds to wait.
+
+        Returns:
+            The (frame id, frame, targets) snapshot, or None if there was no newer one in time.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._frame_id > frame_id, timeout)
+            return self._snapshot if self._frame_id > frame_id else None
@@ -0,0 +1,35 @@
+import threading
+import numpy as np
+
+from latest_frame import LatestFrame
+
+
+def test_wait_for_newer_returns_latest_snapshot():
+    latest_frame = LatestFrame()
+    first, second = np.zeros((2, 2)), np.ones((2, 2))
+    latest_frame.update(first, [])
+    latest_frame.update(second, [{'type': 'person'}])
+
+    frame_id, frame, targets = latest_frame.wait_for_newer(0, timeout=0)
+
+    assert frame_id == 2
+    assert frame is second
+    assert targets == [{'type': 'person'}]
+
+
+def test_wait_for_newer_times_out_without_new_frames():
+    latest_frame = LatestFrame()
+    latest_frame.update(np.zeros((2, 2)), [])
+
+    assert latest_frame.wait_for_newer(1, timeout=0.01) is None
+
+
+def test_wait_for_newer_wakes_up_on_update():
+    latest_frame = LatestFrame()
+    timer = threading.Timer(0.01, lambda: latest_frame.update(np.zeros((2, 2)), []))
+    timer.start()
+
+    snapshot = latest_frame.wait_for_newer(0, timeout=1)
+    timer.join()
+
+    assert snapshot is not None and snapshot[0] == 1
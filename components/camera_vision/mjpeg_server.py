@@ -0,0 +1,176 @@
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional, Sequence, Tuple
+import cv2
+from overlay_renderer import OverlayRenderer
+from latest_frame import LatestFrame
+
+
+BOUNDARY = 'frame'
+
+
+class MjpegServer:
+    """Serves the annotated camera frames as an MJPEG stream over HTTP.
+
+    Frames are drawn and JPEG encoded on a background thread at a limited rate, and only while at
+    least one client is watching, so the server costs nothing when nobody is connected.
+    Open `http://<host>:<port>/` in a browser to watch the stream.
+    """
+
+    def __init__(
+        self,
+        latest_frame: LatestFrame,
+        get_color: Callable[[str], Tuple[int, int, int]],
+        box_targets: Sequence[str],
+        cross_hair_size: int,
+        host: str = 'localhost',
+        port: int = 8080,
+        fps: float = 10,
+        quality: int = 70,
+    ) -> None:
+        """
+        Args:
+            latest_frame: The latest frame and targets of the camera vision.
+            get_color: Gets the color to draw a target type with.
+            box_targets: The target types to draw.
+            cross_hair_size: The size of the crosshair in pixels.
+            host: The hostname to serve the stream on.
+            port: The port to serve the stream on.
+            fps: The maximum rate frames are encoded at.
+            quality: The JPEG quality from 0 to 100.
+        """
+        self.latest_frame = latest_frame
+        self.fps = fps
+        self.quality = quality
+        self.encoded_frame_count = 0
+        self._renderer = OverlayRenderer(get_color, box_targets, cross_hair_size)
+        self._condition = threading.Condition()
+        self._clients = 0
+        self._jpeg: Optional[bytes] = None
+        self._jpeg_id = 0
+        self._stopped = threading.Event()
+
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._server_thread = threading.Thread(target=self._server.serve_forever, name='mjpeg-server', daemon=True)
+        self._encoder_thread = threading.Thread(target=self._run_encoder, name='mjpeg-encoder', daemon=True)
+
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """The (host, port) the server listens on"""
+        return self._server.server_address[:2] # type: ignore
+
+
+    @property
+    def clients(self) -> int:
+        """The amount of clients watching the stream"""
+        with self._condition:
+            return self._clients
+
+
+    def start(self) -> 'MjpegServer':
+        """Starts serving and encoding"""
+        self._server_thread.start()
+        self._encoder_thread.start()
+        logging.info(f"Serving the MJPEG preview on http://{self.address[0]}:{self.address[1]}/")
+        return self
+
+
+    def stop(self) -> None:
+        """Stops the server and the encoder"""
+        self._stopped.set()
+        with self._condition:
+            self._condition.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+        self._encoder_thread.join(1)
+
+
+    def wait_for_jpeg(self, jpeg_id: int, timeout: Optional[float] = None) -> Optional[Tuple[int, bytes]]:
+        """
+        Waits for an encoded frame newer than the given one.
+
+        Args:
+            jpeg_id: The id of the last frame the client got, 0 for none.
+            timeout: The maximum time in seconds to wait.
+
+        Returns:
+            The (id, JPEG bytes) of the newest frame, or None if there was none in time or the server stopped.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._jpeg_id > jpeg_id or self._stopped.is_set(), timeout)
+            if self._jpeg_id > jpeg_id and self._jpeg is not None:
+                return self._jpeg_id, self._jpeg
+            return None
+
+
+    def _run_encoder(self) -> None:
+        interval = 1 / self.fps
+        frame_id = 0
+        while not self._stopped.is_set():
+            with self._condition:
+                # Sleep without encoding anything until a client connects
+                self._condition.wait_for(lambda: self._clients > 0 or self._stopped.is_set())
+            if self._stopped.is_set():
+                return
+
+            snapshot = self.latest_frame.wait_for_newer(frame_id, timeout=interval)
+            if not snapshot:
+                continue
+
+            frame_id, frame, targets = snapshot
+            annotated = self._renderer.render(frame.copy(), targets)
+            ok, jpeg = cv2.imencode('.jpg', annotated, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if ok:
+                with self._condition:
+                    self._jpeg, self._jpeg_id = jpeg.tobytes(), self._jpeg_id + 1
+                    self.encoded_frame_count += 1
+                    self._condition.notify_all()
+
+            self._stopped.wait(interval)
+
+
+    def _add_client(self, count: int) -> None:
+        with self._condition:
+            self._clients += count
+            self._condition.notify_all()
+
+
+    def _make_handler(self):
+        server = self
+
+        class MjpegHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path not in ('/', '/stream.mjpg'):
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header('Cache-Control', 'no-cache, private')
+                self.send_header('Content-Type', f'multipart/x-mixed-replace; boundary={BOUNDARY}')
+                self.end_headers()
+
+                server._add_client(1)
+                jpeg_id = 0
+                try:
+                    while not server._stopped.is_set():
+                        result = server.wait_for_jpeg(jpeg_id, timeout=1)
+                        if not result:
+                            continue
+                        jpeg_id, jpeg = result
+                        self.wfile.write(f'--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n'.encode())
+                        self.wfile.write(jpeg)
+                        self.wfile.write(b'\r\n')
+                except (BrokenPipeError, ConnectionResetError):
+                    logging.debug("MJPEG client disconnected")
+                finally:
+                    server._add_client(-1)
+
+            def log_message(self, format, *args):
+                logging.debug("MJPEG server: " + format % args)
+
+        return MjpegHandler
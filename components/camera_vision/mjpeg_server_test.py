@@ -0,0 +1,62 @@
+import socket
+import time
+import numpy as np
+
+from latest_frame import LatestFrame
+from mjpeg_server import MjpegServer
+
+
+def make_server(latest_frame: LatestFrame) -> MjpegServer:
+    return MjpegServer(latest_frame, lambda _: (0, 255, 0), ['person'], 10, port=0, fps=50).start()
+
+
+def read_until(connection: socket.socket, marker: bytes, timeout: float = 2) -> bytes:
+    data = b''
+    connection.settimeout(timeout)
+    while marker not in data:
+        chunk = connection.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def test_nothing_is_encoded_without_clients():
+    latest_frame = LatestFrame()
+    server = make_server(latest_frame)
+    for _ in range(5):
+        latest_frame.update(np.zeros((48, 64, 3), dtype=np.uint8), [])
+        time.sleep(0.02)
+
+    assert server.encoded_frame_count == 0
+    server.stop()
+
+
+def test_streams_jpeg_frames_to_clients():
+    latest_frame = LatestFrame()
+    server = make_server(latest_frame)
+    latest_frame.update(np.zeros((48, 64, 3), dtype=np.uint8), [{'type': 'person', 'box': [10, 10, 30, 30]}])
+
+    with socket.create_connection(server.address) as connection:
+        connection.sendall(b'GET / HTTP/1.1\r\nHost: localhost\r\n\r\n')
+        data = read_until(connection, b'\xff\xd9')
+
+        assert b'multipart/x-mixed-replace; boundary=frame' in data
+        assert b'Content-Type: image/jpeg' in data
+        assert b'\xff\xd8' in data
+        assert server.clients == 1
+
+    deadline = time.time() + 2
+    while server.clients and time.time() < deadline:
+        latest_frame.update(np.zeros((48, 64, 3), dtype=np.uint8), [])
+        time.sleep(0.02)
+    assert server.clients == 0
+    server.stop()
+
+
+def test_unknown_path_is_not_found():
+    server = make_server(LatestFrame())
+    with socket.create_connection(server.address) as connection:
+        connection.sendall(b'GET /missing HTTP/1.1\r\nHost: localhost\r\n\r\n')
+        assert b'404' in read_until(connection, b'\r\n')
+    server.stop()
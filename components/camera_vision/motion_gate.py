@@ -0,0 +1,143 @@
+from typing import List, Optional, Sequence, Tuple
+import cv2
+import numpy as np
+
+
+Region = Tuple[int, int, int, int]
+
+
+def get_union_region(regions: Sequence[Region]) -> Region:
+    """
+    Gets the smallest region that contains all of the given regions.
+
+    Args:
+        regions: A list of [left, top, right, bottom] regions.
+
+    Returns:
+        The [left, top, right, bottom] union of the regions.
+    """
+    lefts, tops, rights, bottoms = zip(*regions)
+    return min(lefts), min(tops), max(rights), max(bottoms)
+
+
+def pad_region(region: Region, padding: float, frame_width: int, frame_height: int) -> Region:
+    """
+    Grows a region on every side by a fraction of its size, clipped to the frame.
+
+    Args:
+        region: The [left, top, right, bottom] region to grow.
+        padding: The fraction of the region width and height added to each side.
+        frame_width: The width of the frame the region lies in.
+        frame_height: The height of the frame the region lies in.
+
+    Returns:
+        The padded [left, top, right, bottom] region.
+    """
+    left, top, right, bottom = region
+    pad_x = int((right - left) * padding)
+    pad_y = int((bottom - top) * padding)
+    return max(left - pad_x, 0), max(top - pad_y, 0), min(right + pad_x, frame_width), min(bottom + pad_y, frame_height)
+
+
+class MotionGate:
+    """Detects motion cheaply by differencing downsampled grayscale frames.
+
+    Used to skip the expensive detectors while the scene is static and nothing is being tracked,
+    and to limit them to the part of the frame that moved.
+    """
+
+    def __init__(
+        self,
+        downsample_width: int = 160,
+        threshold: int = 25,
+        min_area: float = 0.001,
+        small_region_area: float = 0.25,
+        region_padding: float = 0.5,
+    ) -> None:
+        """
+        Args:
+            downsample_width: The width in pixels frames are shrunk to before differencing.
+            threshold: The gray level change (0-255) a pixel needs to count as moved.
+            min_area: The fraction of the frame a moving region needs to cover to count as motion, to ignore sensor noise.
+            small_region_area: The fraction of the frame below which the motion is small enough to only detect in the moving region.
+            region_padding: The fraction of the moving region size added on each side so the whole moving object is detected.
+        """
+        self.downsample_width = downsample_width
+        self.threshold = threshold
+        self.min_area = min_area
+        self.small_region_area = small_region_area
+        self.region_padding = region_padding
+        self._previous: Optional[np.ndarray] = None
+        self._kernel = np.ones((3, 3), dtype=np.uint8)
+
+
+    def _prepare(self, frame: np.ndarray) -> np.ndarray:
+        frame_height, frame_width = frame.shape[:2]
+        height = max(1, round(frame_height * self.downsample_width / frame_width))
+        small = cv2.resize(frame, (self.downsample_width, height), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if len(small.shape) == 3 else small
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+
+    def update(self, frame: np.ndarray) -> List[Region]:
+        """
+        Compares a frame with the previous one and finds the regions that moved.
+
+        The first frame is always reported as moving everywhere so detection runs at least once.
+
+        Args:
+            frame: The full resolution BGR frame.
+
+        Returns:
+            A list of [left, top, right, bottom] moving regions in full frame coordinates.
+        """
+        frame_height, frame_width = frame.shape[:2]
+        current = self._prepare(frame)
+        previous, self._previous = self._previous, current
+        if previous is None or previous.shape != current.shape:
+            return [(0, 0, frame_width, frame_height)]
+
+        _, moved = cv2.threshold(cv2.absdiff(current, previous), self.threshold, 255, cv2.THRESH_BINARY)
+        moved = cv2.dilate(moved, self._kernel, iterations=2)
+        contours, _ = cv2.findContours(moved, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        scale = frame_width / current.shape[1]
+        min_pixels = self.min_area * current.shape[0] * current.shape[1]
+        regions = []
+        for contour in contours:
+            x, y, width, height = cv2.boundingRect(contour)
+            if width * height < min_pixels:
+                continue
+            regions.append((
+                int(x * scale),
+                int(y * scale),
+                min(int(np.ceil((x + width) * scale)), frame_width),
+                min(int(np.ceil((y + height) * scale)), frame_height),
+            ))
+        return regions
+
+
+    def get_detection_region(self, frame: np.ndarray, has_active_targets: bool) -> Tuple[bool, Optional[Region]]:
+        """
+        Decides whether and where to run detection on a frame.
+
+        Args:
+            frame: The full resolution BGR frame.
+            has_active_targets: Whether targets were found in the last processed frame.
+
+        Returns:
+            A tuple of whether to run detection and the [left, top, right, bottom] region to detect in,
+            or None to detect in the whole frame.
+        """
+        regions = self.update(frame)
+        if has_active_targets:
+            return True, None
+        if not regions:
+            return False, None
+
+        frame_height, frame_width = frame.shape[:2]
+        region = pad_region(get_union_region(regions), self.region_padding, frame_width, frame_height)
+        left, top, right, bottom = region
+        if (right - left) * (bottom - top) > self.small_region_area * frame_width * frame_height:
+            return True, None
+        return True, region
@@ -0,0 +1,78 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+import time
+from argparse import ArgumentParser
+from typing import Callable, Iterator, Optional
+import cv2
+import numpy as np
+from motion_gate import MotionGate
+
+
+def read_recording(path: str) -> Iterator[np.ndarray]:
+    """Yields the frames of a video file"""
+    cap = cv2.VideoCapture(path)
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        yield frame
+    cap.release()
+
+
+def simulate_idle_room(frame_count: int, width: int, height: int) -> Iterator[np.ndarray]:
+    """Yields a static scene with camera sensor noise, like an empty room"""
+    rng = np.random.default_rng(0)
+    room = cv2.GaussianBlur(rng.integers(40, 200, size=(height, width, 3), dtype=np.uint8), (21, 21), 0)
+    for _ in range(frame_count):
+        noise = rng.integers(-4, 5, size=room.shape, dtype=np.int16)
+        yield np.clip(room + noise, 0, 255).astype(np.uint8)
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser(description="Measures the CPU time of the camera vision detection with and without the motion gate on an idle scene")
+    parser.add_argument("--recording", "-r", help="A video of the idle room. A noisy static scene is simulated if not given", type=str, default=None)
+    parser.add_argument("--frames", "-f", help="The amount of frames to simulate", type=int, default=300)
+    parser.add_argument("--frame-size", "-fs", help="The width and height of the simulated frames", nargs=2, type=int, default=[1280, 720])
+    parser.add_argument("--detector", "-d", help="Also run a detector ('yolo' or 'onnx') on the frames that pass the gate", type=str, default=None)
+    parser.add_argument("--image-compression", "-ic", help="The compression of the frames given to the detector", type=int, default=4)
+    parser.add_argument("--motion-threshold", "-mt", help="The gray level change (0-255) a pixel needs to count as moved", type=int, default=25)
+    args = parser.parse_args()
+
+    detect: Optional[Callable[[np.ndarray], object]] = None
+    if args.detector:
+        from yolo_object_detection.detector_selection import DETECTOR_FACTORIES
+        detector = DETECTOR_FACTORIES[args.detector]()
+        detect = lambda frame: detector.detect(cv2.resize(frame, (0, 0), fx=1/args.image_compression, fy=1/args.image_compression))
+
+    frames = list(read_recording(args.recording) if args.recording else simulate_idle_room(args.frames, *args.frame_size))
+    gate = MotionGate(threshold=args.motion_threshold)
+
+    detected_frames = 0
+    gate_cpu_time = 0.0
+    detect_cpu_time = 0.0
+    wall_start = time.perf_counter()
+    for frame in frames:
+        cpu_start = time.process_time()
+        run_detection, region = gate.get_detection_region(frame, False)
+        gate_cpu_time += time.process_time() - cpu_start
+
+        if run_detection:
+            detected_frames += 1
+            if detect:
+                cpu_start = time.process_time()
+                left, top, right, bottom = region or (0, 0, frame.shape[1], frame.shape[0])
+                detect(frame[top:bottom, left:right])
+                detect_cpu_time += time.process_time() - cpu_start
+    wall_time = time.perf_counter() - wall_start
+
+    print(f"Frames:                      {len(frames)} ({'recording' if args.recording else 'simulated idle room'})")
+    print(f"Frames passed to detection:  {detected_frames} ({detected_frames / len(frames) * 100:.1f}%)")
+    print(f"Gate CPU time per frame:     {gate_cpu_time / len(frames) * 1000:.2f}ms")
+    if detect:
+        ungated_estimate = detect_cpu_time / max(detected_frames, 1) * len(frames)
+        print(f"Detector CPU time per frame: {detect_cpu_time / len(frames) * 1000:.2f}ms gated vs ~{ungated_estimate / len(frames) * 1000:.2f}ms ungated")
+    print(f"Total wall time:             {wall_time:.2f}s")
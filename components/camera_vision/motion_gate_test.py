@@ -0,0 +1,65 @@
+import numpy as np
+
+from motion_gate import MotionGate, get_union_region, pad_region
+
+
+def make_room(seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).integers(60, 120, size=(480, 640, 3), dtype=np.uint8)
+
+
+def add_noise(frame: np.ndarray, seed: int) -> np.ndarray:
+    noise = np.random.default_rng(seed).integers(-3, 4, size=frame.shape)
+    return np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def test_get_union_region():
+    assert get_union_region([(10, 20, 30, 40), (5, 25, 20, 60)]) == (5, 20, 30, 60)
+
+
+def test_pad_region_is_clipped():
+    assert pad_region((10, 10, 110, 60), 0.5, 640, 480) == (0, 0, 160, 85)
+
+
+def test_first_frame_is_detected():
+    gate = MotionGate()
+    assert gate.get_detection_region(make_room(), False) == (True, None)
+
+
+def test_static_noisy_scene_is_skipped():
+    gate = MotionGate()
+    room = make_room()
+    gate.update(room)
+    for seed in range(5):
+        assert gate.get_detection_region(add_noise(room, seed), False) == (False, None)
+
+
+def test_active_targets_are_always_detected():
+    gate = MotionGate()
+    room = make_room()
+    gate.update(room)
+    assert gate.get_detection_region(room, True) == (True, None)
+
+
+def test_small_motion_is_detected_in_region():
+    gate = MotionGate()
+    room = make_room()
+    gate.update(room)
+
+    moved = room.copy()
+    moved[200:260, 300:340] = 255
+    run_detection, region = gate.get_detection_region(moved, False)
+
+    assert run_detection
+    left, top, right, bottom = region
+    assert left <= 300 and top <= 200 and right >= 340 and bottom >= 260
+    assert (right - left) * (bottom - top) < 640 * 480 / 4
+
+
+def test_large_motion_is_detected_in_whole_frame():
+    gate = MotionGate()
+    room = make_room()
+    gate.update(room)
+
+    moved = room.copy()
+    moved[50:450, 100:600] = 255
+    assert gate.get_detection_region(moved, False) == (True, None)
@@ -0,0 +1,115 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+from typing import Callable, List, Optional, Sequence, Tuple
+import cv2
+import numpy as np
+from nerf_turret_utils.mask_utils import decode_mask, is_point_in_mask
+from camera_vision_utils import draw_face_box, draw_cross_hair
+from yolo_object_detection.utils import draw_object_box
+
+
+def is_target_on_crosshair(target: dict, center_x: int, center_y: int) -> bool:
+    """
+    Checks whether the crosshair is on a target, using its mask when it has one and its box otherwise.
+
+    Args:
+        target: A target with a 'box' and optionally an encoded 'mask' in frame coordinates.
+        center_x: The horizontal position of the crosshair.
+        center_y: The vertical position of the crosshair.
+
+    Returns:
+        True if the crosshair is on the target.
+    """
+    if 'mask' in target:
+        return is_point_in_mask(target['mask'], center_x, center_y)
+    left, top, right, bottom = target['box']
+    return top <= center_y <= bottom and left <= center_x <= right
+
+
+class OverlayRenderer:
+    """Draws the targets and crosshair on a frame with a single mask blend per frame.
+
+    All masks are painted into one overlay buffer that is reused between frames, and the overlay is
+    blended with the frame once, only inside the union of the mask boxes. Boxes, labels and the
+    crosshair are drawn directly on the frame afterwards.
+    """
+
+    def __init__(self, get_color: Callable[[str], Tuple[int, int, int]], box_targets: Optional[Sequence[str]], cross_hair_size: int, alpha: float = 0.5) -> None:
+        """
+        Args:
+            get_color: Gets the color to draw a target type with.
+            box_targets: The target types to draw. No targets are drawn if empty.
+            cross_hair_size: The size of the crosshair in pixels.
+            alpha: The weight of the original frame when blending the masks.
+        """
+        self.get_color = get_color
+        self.box_targets = box_targets or []
+        self.cross_hair_size = cross_hair_size
+        self.alpha = alpha
+        self._overlay: Optional[np.ndarray] = None
+
+
+    def render(self, frame: np.ndarray, targets: List[dict]) -> np.ndarray:
+        """
+        Draws the targets and the crosshair on a frame in place.
+
+        Args:
+            frame: The frame to draw on.
+            targets: The targets with a 'box', a 'type' and optionally an encoded 'mask' in frame coordinates.
+
+        Returns:
+            The frame with the overlay drawn on it.
+        """
+        frame_height, frame_width = frame.shape[:2]
+        center_x, center_y = frame_width // 2, frame_height // 2
+        drawn_targets = [target for target in targets if target['type'] in self.box_targets]
+        is_on_target = any(is_target_on_crosshair(target, center_x, center_y) for target in drawn_targets)
+
+        self._blend_masks(frame, [target for target in drawn_targets if 'mask' in target])
+
+        for target in drawn_targets:
+            if target['type'] == 'face':
+                frame = draw_face_box(frame, target, is_on_target)
+            else:
+                left, top, right, bottom = target['box']
+                frame = draw_object_box(frame, left, top, right, bottom, target['type'], self.get_color(target['type']))
+
+        return draw_cross_hair(frame, self.cross_hair_size, is_on_target)
+
+
+    def _blend_masks(self, frame: np.ndarray, targets: List[dict]) -> None:
+        """Paints all masks into the overlay buffer and blends it with the frame once inside the union of the mask boxes"""
+        frame_height, frame_width = frame.shape[:2]
+        mask_boxes = []
+        for target in targets:
+            left, top, right, bottom = [int(round(value)) for value in target['mask']['box']]
+            if min(right, frame_width) > max(left, 0) and min(bottom, frame_height) > max(top, 0):
+                mask_boxes.append((target, (left, top, right, bottom)))
+        if not mask_boxes:
+            return
+
+        union_left = max(min(box[0] for _, box in mask_boxes), 0)
+        union_top = max(min(box[1] for _, box in mask_boxes), 0)
+        union_right = min(max(box[2] for _, box in mask_boxes), frame_width)
+        union_bottom = min(max(box[3] for _, box in mask_boxes), frame_height)
+
+        if self._overlay is None or self._overlay.shape != frame.shape:
+            self._overlay = np.empty_like(frame)
+        region = frame[union_top:union_bottom, union_left:union_right]
+        overlay = self._overlay[union_top:union_bottom, union_left:union_right]
+        overlay[:] = region
+
+        for target, (left, top, right, bottom) in mask_boxes:
+            mask = cv2.resize(decode_mask(target['mask']), (right - left, bottom - top), interpolation=cv2.INTER_NEAREST)
+            clipped_left, clipped_top = max(left, 0), max(top, 0)
+            clipped_right, clipped_bottom = min(right, frame_width), min(bottom, frame_height)
+            mask = mask[clipped_top - top:clipped_bottom - top, clipped_left - left:clipped_right - left] == 1
+            overlay[
+                clipped_top - union_top:clipped_bottom - union_top,
+                clipped_left - union_left:clipped_right - union_left,
+            ][mask] = self.get_color(target['type'])
+
+        region[:] = cv2.addWeighted(region, self.alpha, overlay, 1 - self.alpha, 0)
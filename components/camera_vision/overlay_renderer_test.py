@@ -0,0 +1,66 @@
+import numpy as np
+
+from nerf_turret_utils.mask_utils import encode_mask
+from overlay_renderer import OverlayRenderer, is_target_on_crosshair
+
+
+COLORS = {'person': (0, 0, 200), 'dog': (200, 0, 0)}
+
+
+def make_target(type: str, box, mask: np.ndarray) -> dict:
+    return {'type': type, 'box': list(box), 'mask': encode_mask(mask, box)}
+
+
+def test_is_target_on_crosshair_uses_mask():
+    target = make_target('person', (0, 0, 100, 100), np.array([[1, 0], [0, 0]]))
+    assert is_target_on_crosshair(target, 25, 25)
+    assert not is_target_on_crosshair(target, 75, 75)
+    del target['mask']
+    assert is_target_on_crosshair(target, 75, 75)
+
+
+def test_masks_are_blended_once_inside_masks_only():
+    renderer = OverlayRenderer(COLORS.get, ['person', 'dog'], cross_hair_size=0)
+    frame = np.full((200, 300, 3), 100, dtype=np.uint8)
+    targets = [
+        make_target('person', (10, 10, 60, 60), np.ones((5, 5))),
+        make_target('dog', (200, 100, 250, 150), np.array([[1, 0], [0, 0]])),
+    ]
+
+    renderer._blend_masks(frame, targets)
+
+    assert frame[30, 30].tolist() == [50, 50, 150]
+    assert frame[110, 210].tolist() == [150, 50, 50]
+    assert frame[140, 240].tolist() == [100, 100, 100]
+    assert frame[80, 100].tolist() == [100, 100, 100]
+
+
+def test_masks_outside_the_frame_are_clipped():
+    renderer = OverlayRenderer(COLORS.get, ['person'], cross_hair_size=0)
+    frame = np.full((100, 100, 3), 100, dtype=np.uint8)
+
+    renderer._blend_masks(frame, [make_target('person', (-50, -50, 50, 50), np.ones((4, 4)))])
+
+    assert frame[0, 0].tolist() == [50, 50, 150]
+    assert frame[60, 60].tolist() == [100, 100, 100]
+
+
+def test_overlay_buffer_is_reused():
+    renderer = OverlayRenderer(COLORS.get, ['person'], cross_hair_size=0)
+    frame = np.full((100, 100, 3), 100, dtype=np.uint8)
+    target = make_target('person', (10, 10, 20, 20), np.ones((2, 2)))
+
+    renderer._blend_masks(frame, [target])
+    buffer = renderer._overlay
+    renderer._blend_masks(frame.copy(), [target])
+
+    assert renderer._overlay is buffer
+
+
+def test_render_skips_targets_not_in_box_targets():
+    renderer = OverlayRenderer(COLORS.get, ['dog'], cross_hair_size=0)
+    frame = np.full((100, 100, 3), 100, dtype=np.uint8)
+
+    renderer.render(frame, [make_target('person', (10, 10, 40, 40), np.ones((2, 2)))])
+
+    assert frame[20, 20].tolist() == [100, 100, 100]
@@ -0,0 +1,88 @@
+import time
+from typing import List, Optional
+
+
+def are_targets_unchanged(previous: List[dict], current: List[dict], tolerance: float) -> bool:
+    """
+    Checks whether the targets of a frame are the same as before within a pixel tolerance.
+
+    Args:
+        previous: The targets of the last published message.
+        current: The targets of the current frame.
+        tolerance: The maximum amount of pixels any box side may have moved.
+
+    Returns:
+        True if both have the same targets in the same order with the same types and ids, and no box moved more than the tolerance.
+    """
+    if len(previous) != len(current):
+        return False
+    for previous_target, target in zip(previous, current):
+        if previous_target['type'] != target['type'] or previous_target.get('id') != target.get('id'):
+            return False
+        if any(abs(a - b) > tolerance for a, b in zip(previous_target['box'], target['box'])):
+            return False
+    return True
+
+
+class PublishPolicy:
+    """Decides which camera vision messages are worth sending to the AI controller.
+
+    Messages whose targets did not change within the pixel tolerance are suppressed, which removes
+    the stream of identical messages while the scene is static or empty. A heartbeat message is still
+    sent when nothing was published for `heartbeat_interval` seconds, so the AI controller can tell a
+    quiet scene from a dead camera.
+    """
+
+    def __init__(self, tolerance: float = 2, heartbeat_interval: float = 1) -> None:
+        """
+        Args:
+            tolerance: The amount of pixels a box may move before the targets count as changed.
+            heartbeat_interval: The maximum amount of seconds between two published messages.
+        """
+        self.tolerance = tolerance
+        self.heartbeat_interval = heartbeat_interval
+        self.frame_count = 0
+        self.published_count = 0
+        self.heartbeat_count = 0
+        self._published_targets: Optional[List[dict]] = None
+        self._published_time = 0.0
+
+
+    def should_publish(self, targets: List[dict], now: Optional[float] = None) -> bool:
+        """
+        Decides whether to publish the targets of a frame and remembers them when it does.
+
+        Args:
+            targets: The targets of the frame.
+            now: The current time in seconds, `time.time()` if not given.
+
+        Returns:
+            True if the targets changed or the heartbeat is due.
+        """
+        now = time.time() if now is None else now
+        self.frame_count += 1
+        unchanged = self._published_targets is not None and are_targets_unchanged(self._published_targets, targets, self.tolerance)
+        is_heartbeat_due = now - self._published_time >= self.heartbeat_interval
+        if unchanged and not is_heartbeat_due:
+            return False
+
+        if unchanged:
+            self.heartbeat_count += 1
+        self.published_count += 1
+        self._published_targets = targets
+        self._published_time = now
+        return True
+
+
+    @property
+    def reduction(self) -> float:
+        """The fraction of frames whose messages were suppressed"""
+        return 1 - self.published_count / self.frame_count if self.frame_count else 0.0
+
+
+    def summary(self) -> str:
+        """Describes how much the message rate was reduced"""
+        return (
+            f"Published {self.published_count} of {self.frame_count} messages "
+            f"({self.heartbeat_count} heartbeats), {self.reduction * 100:.1f}% fewer messages"
+        )
@@ -0,0 +1,44 @@
+import pytest
+
+from publish_policy import PublishPolicy, are_targets_unchanged
+
+
+def person(left: float, top: float = 10, **details) -> dict:
+    return {'type': 'person', 'box': [left, top, left + 50, top + 100], **details}
+
+
+def test_targets_unchanged_within_tolerance():
+    assert are_targets_unchanged([person(10)], [person(12)], tolerance=2)
+    assert not are_targets_unchanged([person(10)], [person(13)], tolerance=2)
+
+def test_targets_changed_by_count_type_or_id():
+    assert not are_targets_unchanged([person(10)], [], tolerance=2)
+    assert not are_targets_unchanged([person(10)], [{**person(10), 'type': 'face'}], tolerance=2)
+    assert not are_targets_unchanged([person(10, id='a')], [person(10, id='b')], tolerance=2)
+    assert are_targets_unchanged([], [], tolerance=2)
+
+
+def test_publishes_the_first_frame_and_changes():
+    policy = PublishPolicy(tolerance=2, heartbeat_interval=1)
+    assert policy.should_publish([person(10)], now=0)
+    assert not policy.should_publish([person(11)], now=0.1)
+    assert policy.should_publish([person(20)], now=0.2)
+    assert policy.should_publish([], now=0.3)
+    assert not policy.should_publish([], now=0.4)
+
+def test_tolerance_is_relative_to_the_published_targets():
+    policy = PublishPolicy(tolerance=2, heartbeat_interval=10)
+    policy.should_publish([person(10)], now=0)
+    assert not policy.should_publish([person(11)], now=0.1)
+    assert not policy.should_publish([person(12)], now=0.2)
+    # A slow drift is published once it adds up to more than the tolerance
+    assert policy.should_publish([person(13)], now=0.3)
+
+def test_sends_heartbeat_while_unchanged():
+    policy = PublishPolicy(tolerance=2, heartbeat_interval=1)
+    published = [policy.should_publish([], now=index * 0.1) for index in range(31)]
+
+    assert published.count(True) == 4 # The first message and a heartbeat every second
+    assert policy.heartbeat_count == 3
+    assert policy.reduction == pytest.approx(1 - 4 / 31)
+    assert 'Published 4 of 31 messages' in policy.summary()
@@ -0,0 +1,130 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+import cv2
+import numpy as np
+from overlay_renderer import OverlayRenderer
+
+
+def get_sidecar_path(video_path: str) -> str:
+    """Gets the path of the JSON lines file with the per frame targets next to a recording"""
+    return os.path.splitext(video_path)[0] + '.jsonl'
+
+
+class Recorder:
+    """Records the camera frames to a video file on a writer thread.
+
+    The camera vision loop only puts frames into a bounded queue. When the disk can not keep up and the
+    queue is full, frames are dropped and counted instead of blocking the loop. Next to the video a JSON
+    lines sidecar file gets one line per written frame with its frame id, timestamp and targets, and the
+    id of the frame the targets were detected in, so the engagement can be replayed for tuning. Gaps in
+    the frame ids show where frames were dropped.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fps: float = 30,
+        annotate: bool = False,
+        get_color: Optional[Callable[[str], Tuple[int, int, int]]] = None,
+        box_targets: Optional[Sequence[str]] = None,
+        cross_hair_size: int = 10,
+        max_queue_size: int = 64,
+        fourcc: str = 'mp4v',
+    ) -> None:
+        """
+        Args:
+            path: The path of the video file. The sidecar file gets the same path with a '.jsonl' extension.
+            fps: The frame rate stored in the video file.
+            annotate: Whether to draw the targets and crosshair on the recorded frames.
+            get_color: Gets the color to draw a target type with when annotating.
+            box_targets: The target types to draw when annotating.
+            cross_hair_size: The size of the crosshair in pixels when annotating.
+            max_queue_size: The maximum amount of frames waiting to be written before new frames are dropped.
+            fourcc: The four character code of the video codec.
+        """
+        self.path = path
+        self.sidecar_path = get_sidecar_path(path)
+        self.fps = fps
+        self.fourcc = fourcc
+        self.recorded_frame_count = 0
+        self.dropped_frame_count = 0
+        self._renderer = OverlayRenderer(get_color or (lambda _: (0, 255, 0)), box_targets, cross_hair_size) if annotate else None
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._writer: Optional[cv2.VideoWriter] = None
+        self._thread = threading.Thread(target=self._run, name='recorder', daemon=True)
+
+
+    def start(self) -> 'Recorder':
+        """Starts the writer thread"""
+        self._thread.start()
+        logging.info(f"Recording to {self.path} with the targets in {self.sidecar_path}")
+        return self
+
+
+    def record(self, frame_id: int, frame: np.ndarray, targets: List[dict], timestamp: Optional[float] = None, targets_frame_id: Optional[int] = None) -> bool:
+        """
+        Queues a frame to be written without waiting for the disk.
+
+        Args:
+            frame_id: The id of the frame in the camera vision loop.
+            frame: The frame to record. It must not be modified afterwards as it is written from the writer thread.
+            targets: The targets found in the frame.
+            timestamp: The unix time of the frame, now if not given.
+            targets_frame_id: The id of the frame the targets were detected in, when the detection skipped this frame.
+
+        Returns:
+            True if the frame was queued, False if it was dropped because the queue is full.
+        """
+        try:
+            self._queue.put_nowait((frame_id, frame, targets, time.time() if timestamp is None else timestamp, frame_id if targets_frame_id is None else targets_frame_id))
+            return True
+        except queue.Full:
+            self.dropped_frame_count += 1
+            logging.debug(f"Recorder queue is full, dropped frame {frame_id} ({self.dropped_frame_count} dropped so far)")
+            return False
+
+
+    def stop(self) -> None:
+        """Writes the queued frames and closes the files"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        logging.info(f"Recorded {self.recorded_frame_count} frames to {self.path}, dropped {self.dropped_frame_count}")
+
+
+    def _run(self) -> None:
+        with open(self.sidecar_path, 'w') as sidecar:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                frame_id, frame, targets, timestamp, targets_frame_id = item
+                if self._renderer:
+                    frame = self._renderer.render(frame.copy(), targets)
+                self._write_frame(frame)
+                sidecar.write(json.dumps({
+                    "frame_id": frame_id,
+                    "video_frame": self.recorded_frame_count,
+                    "timestamp": timestamp,
+                    "targets": targets,
+                    "targets_frame_id": targets_frame_id,
+                }) + '\n')
+                self.recorded_frame_count += 1
+
+        if self._writer:
+            self._writer.release()
+
+
+    def _write_frame(self, frame: np.ndarray) -> None:
+        if self._writer is None:
+            # The frame size is only known once the first frame arrives
+            frame_height, frame_width = frame.shape[:2]
+            self._writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, (frame_width, frame_height))
+            if not self._writer.isOpened():
+                logging.error(f"Could not open {self.path} for recording with the {self.fourcc} codec")
+        self._writer.write(frame)
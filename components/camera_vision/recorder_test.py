@@ -0,0 +1,75 @@
+import json
+import threading
+import cv2
+import numpy as np
+
+from recorder import Recorder, get_sidecar_path
+
+
+def make_frame(value: int) -> np.ndarray:
+    return np.full((48, 64, 3), value, dtype=np.uint8)
+
+
+def read_sidecar(path: str) -> list:
+    with open(path) as sidecar:
+        return [json.loads(line) for line in sidecar]
+
+
+def test_get_sidecar_path():
+    assert get_sidecar_path('/tmp/engagement.mp4') == '/tmp/engagement.jsonl'
+
+
+def test_writes_the_video_and_sidecar(tmp_path):
+    path = str(tmp_path / 'engagement.avi')
+    recorder = Recorder(path, fps=10, fourcc='MJPG').start()
+    targets = [{'type': 'person', 'box': [10, 10, 30, 30]}]
+    for frame_id in range(1, 6):
+        assert recorder.record(frame_id, make_frame(frame_id * 40), targets, timestamp=100 + frame_id, targets_frame_id=frame_id - frame_id % 2 or None)
+    recorder.stop()
+
+    cap = cv2.VideoCapture(path)
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 5
+    cap.release()
+
+    lines = read_sidecar(get_sidecar_path(path))
+    assert [line['frame_id'] for line in lines] == [1, 2, 3, 4, 5]
+    assert [line['video_frame'] for line in lines] == [0, 1, 2, 3, 4]
+    assert lines[0]['timestamp'] == 101
+    assert lines[0]['targets'] == targets
+    assert [line['targets_frame_id'] for line in lines] == [1, 2, 2, 4, 4] # Odd frames reuse the targets of the frame before
+    assert recorder.recorded_frame_count == 5
+    assert recorder.dropped_frame_count == 0
+
+
+def test_drops_frames_instead_of_blocking_when_the_writer_is_slow(tmp_path):
+    path = str(tmp_path / 'engagement.avi')
+    recorder = Recorder(path, fourcc='MJPG', max_queue_size=2)
+    disk_ready = threading.Event()
+    write_frame = recorder._write_frame
+    recorder._write_frame = lambda frame: (disk_ready.wait(), write_frame(frame))
+    recorder.start()
+
+    results = [recorder.record(frame_id, make_frame(0), []) for frame_id in range(1, 11)]
+    disk_ready.set()
+    recorder.stop()
+
+    # One frame is held by the stalled writer and two wait in the queue
+    assert results.count(True) <= 3
+    assert not all(results[3:])
+    assert recorder.dropped_frame_count == results.count(False)
+    assert recorder.recorded_frame_count == results.count(True)
+    assert len(read_sidecar(get_sidecar_path(path))) == recorder.recorded_frame_count
+
+
+def test_annotates_the_recorded_frames(tmp_path):
+    path = str(tmp_path / 'engagement.avi')
+    recorder = Recorder(path, fourcc='MJPG', annotate=True, box_targets=['person'], cross_hair_size=10).start()
+    frame = make_frame(0)
+    recorder.record(1, frame, [{'type': 'person', 'box': [5, 5, 40, 40]}])
+    recorder.stop()
+
+    assert not frame.any() # The frame of the camera vision loop is not drawn on
+    cap = cv2.VideoCapture(path)
+    ret, recorded = cap.read()
+    cap.release()
+    assert ret and recorded.any()
@@ -0,0 +1,126 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Union, overload
+import numpy as np
+
+
+class DetectionResult(Sequence[dict]):
+    """The detections of one image stored as contiguous arrays.
+
+    The arrays can be used directly for vectorized processing. For existing callers the result
+    also behaves like a read only list of detection dictionaries with the keys 'box', 'class_name',
+    'confidence' and, for segmentation models, 'mask'. The dictionaries are only built when accessed.
+    """
+
+    def __init__(
+        self,
+        boxes: np.ndarray,
+        scores: np.ndarray,
+        class_ids: np.ndarray,
+        class_names: Dict[int, str],
+        masks: Optional[List[dict]] = None,
+    ) -> None:
+        """
+        Args:
+            boxes: A (N, 4) int32 array of [left, top, right, bottom] boxes.
+            scores: A (N,) float32 array of detection confidences.
+            class_ids: A (N,) int32 array of class ids.
+            class_names: The mapping of class ids to class names.
+            masks: An optional list of N run length encoded masks, see `nerf_turret_utils.mask_utils.encode_mask`.
+        """
+        assert len(boxes) == len(scores) == len(class_ids), 'boxes, scores and class_ids must have the same length'
+        assert masks is None or len(masks) == len(boxes), 'there must be one mask per box'
+        self.boxes = np.ascontiguousarray(boxes, dtype=np.int32).reshape((-1, 4))
+        self.scores = np.ascontiguousarray(scores, dtype=np.float32)
+        self.class_ids = np.ascontiguousarray(class_ids, dtype=np.int32)
+        self.class_names = class_names
+        self.masks = masks
+
+
+    @classmethod
+    def from_array(cls, data: np.ndarray, class_names: Dict[int, str], masks: Optional[List[dict]] = None) -> 'DetectionResult':
+        """
+        Builds a result from the (N, 6) array of [left, top, right, bottom, confidence, class] rows that YOLO returns.
+
+        Args:
+            data: The detection rows, e.g. `boxes.data.cpu().numpy()` of an Ultralytics result.
+            class_names: The mapping of class ids to class names.
+            masks: An optional list of N run length encoded masks.
+
+        Returns:
+            The detection result.
+        """
+        data = np.asarray(data, dtype=np.float32).reshape((-1, 6))
+        return cls(data[:, :4], data[:, 4], data[:, 5], class_names, masks)
+
+
+    @classmethod
+    def empty(cls, class_names: Dict[int, str]) -> 'DetectionResult':
+        """Builds a result without any detections"""
+        return cls.from_array(np.empty((0, 6), dtype=np.float32), class_names)
+
+
+    @classmethod
+    def concatenate(cls, results: Sequence['DetectionResult']) -> 'DetectionResult':
+        """
+        Joins the detections of several results into one, e.g. for multiple images of the same source.
+
+        Args:
+            results: The results to join. They must share the same class names.
+
+        Returns:
+            The joined result. Masks are only kept if every result has them.
+        """
+        assert len(results) > 0, 'at least one result is needed'
+        masks = None
+        if all(result.masks is not None for result in results):
+            masks = [mask for result in results for mask in result.masks] # type: ignore
+        return cls(
+            np.concatenate([result.boxes for result in results]),
+            np.concatenate([result.scores for result in results]),
+            np.concatenate([result.class_ids for result in results]),
+            results[0].class_names,
+            masks,
+        )
+
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+
+    @overload
+    def __getitem__(self, index: int) -> dict: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[dict]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[dict, List[dict]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('detection index out of range')
+
+        detection = {
+            'box': self.boxes[index].tolist(),
+            'class_name': self.class_names[int(self.class_ids[index])],
+            'confidence': float(self.scores[index]),
+        }
+        if self.masks is not None:
+            detection['mask'] = self.masks[index]
+        return detection
+
+
+    def __iter__(self) -> Iterator[dict]:
+        boxes = self.boxes.tolist()
+        class_ids = self.class_ids.tolist()
+        scores = self.scores.tolist()
+        for index in range(len(boxes)):
+            detection = {
+                'box': boxes[index],
+                'class_name': self.class_names[class_ids[index]],
+                'confidence': scores[index],
+            }
+            if self.masks is not None:
+                detection['mask'] = self.masks[index]
+            yield detection
@@ -0,0 +1,71 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/../..')
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+import timeit
+from argparse import ArgumentParser
+from typing import Any, Dict, List
+import numpy as np
+from yolo_object_detection.detection_result import DetectionResult
+
+try:
+    import torch
+except ImportError:
+    torch = None # type: ignore
+
+
+CLASS_NAMES: Dict[int, str] = {i: f'class_{i}' for i in range(80)}
+
+
+def make_boxes_data(count: int) -> Any:
+    """Makes a (count, 6) YOLO style boxes tensor, or a NumPy array when torch is not installed"""
+    rng = np.random.default_rng(0)
+    corners = rng.uniform(0, 600, size=(count, 2))
+    data = np.hstack([
+        corners,
+        corners + rng.uniform(10, 200, size=(count, 2)),
+        rng.uniform(0.5, 1, size=(count, 1)),
+        rng.integers(0, 80, size=(count, 1)),
+    ]).astype(np.float32)
+    return torch.from_numpy(data) if torch is not None else data
+
+
+def extract_per_box(data: Any) -> List[dict]:
+    """The previous extraction that converts every box on its own"""
+    results = []
+    for i in range(len(data)):
+        box = data[i:i + 1].tolist()[0]
+        results.append({
+            'box': [int(box[0]), int(box[1]), int(box[2]), int(box[3])],
+            'class_name': CLASS_NAMES[int(box[5])],
+            'confidence': box[4],
+        })
+    return results
+
+
+def extract_arrays(data: Any) -> DetectionResult:
+    """The vectorized extraction that copies all boxes at once"""
+    array = data.cpu().numpy() if torch is not None else data
+    return DetectionResult.from_array(array, CLASS_NAMES)
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser(description="Compares per box and vectorized extraction of YOLO detection results")
+    parser.add_argument("--counts", "-c", help="The amounts of detections to benchmark", nargs='+', type=int, default=[1, 20, 100])
+    parser.add_argument("--runs", "-r", help="The amount of timed runs for each measurement", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"Boxes as {'torch tensors' if torch is not None else 'NumPy arrays (torch is not installed)'}")
+    print(f"| {'Detections':>10} | {'Per box µs':>10} | {'Arrays µs':>10} | {'Arrays + dicts µs':>17} |")
+    print(f"|{'-' * 12}|{'-' * 12}|{'-' * 12}|{'-' * 19}|")
+    for count in args.counts:
+        data = make_boxes_data(count)
+        assert extract_per_box(data) == list(extract_arrays(data))
+
+        per_box = min(timeit.repeat(lambda: extract_per_box(data), number=args.runs, repeat=3)) / args.runs
+        arrays = min(timeit.repeat(lambda: extract_arrays(data), number=args.runs, repeat=3)) / args.runs
+        arrays_dicts = min(timeit.repeat(lambda: list(extract_arrays(data)), number=args.runs, repeat=3)) / args.runs
+        print(f"| {count:>10} | {per_box * 1e6:>10.1f} | {arrays * 1e6:>10.1f} | {arrays_dicts * 1e6:>17.1f} |")
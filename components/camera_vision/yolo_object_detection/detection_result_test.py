@@ -0,0 +1,58 @@
+import json
+import numpy as np
+import pytest
+
+from yolo_object_detection.detection_result import DetectionResult
+
+
+CLASS_NAMES = {0: 'person', 1: 'bicycle', 2: 'car'}
+
+
+def make_result(count: int, masks=None) -> DetectionResult:
+    data = np.array([[10 * i, 20 * i, 10 * i + 5.7, 20 * i + 9.2, 0.5 + i / 100, i % 3] for i in range(count)], dtype=np.float32)
+    return DetectionResult.from_array(data, CLASS_NAMES, masks)
+
+
+def test_from_array_is_contiguous():
+    result = make_result(5)
+    assert result.boxes.shape == (5, 4)
+    assert result.boxes.flags['C_CONTIGUOUS']
+    assert result.scores.dtype == np.float32
+    assert result.class_ids.tolist() == [0, 1, 2, 0, 1]
+
+
+def test_dict_view_matches_legacy_format():
+    result = make_result(3)
+    assert len(result) == 3
+    assert result[1] == {'box': [10, 20, 15, 29], 'class_name': 'bicycle', 'confidence': pytest.approx(0.51)}
+    assert list(result) == [result[0], result[1], result[2]]
+    assert result[-1] == result[2]
+    assert result[1:] == [result[1], result[2]]
+
+
+def test_dict_view_is_json_serializable():
+    json.dumps(list(make_result(4)))
+
+
+def test_index_out_of_range():
+    with pytest.raises(IndexError):
+        make_result(2)[2]
+
+
+def test_masks_are_attached():
+    masks = [{'box': [0, 0, 1, 1], 'size': [1, 1], 'counts': [0, 1]}] * 2
+    result = make_result(2, masks)
+    assert all(detection['mask'] == masks[0] for detection in result)
+
+
+def test_empty_result():
+    result = DetectionResult.empty(CLASS_NAMES)
+    assert len(result) == 0
+    assert list(result) == []
+
+
+def test_concatenate():
+    result = DetectionResult.concatenate([make_result(2), make_result(3)])
+    assert len(result) == 5
+    assert result.masks is None
+    assert result[4]['class_name'] == 'car'
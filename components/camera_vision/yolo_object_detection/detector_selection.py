@@ -0,0 +1,175 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+import json
+import time
+import hashlib
+import logging
+import platform
+from typing import Callable, Dict, Optional, Tuple
+import cv2
+import numpy as np
+from yolo_object_detection.object_detector_interface import ObjectDetector
+
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'nerf_turret', 'detector_selection.json')
+
+
+def create_yolo_detector() -> ObjectDetector:
+    from yolo_object_detection.object_detection import YoloObjectDetector
+    return YoloObjectDetector()
+
+
+def create_onnx_detector() -> ObjectDetector:
+    from yolo_object_detection.opencv_onnx_python import ONNXObjectDetector
+    return ONNXObjectDetector()
+
+
+# The backends that `--detector auto` chooses from. A backend whose dependencies or model files are missing is skipped.
+DETECTOR_FACTORIES: Dict[str, Callable[[], ObjectDetector]] = {
+    'yolo': create_yolo_detector,
+    'onnx': create_onnx_detector,
+}
+
+
+def get_machine_fingerprint() -> str:
+    """
+    Builds an id for the hardware and software the detectors run on, so benchmark results are only reused on the same setup.
+
+    Returns:
+        A short hex digest of the machine and library details.
+    """
+    details = [
+        platform.system(),
+        platform.machine(),
+        platform.processor(),
+        str(os.cpu_count()),
+        platform.python_version(),
+        cv2.__version__,
+        np.__version__,
+    ]
+    return hashlib.sha1('|'.join(details).encode('utf-8')).hexdigest()[:16]
+
+
+def benchmark_detector(detector: ObjectDetector, frame: np.ndarray, runs: int = 5, warmup_runs: int = 1) -> float:
+    """
+    Measures the mean time a detector takes to process a frame.
+
+    Args:
+        detector: The detector to time.
+        frame: The frame to run the detection on.
+        runs: The amount of timed detections.
+        warmup_runs: The amount of untimed detections run first to load and compile the model.
+
+    Returns:
+        The mean detection time in seconds.
+    """
+    for _ in range(warmup_runs):
+        detector.detect(frame)
+
+    start_time = time.perf_counter()
+    for _ in range(runs):
+        detector.detect(frame)
+    return (time.perf_counter() - start_time) / runs
+
+
+def format_benchmark_table(timings: Dict[str, Optional[float]]) -> str:
+    """
+    Formats the detector timings as a table from fastest to slowest.
+
+    Args:
+        timings: The mean detection time in seconds per backend, or None if the backend is not available.
+
+    Returns:
+        The table as a multi line string.
+    """
+    lines = [f"| {'Detector':<10} | {'Mean ms':>9} | {'FPS':>6} |", f"|{'-' * 12}|{'-' * 11}|{'-' * 8}|"]
+    for name, timing in sorted(timings.items(), key=lambda item: float('inf') if item[1] is None else item[1]):
+        if timing is None:
+            lines.append(f"| {name:<10} | {'n/a':>9} | {'n/a':>6} |")
+        else:
+            lines.append(f"| {name:<10} | {timing * 1000:>9.1f} | {1 / timing:>6.1f} |")
+    return '\n'.join(lines)
+
+
+def load_cache(cache_path: str) -> dict:
+    """Loads the cached detector selections, or an empty cache if there is none or it is unreadable"""
+    try:
+        with open(cache_path) as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache_path: str, cache: dict) -> None:
+    """Saves the cached detector selections"""
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    with open(cache_path, 'w') as cache_file:
+        json.dump(cache, cache_file, indent=2)
+
+
+def select_fastest_detector(
+    input_size: Tuple[int, int],
+    factories: Dict[str, Callable[[], ObjectDetector]] = DETECTOR_FACTORIES,
+    cache_path: str = DEFAULT_CACHE_PATH,
+    runs: int = 5,
+    use_cache: bool = True,
+) -> Tuple[str, ObjectDetector]:
+    """
+    Picks the fastest available detector backend for this machine and input size.
+
+    The winner is cached per machine fingerprint and input size so the trial only runs once per setup.
+
+    Args:
+        input_size: The (width, height) of the frames the detector will get.
+        factories: The functions that create each backend by name.
+        cache_path: The file the selections are cached in.
+        runs: The amount of timed detections per backend.
+        use_cache: Whether to use a cached selection if there is one.
+
+    Returns:
+        The name and the instance of the fastest detector.
+
+    Raises:
+        RuntimeError: If none of the backends could be created.
+    """
+    width, height = input_size
+    cache_key = f"{get_machine_fingerprint()}-{width}x{height}"
+    cache = load_cache(cache_path)
+
+    cached = cache.get(cache_key)
+    if use_cache and cached and cached['detector'] in factories:
+        logging.info(f"Using the cached fastest detector '{cached['detector']}' for this machine\n" + format_benchmark_table(cached['timings']))
+        try:
+            return cached['detector'], factories[cached['detector']]()
+        except Exception as e:
+            logging.warning(f"Could not create the cached detector '{cached['detector']}', benchmarking again: {e}")
+
+    # Noise rather than a black frame so the detectors do a realistic amount of post processing
+    frame = np.random.default_rng(0).integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+    timings: Dict[str, Optional[float]] = {}
+    detectors: Dict[str, ObjectDetector] = {}
+    for name, factory in factories.items():
+        try:
+            detectors[name] = factory()
+            timings[name] = benchmark_detector(detectors[name], frame, runs)
+        except Exception as e:
+            logging.warning(f"Detector '{name}' is not available: {e}")
+            detectors.pop(name, None)
+            timings[name] = None
+
+    if not detectors:
+        raise RuntimeError(f"None of the detectors {list(factories)} could be created")
+
+    fastest = min(detectors, key=lambda name: timings[name]) # type: ignore
+    logging.info(f"Benchmarked detectors at {width}x{height}, using '{fastest}'\n" + format_benchmark_table(timings))
+
+    cache[cache_key] = {'detector': fastest, 'timings': timings}
+    try:
+        save_cache(cache_path, cache)
+    except OSError as e:
+        logging.warning(f"Could not cache the detector selection at {cache_path}: {e}")
+
+    return fastest, detectors[fastest]
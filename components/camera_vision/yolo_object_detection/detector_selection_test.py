@@ -0,0 +1,80 @@
+import time
+import pytest
+
+from yolo_object_detection.detector_selection import \
+    select_fastest_detector, get_machine_fingerprint, format_benchmark_table, load_cache
+from yolo_object_detection.object_detector_interface import ObjectDetector
+
+
+class SleepingDetector(ObjectDetector):
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+
+    def get_color_for_class_name(self, class_name):
+        return (0, 0, 0)
+
+    def detect(self, source, confidence=0.7):
+        self.calls += 1
+        time.sleep(self.delay)
+        return []
+
+
+def failing_factory():
+    raise ImportError('backend not installed')
+
+
+def test_machine_fingerprint_is_stable():
+    assert get_machine_fingerprint() == get_machine_fingerprint()
+    assert len(get_machine_fingerprint()) == 16
+
+
+def test_selects_fastest_and_caches(tmp_path):
+    cache_path = str(tmp_path / 'selection.json')
+    factories = {
+        'slow': lambda: SleepingDetector(0.02),
+        'fast': lambda: SleepingDetector(0.0),
+        'missing': failing_factory,
+    }
+
+    name, detector = select_fastest_detector((64, 48), factories, cache_path, runs=2)
+
+    assert name == 'fast'
+    assert isinstance(detector, SleepingDetector)
+    [entry] = load_cache(cache_path).values()
+    assert entry['detector'] == 'fast'
+    assert entry['timings']['missing'] is None
+
+
+def test_uses_cached_selection(tmp_path):
+    cache_path = str(tmp_path / 'selection.json')
+    created = []
+
+    def factory(delay):
+        def create():
+            created.append(delay)
+            return SleepingDetector(delay)
+        return create
+
+    factories = {'slow': factory(0.02), 'fast': factory(0.0)}
+    select_fastest_detector((64, 48), factories, cache_path, runs=1)
+    created.clear()
+
+    name, detector = select_fastest_detector((64, 48), factories, cache_path, runs=1)
+
+    assert name == 'fast'
+    assert created == [0.0]
+    assert detector.calls == 0
+
+
+def test_no_available_detectors(tmp_path):
+    with pytest.raises(RuntimeError):
+        select_fastest_detector((64, 48), {'missing': failing_factory}, str(tmp_path / 'selection.json'))
+
+
+def test_format_benchmark_table_sorts_fastest_first():
+    table = format_benchmark_table({'onnx': 0.2, 'yolo': 0.1, 'missing': None}).splitlines()
+    assert 'yolo' in table[2]
+    assert 'onnx' in table[3]
+    assert 'n/a' in table[4]
@@ -6,13 +6,15 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
 
 
 import time
-from typing import List, Tuple, Union
+from typing import List, Sequence, Tuple, Union
 import numpy as np
 from ultralytics import YOLO
 from nerf_turret_utils.args_utils import map_log_level
+from nerf_turret_utils.mask_utils import encode_mask, is_point_in_mask, transform_encoded_mask
 import logging
-from yolo_object_detection.utils import draw_object_mask, draw_object_box
+from yolo_object_detection.utils import draw_encoded_object_mask, draw_object_box
 from yolo_object_detection.object_detector_interface import ObjectDetector
+from yolo_object_detection.detection_result import DetectionResult
 import abc
 
     
@@ -35,7 +37,7 @@ class YoloObjectDetector(ObjectDetector):
         return self.colors[self._class_name_id[class_name]]
 
 
-    def detect(self, source: Union[str, int, np.ndarray], confidence: float = 0.7, save=False, save_txt=False) -> List[dict]:
+    def detect(self, source: Union[str, int, np.ndarray], confidence: float = 0.7, save=False, save_txt=False) -> Sequence[dict]:
         """
         Performs YOLOv8 segmentation on an image or video frame.
 
@@ -47,43 +49,77 @@ class YoloObjectDetector(ObjectDetector):
             save_txt: Whether to save the results to a text file (default=False).
 
         Returns:
-            A list of dictionaries containing the detection results.
+            A sequence of dictionaries containing the detection results, backed by a `DetectionResult`.
                 Each dictionary contains the following keys:
                 - 'box': A list of four integers [left, top, right, bottom] representing the bounding box coordinates.
-                - 'mask': A NumPy array containing the segmentation mask for the detected object.
+                - 'mask': The run length encoded segmentation mask covering the box, see `nerf_turret_utils.mask_utils.encode_mask`.
+                    Only present for segmentation models.
                 - 'class_name': A string representing the name of the detected object class.
                 - 'confidence': A float representing the confidence level of the detection.
         """
-        # return model.predict(uri, save=True, save_txt=True, conf=0.8)
-        results: List[dict] = []
+        return self.detect_arrays(source, confidence, save=save, save_txt=save_txt)
+
+
+    def detect_arrays(self, source: Union[str, int, np.ndarray], confidence: float = 0.7, save=False, save_txt=False) -> DetectionResult:
+        """
+        Performs YOLOv8 segmentation and returns the detections as contiguous arrays.
+
+        The boxes of each image are copied out of the model output in one go instead of box by box.
+
+        Args:
+            source: The source of the image or video frame to be segmented.
+                Can be a file path (str), camera ID (int), or a NumPy array containing the image data.
+            confidence: The minimum confidence level required for a detection to be included in the results.
+            save: Whether to save the results to an image file (default=False).
+            save_txt: Whether to save the results to a text file (default=False).
+
+        Returns:
+            The detections of all images in the source.
+        """
+        results: List[DetectionResult] = []
 
         detections = self.model.predict(source, save=save, save_txt=save_txt, conf=confidence)
         
         for detection in detections:
             if hasattr(detection, 'boxes') and detection.boxes:
-                boxes = detection.boxes
-                for i, box in enumerate(boxes): # type: ignore
-                    #   boxes (torch.Tensor) or (numpy.ndarray): A tensor or numpy array containing the detection boxes,
-                    #   with shape (num_boxes, 6). The last two columns should contain confidence and class values.
-                    box = box.data.tolist()[0]
-                    # Extract the height, width, top, bottom, left, and right values
-                    left = box[0]
-                    top = box[1]
-                    right = box[2]
-                    bottom = box[3]
-                    confidence = box[4]
-                  
-                    result = {
-                        'box': [ int(left), int(top), int(right), int(bottom) ],
-                        'class_name': self.class_names[int(box[5])],
-                        'confidence': box[4]
-                    }
-                    if detection.masks:
-                        result['mask'] = detection.masks[i].numpy().data
-
-                    results.append(result)
+                #   boxes (torch.Tensor) or (numpy.ndarray): A tensor or numpy array containing the detection boxes,
+                #   with shape (num_boxes, 6). The last two columns should contain confidence and class values.
+                data = detection.boxes.data.cpu().numpy()
+                result = DetectionResult.from_array(data, self.class_names)
+                
+                if detection.masks:
+                    masks = detection.masks.data.cpu().numpy()
+                    result.masks = [
+                        self._encode_box_mask(masks[i], detection.orig_shape, box) for i, box in enumerate(result.boxes.tolist())
+                    ]
+
+                results.append(result)
                     
-        return results
+        return DetectionResult.concatenate(results) if results else DetectionResult.empty(self.class_names)
+
+
+    def _encode_box_mask(self, mask: np.ndarray, image_shape: Tuple[int, int], box: List[int]) -> dict:
+        """
+        Crops the part of a full image mask that lies under the detection box and run length encodes it.
+
+        Args:
+            mask: The dense mask for the whole image at the resolution of the model output.
+            image_shape: The (height, width) of the source image.
+            box: The [left, top, right, bottom] detection box in source image coordinates.
+
+        Returns:
+            The encoded mask covering the detection box.
+        """
+        mask_height, mask_width = mask.shape
+        image_height, image_width = image_shape[:2]
+        left, top, right, bottom = box
+        
+        mask_left = min(int(left * mask_width / image_width), mask_width - 1)
+        mask_top = min(int(top * mask_height / image_height), mask_height - 1)
+        mask_right = max(int(np.ceil(right * mask_width / image_width)), mask_left + 1)
+        mask_bottom = max(int(np.ceil(bottom * mask_height / image_height)), mask_top + 1)
+        
+        return encode_mask(mask[mask_top:mask_bottom, mask_left:mask_right], box)
 
 
     
@@ -168,13 +204,14 @@ if __name__ == '__main__':
             
                 target_highlight_color = detector.get_color_for_class_name(id)
                 
-                mask = result.get('mask', np.array([]))
+                mask = result.get('mask')
                 
                 is_on_target = False
                 if args.draw_mask and mask is not None:
+                    mask = transform_encoded_mask(mask, scale=args.image_compression)
                     # Check if the center position is within the segmented masked area
-                    is_on_target = mask[center[1], center[0]] == 1
-                    frame = draw_object_mask(frame, target_highlight_color, mask)
+                    is_on_target = is_point_in_mask(mask, center[0], center[1])
+                    frame = draw_encoded_object_mask(frame, target_highlight_color, mask)
                 else:
                     if top <= center[0] <= bottom and left <= center[1] <= right:
                         is_on_target=True
@@ -0,0 +1,198 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/../..')
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+import math
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+import cv2
+import numpy as np
+from yolo_object_detection.object_detector_interface import ObjectDetector
+from nerf_turret_utils.mask_utils import transform_encoded_mask
+
+
+def get_tile_starts(length: int, tile_size: int, overlap: int) -> List[int]:
+    """
+    Calculates the start positions of overlapping tiles along one axis of an image.
+
+    Args:
+        length: The length of the image axis in pixels.
+        tile_size: The length of each tile in pixels.
+        overlap: The minimum amount of pixels neighbouring tiles share.
+
+    Returns:
+        A list of tile start positions. The last tile always ends on the edge of the image.
+    """
+    assert 0 <= overlap < tile_size, 'overlap must be smaller than the tile size'
+    if length <= tile_size:
+        return [0]
+
+    tile_count = math.ceil((length - overlap) / (tile_size - overlap))
+    stride = (length - tile_size) / (tile_count - 1)
+    return [round(i * stride) for i in range(tile_count)]
+
+
+def get_tiles(frame_width: int, frame_height: int, tile_size: int, overlap: int) -> List[Tuple[int, int, int, int]]:
+    """
+    Splits a frame into overlapping tiles that cover the whole frame.
+
+    Args:
+        frame_width: The width of the frame in pixels.
+        frame_height: The height of the frame in pixels.
+        tile_size: The width and height of each tile in pixels.
+        overlap: The minimum amount of pixels neighbouring tiles share.
+
+    Returns:
+        A list of tiles as [left, top, right, bottom] coordinates.
+    """
+    return [
+        (left, top, min(left + tile_size, frame_width), min(top + tile_size, frame_height))
+        for top in get_tile_starts(frame_height, tile_size, overlap)
+        for left in get_tile_starts(frame_width, tile_size, overlap)
+    ]
+
+
+def get_compression_for_targets(tracked_boxes: Sequence[Sequence[int]], min_target_size: int, max_compression: int) -> int:
+    """
+    Picks the largest image compression that still keeps every tracked target big enough to be detected.
+
+    Args:
+        tracked_boxes: The [left, top, right, bottom] boxes of the targets seen in the previous frame in full frame coordinates.
+        min_target_size: The minimum height in pixels a target should have in the compressed image.
+        max_compression: The upper limit for the compression.
+
+    Returns:
+        The compression factor to use for the next inference, between 1 and `max_compression`.
+    """
+    smallest_height = min(bottom - top for _, top, _, bottom in tracked_boxes)
+    compression = int(smallest_height // min_target_size)
+    return max(1, min(compression, max_compression))
+
+
+def merge_detections(detections: List[dict], iou_threshold: float) -> List[dict]:
+    """
+    Removes duplicate detections of the same object, e.g. from overlapping tiles, with a per class non maximum suppression.
+
+    Args:
+        detections: A list of detection dictionaries with a 'box' [left, top, right, bottom], 'class_name' and 'confidence'.
+        iou_threshold: The intersection over union above which two boxes of the same class are treated as the same object.
+
+    Returns:
+        The detections that were kept.
+    """
+    detections_by_class: Dict[str, List[dict]] = {}
+    for detection in detections:
+        detections_by_class.setdefault(detection['class_name'], []).append(detection)
+
+    merged: List[dict] = []
+    for class_detections in detections_by_class.values():
+        boxes = [[left, top, right - left, bottom - top] for left, top, right, bottom in (d['box'] for d in class_detections)]
+        scores = [float(d['confidence']) for d in class_detections]
+        keep = cv2.dnn.NMSBoxes(boxes, scores, 0.0, iou_threshold)
+        merged.extend(class_detections[int(i)] for i in np.array(keep).flatten())
+    return merged
+
+
+class DynamicResolutionDetector(ObjectDetector):
+    """Wraps another detector and picks the inference resolution for every frame.
+
+    When targets were seen in the previous frame the frame is compressed as much as the smallest
+    of them allows. When no target is being tracked the frame is scanned at native resolution in
+    overlapping tiles so that far away targets are not lost to the compression.
+    """
+
+    def __init__(
+        self,
+        detector: ObjectDetector,
+        max_compression: int = 4,
+        min_target_size: int = 64,
+        tile_size: int = 640,
+        tile_overlap: int = 128,
+        iou_threshold: float = 0.5,
+    ) -> None:
+        self.detector = detector
+        self.max_compression = max_compression
+        self.min_target_size = min_target_size
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.iou_threshold = iou_threshold
+
+
+    @property
+    def class_names(self) -> Dict[int, str]:
+        """The class names of the wrapped detector by class id"""
+        return self.detector.class_names # type: ignore
+
+
+    def get_color_for_class_name(self, class_name: str) -> Tuple[int, int, int]:
+        """Gets the color for a particular class by name"""
+        return self.detector.get_color_for_class_name(class_name)
+
+
+    def detect(self, frame: np.ndarray, confidence: float = 0.7, tracked_boxes: Optional[Sequence[Sequence[int]]] = None) -> List[dict]:
+        """
+        Detects objects in a full resolution frame.
+
+        Args:
+            frame: The full resolution frame to detect objects in.
+            confidence: The minimum confidence level required for a detection to be included in the results.
+            tracked_boxes: The [left, top, right, bottom] boxes of the targets seen in the previous frame.
+
+        Returns:
+            A list of detection dictionaries with the 'box' in full frame coordinates.
+        """
+        if tracked_boxes:
+            compression = get_compression_for_targets(tracked_boxes, self.min_target_size, self.max_compression)
+            logging.debug(f"Detecting with dynamic compression {compression}")
+            return self.detect_compressed(frame, confidence, compression)
+
+        return self.detect_tiled(frame, confidence)
+
+
+    def detect_tiled(self, frame: np.ndarray, confidence: float = 0.7) -> List[dict]:
+        """
+        Runs the detector over overlapping native resolution tiles and merges the results.
+
+        Args:
+            frame: The full resolution frame to detect objects in.
+            confidence: The minimum confidence level required for a detection to be included in the results.
+
+        Returns:
+            A list of detection dictionaries with the 'box' in full frame coordinates.
+        """
+        frame_height, frame_width = frame.shape[:2]
+        tiles = get_tiles(frame_width, frame_height, self.tile_size, self.tile_overlap)
+        logging.debug(f"Detecting with a tiled scan over {len(tiles)} tiles")
+
+        detections = []
+        for left, top, right, bottom in tiles:
+            for result in self.detector.detect(frame[top:bottom, left:right], confidence):
+                box_left, box_top, box_right, box_bottom = result['box']
+                detection = {
+                    'box': [box_left + left, box_top + top, box_right + left, box_bottom + top],
+                    'class_name': result['class_name'],
+                    'confidence': result['confidence'],
+                }
+                if 'mask' in result:
+                    detection['mask'] = transform_encoded_mask(result['mask'], offset_x=left, offset_y=top)
+                detections.append(detection)
+
+        return merge_detections(detections, self.iou_threshold) if len(tiles) > 1 else detections
+
+
+    def detect_compressed(self, frame: np.ndarray, confidence: float, compression: int) -> List[dict]:
+        """Runs the detector on a compressed frame and scales the boxes back to full frame coordinates"""
+        compressed_frame = frame if compression == 1 else cv2.resize(frame, (0, 0), fx=1/compression, fy=1/compression)
+        results = []
+        for result in self.detector.detect(compressed_frame, confidence):
+            detection = {
+                'box': [int(value * compression) for value in result['box']],
+                'class_name': result['class_name'],
+                'confidence': result['confidence'],
+            }
+            if 'mask' in result:
+                detection['mask'] = transform_encoded_mask(result['mask'], scale=compression)
+            results.append(detection)
+        return results
@@ -0,0 +1,70 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/../..')
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+import time
+import logging
+from argparse import ArgumentParser
+from typing import List
+import cv2
+import numpy as np
+from nerf_turret_utils.args_utils import map_log_level
+from yolo_object_detection.object_detection import YoloObjectDetector
+from yolo_object_detection.tiled_detection import DynamicResolutionDetector
+
+
+def place_at_distance(image: np.ndarray, scale: float, frame_width: int, frame_height: int) -> np.ndarray:
+    """Shrinks the image by `scale` to simulate the scene being further away and centers it on an empty frame"""
+    frame = np.zeros((frame_height, frame_width, 3), dtype=np.uint8)
+    resized = cv2.resize(image, (0, 0), fx=scale, fy=scale)
+    height, width = resized.shape[:2]
+    top = (frame_height - height) // 2
+    left = (frame_width - width) // 2
+    frame[top:top + height, left:left + width] = resized
+    return frame
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser(description="Compares detection range and CPU cost of compressed, native and dynamic resolution inference")
+    parser.add_argument("--log-level", "-ll", help="Set the logging level by integer value.", default=logging.WARNING, type=map_log_level)
+    parser.add_argument("--image", "-i", help="The image to use as the scene", type=str, default=os.path.dirname(os.path.abspath(__file__)) + '/bus.jpg')
+    parser.add_argument("--model-name", "-mn", help="The model name to use for detection", type=str, default="yolov8n.pt")
+    parser.add_argument("--frame-size", "-fs", help="The width and height of the simulated camera frame", nargs=2, type=int, default=[1920, 1080])
+    parser.add_argument("--scales", "-s", help="The scales the scene is shrunk by to simulate distance", nargs='+', type=float, default=[1.0, 0.5, 0.25, 0.15, 0.1])
+    parser.add_argument("--image-compression", "-ic", help="The compression to use for the compressed mode", type=int, default=4)
+    parser.add_argument("--runs", "-r", help="The amount of timed runs for each measurement", type=int, default=5)
+    parser.add_argument("--confidence", "-c", help="The minimum confidence for a detection", type=float, default=0.5)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level)
+
+    yolo_detector = YoloObjectDetector(model_name=args.model_name)
+    dynamic_detector = DynamicResolutionDetector(yolo_detector, max_compression=args.image_compression)
+    scene = cv2.imread(args.image)
+    frame_width, frame_height = args.frame_size
+
+    modes = {
+        f'compressed {args.image_compression}x': lambda frame: dynamic_detector.detect_compressed(frame, args.confidence, args.image_compression),
+        'native': lambda frame: yolo_detector.detect(frame, args.confidence),
+        'tiled scan': lambda frame: dynamic_detector.detect_tiled(frame, args.confidence),
+    }
+
+    print(f"| {'Scale':>5} | {'Mode':<14} | {'People':>6} | {'Wall ms':>8} | {'CPU ms':>8} |")
+    print(f"|{'-' * 7}|{'-' * 16}|{'-' * 8}|{'-' * 10}|{'-' * 10}|")
+    for scale in args.scales:
+        frame = place_at_distance(scene, scale, frame_width, frame_height)
+        for mode, detect in modes.items():
+            detect(frame) # Warm up
+            wall_times: List[float] = []
+            cpu_times: List[float] = []
+            for _ in range(args.runs):
+                wall_start, cpu_start = time.perf_counter(), time.process_time()
+                results = detect(frame)
+                wall_times.append(time.perf_counter() - wall_start)
+                cpu_times.append(time.process_time() - cpu_start)
+
+            people = len([result for result in results if result['class_name'] == 'person'])
+            print(f"| {scale:>5} | {mode:<14} | {people:>6} | {np.mean(wall_times) * 1000:>8.1f} | {np.mean(cpu_times) * 1000:>8.1f} |")
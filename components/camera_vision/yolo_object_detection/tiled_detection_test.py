@@ -0,0 +1,79 @@
+import numpy as np
+
+from yolo_object_detection.tiled_detection import \
+    get_tile_starts, get_tiles, get_compression_for_targets, merge_detections, DynamicResolutionDetector
+from yolo_object_detection.object_detector_interface import ObjectDetector
+
+
+class FakeDetector(ObjectDetector):
+    """Returns a fixed box in the coordinates of whatever image it is given"""
+
+    def __init__(self, box):
+        self.box = box
+        self.shapes = []
+
+    def get_color_for_class_name(self, class_name):
+        return (0, 0, 0)
+
+    def detect(self, source, confidence=0.7):
+        self.shapes.append(source.shape[:2])
+        return [{'box': list(self.box), 'class_name': 'person', 'confidence': 0.9}]
+
+
+def test_get_tile_starts_single_tile():
+    assert get_tile_starts(480, 640, 128) == [0]
+
+
+def test_get_tile_starts_cover_axis():
+    starts = get_tile_starts(1920, 640, 128)
+    assert starts[0] == 0
+    assert starts[-1] + 640 == 1920
+    assert all(b - a <= 640 - 128 for a, b in zip(starts, starts[1:]))
+
+
+def test_get_tiles_cover_frame():
+    tiles = get_tiles(1280, 720, 640, 128)
+    assert len(tiles) == 6
+    assert max(right for _, _, right, _ in tiles) == 1280
+    assert max(bottom for _, _, _, bottom in tiles) == 720
+
+
+def test_get_compression_for_targets():
+    assert get_compression_for_targets([[0, 0, 100, 400]], 64, 4) == 4
+    assert get_compression_for_targets([[0, 0, 100, 400], [0, 0, 20, 130]], 64, 4) == 2
+    assert get_compression_for_targets([[0, 0, 10, 20]], 64, 4) == 1
+
+
+def test_merge_detections_removes_tile_duplicates():
+    detections = [
+        {'box': [100, 100, 200, 300], 'class_name': 'person', 'confidence': 0.9},
+        {'box': [102, 98, 201, 300], 'class_name': 'person', 'confidence': 0.8},
+        {'box': [102, 98, 201, 300], 'class_name': 'dog', 'confidence': 0.8},
+        {'box': [500, 100, 600, 300], 'class_name': 'person', 'confidence': 0.7},
+    ]
+    merged = merge_detections(detections, 0.5)
+    assert len(merged) == 3
+    assert detections[1] not in merged
+
+
+def test_detect_compresses_when_tracking():
+    fake = FakeDetector([10, 10, 20, 40])
+    detector = DynamicResolutionDetector(fake, max_compression=4, min_target_size=64)
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+
+    results = detector.detect(frame, tracked_boxes=[[0, 0, 100, 200]])
+
+    assert fake.shapes == [(240, 427)]
+    assert results[0]['box'] == [30, 30, 60, 120]
+
+
+def test_detect_scans_tiles_without_targets():
+    fake = FakeDetector([10, 10, 20, 40])
+    detector = DynamicResolutionDetector(fake, tile_size=640, tile_overlap=128)
+    frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+
+    results = detector.detect(frame)
+
+    assert len(fake.shapes) == 6
+    assert all(h <= 640 and w <= 640 for h, w in fake.shapes)
+    assert [10, 10, 20, 40] in [r['box'] for r in results]
@@ -2,6 +2,7 @@ from typing import Tuple
 import numpy as np
 import cv2
 from nerf_turret_utils.image_utils import get_frame_box_vec_delta
+from nerf_turret_utils.mask_utils import decode_mask
 
 
 def draw_object_mask(frame: np.ndarray, target_highlight_color: Tuple[int, int, int], mask: np.ndarray) -> np.ndarray:
@@ -33,6 +34,36 @@ def draw_object_mask(frame: np.ndarray, target_highlight_color: Tuple[int, int,
     return frame
 
 
+def draw_encoded_object_mask(frame: np.ndarray, target_highlight_color: Tuple[int, int, int], encoded_mask: dict) -> np.ndarray:
+    """
+    Draws a run length encoded segmentation mask on an image frame, only touching the pixels under the mask box.
+
+    Args:
+        frame: A NumPy array representing the image frame.
+        target_highlight_color: The color to highlight the segmentation mask.
+        encoded_mask: A mask as returned by `nerf_turret_utils.mask_utils.encode_mask` in frame coordinates.
+
+    Returns:
+        A NumPy array representing the image frame with the segmentation mask drawn on it.
+    """
+    assert type(frame) == np.ndarray, 'frame must be a numpy array'
+    
+    frame_height, frame_width = frame.shape[:2]
+    left, top, right, bottom = [int(round(value)) for value in encoded_mask['box']]
+    clipped_left, clipped_top = max(left, 0), max(top, 0)
+    clipped_right, clipped_bottom = min(right, frame_width), min(bottom, frame_height)
+    if clipped_right <= clipped_left or clipped_bottom <= clipped_top:
+        return frame
+    
+    mask = cv2.resize(decode_mask(encoded_mask), (right - left, bottom - top), interpolation=cv2.INTER_NEAREST)
+    mask = mask[clipped_top - top:clipped_bottom - top, clipped_left - left:clipped_right - left] == 1
+    
+    region = frame[clipped_top:clipped_bottom, clipped_left:clipped_right]
+    alpha = 0.5  # Adjust the alpha value for the blending
+    region[mask] = (region[mask] * alpha + np.array(target_highlight_color) * (1 - alpha)).astype(frame.dtype)
+    return frame
+
+
 def draw_object_box(frame: np.ndarray, left: int, top: int, right: int, bottom: int, box_text: str, target_highlight_color: Tuple[int, int, int]) -> np.ndarray:
     """
     Draws a bounding box around an object in the given frame, with a label and name.
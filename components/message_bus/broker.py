@@ -0,0 +1,238 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+import json
+import logging
+import socket
+import threading
+from collections import deque
+from typing import Deque, Dict, List, Optional
+from nerf_turret_utils.message_framing import HEADER, MessageDecoder, encode_json_message, encode_message
+
+
+RETAIN_FLAG = 1 # Set on the first byte of a published frame to keep the message for new subscribers
+NO_RETAINED_MESSAGE = b'{}' # Sent to new subscribers of a topic without a retained message
+
+
+def recv_message(connection: socket.socket) -> Optional[bytes]:
+    """
+    Receives exactly one length prefixed message without reading any bytes of the next one.
+
+    Args:
+        connection: The socket to receive from.
+
+    Returns:
+        The payload, or None if the connection closed.
+    """
+    header = recv_exact(connection, HEADER.size)
+    if header is None:
+        return None
+    (size,) = HEADER.unpack(header)
+    return recv_exact(connection, size)
+
+
+def recv_exact(connection: socket.socket, size: int) -> Optional[bytes]:
+    """Receives exactly `size` bytes, or None if the connection closed before"""
+    data = bytearray()
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return bytes(data)
+
+
+class Subscription:
+    """The bounded queue of messages waiting to be sent to one subscriber.
+
+    When the subscriber can not keep up the oldest messages are dropped, so a slow subscriber never
+    slows down the publisher or the other subscribers and always gets the most recent messages.
+    """
+
+    def __init__(self, connection: socket.socket, topic: str, max_queue_size: int, first_message: Optional[bytes] = None) -> None:
+        """
+        Args:
+            connection: The connection of the subscriber.
+            topic: The subscribed topic.
+            max_queue_size: The maximum amount of messages waiting to be sent before the oldest are dropped.
+            first_message: A message to send before the queued ones that is never dropped, e.g. the retained message of the topic.
+        """
+        self.connection = connection
+        self.topic = topic
+        self.first_message = first_message
+        self.sent_count = 0
+        self.dropped_count = 0
+        self.is_closed = False
+        self._queue: Deque[bytes] = deque(maxlen=max_queue_size)
+        self._condition = threading.Condition()
+
+
+    def put(self, payload: bytes) -> None:
+        """Queues a message, dropping the oldest one when the queue is full"""
+        with self._condition:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped_count += 1
+            self._queue.append(payload)
+            self._condition.notify()
+
+
+    def close(self) -> None:
+        """Stops sending to the subscriber"""
+        with self._condition:
+            self.is_closed = True
+            self._condition.notify()
+
+
+    def run(self) -> None:
+        """Sends the first message and then the queued messages until the subscriber disconnects or the subscription is closed"""
+        if self.first_message is not None:
+            try:
+                self.connection.sendall(encode_message(self.first_message))
+            except OSError:
+                return
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self.is_closed)
+                if self.is_closed:
+                    return
+                payload = self._queue.popleft()
+            try:
+                self.connection.sendall(encode_message(payload))
+                self.sent_count += 1
+            except OSError:
+                return
+
+
+class MessageBroker:
+    """A local publish/subscribe broker on a Unix domain socket.
+
+    Every client sends a JSON handshake message first: `{"publish": topic}` or `{"subscribe": topic}`.
+    Publishers then send length prefixed frames of a flags byte and the payload, and every subscriber of
+    the topic gets the payload as a length prefixed message through its own bounded queue. A message
+    published with the retain flag, like the encoding hello of the camera vision, is also kept and sent
+    as the first message to every subscriber that joins later. Subscribers of a topic without a
+    retained message get `{}` first instead, so they always know the first message is the retained one.
+    """
+
+    def __init__(self, path: str, max_queue_size: int = 8) -> None:
+        """
+        Args:
+            path: The file path of the Unix domain socket to listen on.
+            max_queue_size: The maximum amount of messages waiting for each subscriber before the oldest are dropped.
+        """
+        self.path = path
+        self.max_queue_size = max_queue_size
+        self.published_count = 0
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[str, List[Subscription]] = {}
+        self._retained: Dict[str, bytes] = {}
+        self._connections: List[socket.socket] = []
+        self._stopped = threading.Event()
+
+        if os.path.exists(path):
+            os.remove(path) # Left over from a previous broker that did not shut down cleanly
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(path)
+        self._server.listen()
+        self._thread = threading.Thread(target=self._accept, name='message-broker', daemon=True)
+
+
+    def start(self) -> 'MessageBroker':
+        """Starts accepting publishers and subscribers"""
+        self._thread.start()
+        logging.info(f"Message bus listening on {self.path}")
+        return self
+
+
+    def stop(self) -> None:
+        """Disconnects all clients and removes the socket file"""
+        self._stopped.set()
+        self._server.close()
+        with self._lock:
+            for subscriptions in self._subscriptions.values():
+                for subscription in subscriptions:
+                    subscription.close()
+            for connection in self._connections:
+                connection.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+    def get_subscriptions(self, topic: str) -> List[Subscription]:
+        """The current subscriptions of a topic"""
+        with self._lock:
+            return list(self._subscriptions.get(topic, []))
+
+
+    def _accept(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                connection, _ = self._server.accept()
+            except OSError:
+                return
+            with self._lock:
+                self._connections.append(connection)
+            threading.Thread(target=self._handle, args=(connection,), name='message-broker-client', daemon=True).start()
+
+
+    def _handle(self, connection: socket.socket) -> None:
+        try:
+            handshake = recv_message(connection)
+            request = json.loads(handshake) if handshake else {}
+            if 'publish' in request:
+                self._publish_from(connection, request['publish'])
+            elif 'subscribe' in request:
+                self._subscribe(connection, request['subscribe'])
+            else:
+                logging.warning(f"Message bus client sent an invalid handshake: {handshake!r}")
+        except (OSError, ValueError) as e:
+            logging.debug(f"Message bus client failed: {e}")
+        finally:
+            with self._lock:
+                if connection in self._connections:
+                    self._connections.remove(connection)
+            connection.close()
+
+
+    def _publish_from(self, connection: socket.socket, topic: str) -> None:
+        logging.info(f"Publisher connected to topic '{topic}'")
+        decoder = MessageDecoder()
+        while not self._stopped.is_set():
+            data = connection.recv(65536)
+            if not data:
+                break
+            for frame in decoder.feed(data):
+                self._publish(topic, frame[1:], retain=bool(frame[0] & RETAIN_FLAG))
+        logging.info(f"Publisher of topic '{topic}' disconnected")
+
+
+    def _publish(self, topic: str, payload: bytes, retain: bool = False) -> None:
+        with self._lock:
+            if retain:
+                self._retained[topic] = payload
+            subscriptions = list(self._subscriptions.get(topic, []))
+            self.published_count += 1
+        for subscription in subscriptions:
+            subscription.put(payload)
+
+
+    def _subscribe(self, connection: socket.socket, topic: str) -> None:
+        with self._lock:
+            # The retained message is taken and the subscription registered under the lock, so no message
+            # is published in between. It is sent by the subscription, so a stalled subscriber never holds the lock
+            subscription = Subscription(connection, topic, self.max_queue_size, self._retained.get(topic, NO_RETAINED_MESSAGE))
+            self._subscriptions.setdefault(topic, []).append(subscription)
+        logging.info(f"Subscriber connected to topic '{topic}'")
+
+        subscription.run()
+
+        with self._lock:
+            self._subscriptions[topic].remove(subscription)
+        logging.info(f"Subscriber of topic '{topic}' disconnected after {subscription.sent_count} messages, dropped {subscription.dropped_count}")
+
+
+def encode_handshake(role: str, topic: str) -> bytes:
+    """Creates the first message a client sends to the broker, with the role 'publish' or 'subscribe'"""
+    return encode_json_message({role: topic})
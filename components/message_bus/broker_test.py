@@ -0,0 +1,118 @@
+import json
+import threading
+import time
+import pytest
+import socket
+from message_bus.broker import MessageBroker, encode_handshake
+from message_bus.bus_client import BusPublisher, BusSubscriber
+from nerf_turret_utils.message_framing import MessageDecoder
+
+
+@pytest.fixture
+def broker(tmp_path):
+    broker = MessageBroker(str(tmp_path / 'bus.sock'), max_queue_size=4).start()
+    yield broker
+    broker.stop()
+
+
+def receive(subscriber: BusSubscriber, count: int, timeout: float = 2) -> list:
+    decoder = MessageDecoder()
+    messages: list = []
+    subscriber.connection.settimeout(timeout)
+    while len(messages) < count:
+        messages += decoder.feed(subscriber.connection.recv(65536))
+    return messages
+
+
+def wait_for_subscribers(broker: MessageBroker, topic: str, count: int) -> None:
+    deadline = time.time() + 2
+    while len(broker.get_subscriptions(topic)) < count and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_every_subscriber_gets_the_messages(broker):
+    subscribers = [BusSubscriber(broker.path, 'targets') for _ in range(3)]
+    publisher = BusPublisher(broker.path, 'targets')
+    wait_for_subscribers(broker, 'targets', 3)
+
+    for index in range(3):
+        publisher.publish(f'message {index}'.encode())
+
+    for subscriber in subscribers:
+        assert subscriber.retained is None
+        assert receive(subscriber, 3) == [b'message 0', b'message 1', b'message 2']
+
+
+def test_topics_are_separate(broker):
+    targets = BusSubscriber(broker.path, 'targets')
+    status = BusSubscriber(broker.path, 'status')
+    wait_for_subscribers(broker, 'status', 1)
+
+    BusPublisher(broker.path, 'status').publish(b'ok')
+    BusPublisher(broker.path, 'targets').publish(b'target')
+
+    assert receive(status, 1) == [b'ok']
+    assert receive(targets, 1) == [b'target']
+
+
+def test_late_subscribers_get_the_retained_message_first(broker):
+    publisher = BusPublisher(broker.path, 'targets')
+    hello = json.dumps({'hello': {'version': 1}}).encode()
+    publisher.publish(hello, retain=True)
+    publisher.publish(b'before')
+
+    deadline = time.time() + 2
+    subscriber = BusSubscriber(broker.path, 'targets')
+    while subscriber.retained is None and time.time() < deadline:
+        subscriber.close()
+        subscriber = BusSubscriber(broker.path, 'targets')
+
+    assert subscriber.retained == hello
+    publisher.publish(b'after')
+    assert receive(subscriber, 1) == [b'after']
+
+
+def test_stalled_subscriber_of_a_large_retained_message_blocks_no_other_topic(broker):
+    BusPublisher(broker.path, 'frames').publish(b'x' * 4 * 1024 * 1024, retain=True)
+    time.sleep(0.1)
+    stalled = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stalled.connect(broker.path)
+    stalled.sendall(encode_handshake('subscribe', 'frames')) # Never reads the retained message
+    wait_for_subscribers(broker, 'frames', 1)
+
+    targets = BusSubscriber(broker.path, 'targets')
+    wait_for_subscribers(broker, 'targets', 1)
+    BusPublisher(broker.path, 'targets').publish(b'target')
+    assert receive(targets, 1) == [b'target']
+    stalled.close()
+
+
+def test_slow_subscriber_drops_the_oldest_messages_without_blocking(broker):
+    slow = BusSubscriber(broker.path, 'targets')
+    fast = BusSubscriber(broker.path, 'targets')
+    wait_for_subscribers(broker, 'targets', 2)
+    publisher = BusPublisher(broker.path, 'targets')
+
+    payload = b'x' * 64 * 1024
+    fast_messages: list = []
+
+    def read_until_last():
+        decoder = MessageDecoder()
+        fast.connection.settimeout(5)
+        while b'last' not in fast_messages:
+            fast_messages.extend(decoder.feed(fast.connection.recv(65536)))
+
+    reader = threading.Thread(target=read_until_last)
+    reader.start()
+
+    # The slow subscriber never reads, so its socket buffer fills up and its queue overflows
+    start = time.time()
+    for _ in range(200):
+        publisher.publish(payload)
+    publisher.publish(b'last')
+    reader.join()
+
+    assert time.time() - start < 5
+    assert fast_messages[-1] == b'last'
+    slow_subscription, _ = broker.get_subscriptions('targets')
+    assert slow_subscription.dropped_count > 0
@@ -0,0 +1,76 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+import socket
+from typing import Optional
+from nerf_turret_utils.message_framing import encode_message
+from message_bus.broker import NO_RETAINED_MESSAGE, RETAIN_FLAG, encode_handshake, recv_message
+
+
+DEFAULT_BUS_PATH = '/tmp/nerf_turret_bus.sock'
+
+
+class BusPublisher:
+    """Publishes messages to a topic of the message bus"""
+
+    def __init__(self, path: str = DEFAULT_BUS_PATH, topic: str = 'targets') -> None:
+        """
+        Args:
+            path: The file path of the message bus socket.
+            topic: The topic to publish to.
+        """
+        self.topic = topic
+        self.connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.connection.connect(path)
+        self.connection.sendall(encode_handshake('publish', topic))
+
+
+    def publish(self, payload: bytes, retain: bool = False) -> None:
+        """
+        Publishes a message to every subscriber of the topic.
+
+        Args:
+            payload: The message.
+            retain: Whether the broker should also send the message to subscribers that join later, e.g. for an encoding hello.
+        """
+        self.connection.sendall(encode_message(bytes([RETAIN_FLAG if retain else 0]) + payload))
+
+
+    def close(self) -> None:
+        """Disconnects from the message bus"""
+        self.connection.close()
+
+
+class BusSubscriber:
+    """Subscribes to a topic of the message bus.
+
+    Once connected, `connection` receives the messages of the topic as length prefixed messages,
+    e.g. with a `MessageDecoder`.
+    """
+
+    def __init__(self, path: str = DEFAULT_BUS_PATH, topic: str = 'targets') -> None:
+        """
+        Args:
+            path: The file path of the message bus socket.
+            topic: The topic to subscribe to.
+
+        Raises:
+            ConnectionError: If the broker closed the connection during the subscription.
+        """
+        self.topic = topic
+        self.connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.connection.connect(path)
+        self.connection.sendall(encode_handshake('subscribe', topic))
+
+        # The broker always answers with the retained message first, only that message is read here
+        retained = recv_message(self.connection)
+        if retained is None:
+            raise ConnectionError(f"The message bus closed the subscription to '{topic}'")
+        self.retained: Optional[bytes] = None if retained == NO_RETAINED_MESSAGE else retained
+
+
+    def close(self) -> None:
+        """Disconnects from the message bus"""
+        self.connection.close()
@@ -0,0 +1,32 @@
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+from nerf_turret_utils.args_utils import map_log_level
+from message_bus.broker import MessageBroker
+from message_bus.bus_client import DEFAULT_BUS_PATH
+
+
+parser = argparse.ArgumentParser("Local publish/subscribe message bus for the Nerf Turret")
+parser.add_argument("--path", "-p", help="The file path of the Unix domain socket to listen on.", default=DEFAULT_BUS_PATH)
+parser.add_argument("--max-queue-size", "-mqs", help="The maximum amount of messages waiting for a subscriber before the oldest are dropped.", default=8, type=int)
+parser.add_argument("--log-level", "-ll" , help="Set the logging level by integer value or string representation.", default=logging.INFO, type=map_log_level)
+args = parser.parse_args()
+
+logging.basicConfig(level=args.log_level)
+
+logging.debug(f"\nArgs: {args}\n")
+
+broker = MessageBroker(args.path, max_queue_size=args.max_queue_size).start()
+
+try:
+    while True:
+        time.sleep(1)
+except KeyboardInterrupt:
+    logging.info("Stopping the message bus")
+finally:
+    broker.stop()
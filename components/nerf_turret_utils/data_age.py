@@ -0,0 +1,76 @@
+import time
+from collections import deque
+from typing import Deque, Optional
+
+
+def get_age_ms(timestamp: Optional[float], now: Optional[float] = None) -> Optional[float]:
+    """
+    Gets how old data is from the unix time it was captured at.
+
+    Args:
+        timestamp: The unix time in seconds the data was captured at, or None if unknown.
+        now: The current unix time in seconds, `time.time()` if not given.
+
+    Returns:
+        The age in milliseconds, or None if the timestamp is unknown.
+
+    Example:
+        >>> get_age_ms(100.0, now=100.25)
+        250.0
+    """
+    if timestamp is None:
+        return None
+    return ((time.time() if now is None else now) - timestamp) * 1000
+
+
+class AgeTracker:
+    """Keeps track of the age of the camera frames at one stage of the pipeline.
+
+    Every service keeps one to report how old the frame its latest output is based on was, e.g. to
+    tell whether a shot was decided on a 30ms or a 400ms old frame. Timestamps are unix times, which
+    are comparable between the services as they run on the same machine.
+    """
+
+    def __init__(self, window: int = 100) -> None:
+        """
+        Args:
+            window: The amount of latest ages the mean and maximum are taken over.
+        """
+        self.frame_id: Optional[int] = None
+        self.age_ms: Optional[float] = None
+        self.count = 0
+        self._ages: Deque[float] = deque(maxlen=window)
+
+
+    def update(self, frame_id: Optional[int], capture_time: Optional[float], now: Optional[float] = None) -> Optional[float]:
+        """
+        Records the frame the stage just processed.
+
+        Args:
+            frame_id: The id of the frame.
+            capture_time: The unix time in seconds the frame was captured at, or None if unknown.
+            now: The current unix time in seconds, `time.time()` if not given.
+
+        Returns:
+            The age of the frame in milliseconds, or None if the capture time is unknown.
+        """
+        self.frame_id = frame_id
+        self.age_ms = get_age_ms(capture_time, now)
+        if self.age_ms is not None:
+            self._ages.append(self.age_ms)
+            self.count += 1
+        return self.age_ms
+
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            A dictionary with the latest 'frame_id' and 'age_ms', and the 'mean_age_ms' and 'max_age_ms' of the window.
+        """
+        return {
+            'frame_id': self.frame_id,
+            'age_ms': self.age_ms,
+            'mean_age_ms': sum(self._ages) / len(self._ages) if self._ages else None,
+            'max_age_ms': max(self._ages) if self._ages else None,
+            'count': self.count,
+        }
@@ -0,0 +1,25 @@
+from .data_age import AgeTracker, get_age_ms
+import pytest
+
+
+def test_get_age_ms():
+    assert get_age_ms(100.0, now=100.25) == pytest.approx(250)
+    assert get_age_ms(None, now=100) is None
+
+def test_tracker_summary():
+    tracker = AgeTracker(window=2)
+    assert tracker.update(1, 10.0, now=10.1) == pytest.approx(100)
+    tracker.update(2, 10.0, now=10.3)
+    tracker.update(3, 10.0, now=10.2)
+
+    summary = tracker.summary()
+    assert summary['frame_id'] == 3
+    assert summary['age_ms'] == pytest.approx(200)
+    assert summary['mean_age_ms'] == pytest.approx(250)
+    assert summary['max_age_ms'] == pytest.approx(300)
+    assert summary['count'] == 3
+
+def test_tracker_without_capture_time():
+    tracker = AgeTracker()
+    assert tracker.update(1, None) is None
+    assert tracker.summary() == {'frame_id': 1, 'age_ms': None, 'mean_age_ms': None, 'max_age_ms': None, 'count': 0}
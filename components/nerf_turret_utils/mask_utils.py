@@ -0,0 +1,102 @@
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Sequence, Union
+import numpy as np
+
+
+def encode_mask(mask: np.ndarray, box: Sequence[Union[int, float]]) -> dict:
+    """
+    Encodes a binary segmentation mask as a run length encoding that covers a bounding box.
+
+    The runs go row by row over the mask and alternate between outside and inside the mask,
+    starting with outside. The mask grid is stretched over the box, so the mask does not need
+    to be the same size as the box in pixels.
+
+    Args:
+        mask: A 2D NumPy array where values above 0 are inside the mask.
+        box: The [left, top, right, bottom] coordinates the mask covers.
+
+    Returns:
+        A dictionary with the keys:
+            - 'box': The [left, top, right, bottom] coordinates the mask covers.
+            - 'size': The [height, width] of the mask grid.
+            - 'counts': The alternating run lengths as a list of integers.
+
+    Example:
+        >>> encode_mask(np.array([[0, 1], [1, 1]]), [10, 10, 12, 12])
+        {'box': [10, 10, 12, 12], 'size': [2, 2], 'counts': [1, 3]}
+    """
+    assert len(mask.shape) == 2, 'mask must be a 2D array'
+    height, width = mask.shape
+    flat = (mask.ravel() > 0).astype(np.int8)
+
+    if flat.size == 0:
+        return {'box': list(box), 'size': [height, width], 'counts': []}
+
+    changes = np.flatnonzero(np.diff(flat)) + 1
+    counts = np.diff(np.concatenate(([0], changes, [flat.size])))
+    if flat[0] == 1:
+        counts = np.concatenate(([0], counts))
+
+    return {'box': list(box), 'size': [height, width], 'counts': counts.tolist()}
+
+
+def decode_mask(encoded_mask: dict) -> np.ndarray:
+    """
+    Decodes a run length encoded mask back to a dense binary mask.
+
+    Args:
+        encoded_mask: A mask as returned by `encode_mask`.
+
+    Returns:
+        A 2D uint8 NumPy array of the mask grid size with 1 inside the mask and 0 outside.
+    """
+    height, width = encoded_mask['size']
+    counts = encoded_mask['counts']
+    values = np.arange(len(counts), dtype=np.uint8) % 2
+    flat = np.repeat(values, counts)
+    return flat.reshape((height, width))
+
+
+def is_point_in_mask(encoded_mask: dict, x: Union[int, float], y: Union[int, float]) -> bool:
+    """
+    Checks whether a point lies inside a run length encoded mask without decoding it.
+
+    Args:
+        encoded_mask: A mask as returned by `encode_mask`.
+        x: The horizontal coordinate of the point in the same coordinates as the mask box.
+        y: The vertical coordinate of the point in the same coordinates as the mask box.
+
+    Returns:
+        True if the point is inside the mask, False otherwise.
+    """
+    left, top, right, bottom = encoded_mask['box']
+    height, width = encoded_mask['size']
+    if not (left <= x < right and top <= y < bottom) or height == 0 or width == 0:
+        return False
+
+    column = min(int((x - left) * width / (right - left)), width - 1)
+    row = min(int((y - top) * height / (bottom - top)), height - 1)
+    run_ends = list(accumulate(encoded_mask['counts']))
+    # Runs alternate between outside and inside so odd runs are inside the mask
+    return bisect_right(run_ends, row * width + column) % 2 == 1
+
+
+def transform_encoded_mask(encoded_mask: dict, scale: Union[int, float] = 1, offset_x: Union[int, float] = 0, offset_y: Union[int, float] = 0) -> dict:
+    """
+    Moves an encoded mask to other image coordinates, e.g. from a compressed image or a tile to the full frame.
+
+    Args:
+        encoded_mask: A mask as returned by `encode_mask`.
+        scale: The factor to multiply the mask box coordinates by.
+        offset_x: The amount to add to the horizontal box coordinates after scaling.
+        offset_y: The amount to add to the vertical box coordinates after scaling.
+
+    Returns:
+        A new encoded mask with the transformed box. The runs are shared with the original mask.
+    """
+    left, top, right, bottom = encoded_mask['box']
+    return {
+        **encoded_mask,
+        'box': [left * scale + offset_x, top * scale + offset_y, right * scale + offset_x, bottom * scale + offset_y],
+    }
@@ -0,0 +1,53 @@
+from .mask_utils import encode_mask, decode_mask, is_point_in_mask, transform_encoded_mask
+import numpy as np
+import json
+
+
+def test_encode_mask_starts_outside():
+    encoded = encode_mask(np.array([[0, 1], [1, 1]]), [10, 10, 12, 12])
+    assert encoded == {'box': [10, 10, 12, 12], 'size': [2, 2], 'counts': [1, 3]}
+
+def test_encode_mask_starts_inside():
+    encoded = encode_mask(np.array([[1, 1], [0, 1]]), [0, 0, 2, 2])
+    assert encoded['counts'] == [0, 2, 1, 1]
+
+def test_encode_decode_round_trip():
+    rng = np.random.default_rng(0)
+    mask = (rng.random((37, 23)) > 0.5).astype(np.uint8)
+    assert np.array_equal(decode_mask(encode_mask(mask, [0, 0, 23, 37])), mask)
+
+def test_encode_empty_mask():
+    encoded = encode_mask(np.zeros((4, 3)), [0, 0, 3, 4])
+    assert encoded['counts'] == [12]
+    assert decode_mask(encoded).sum() == 0
+
+def test_encoded_mask_is_json_serializable():
+    encoded = encode_mask(np.ones((3, 3), dtype=np.uint8), [0, 0, 3, 3])
+    assert json.loads(json.dumps(encoded)) == encoded
+
+def test_is_point_in_mask_matches_dense_mask():
+    rng = np.random.default_rng(1)
+    mask = (rng.random((20, 30)) > 0.5).astype(np.uint8)
+    encoded = encode_mask(mask, [100, 50, 130, 70])
+    for y in range(20):
+        for x in range(30):
+            assert is_point_in_mask(encoded, 100 + x, 50 + y) == bool(mask[y, x])
+
+def test_is_point_in_mask_outside_box():
+    encoded = encode_mask(np.ones((2, 2)), [10, 10, 12, 12])
+    assert not is_point_in_mask(encoded, 9, 10)
+    assert not is_point_in_mask(encoded, 12, 11)
+
+def test_is_point_in_mask_stretched_grid():
+    mask = np.array([[0, 1], [0, 0]])
+    encoded = encode_mask(mask, [0, 0, 200, 200])
+    assert is_point_in_mask(encoded, 150, 50)
+    assert not is_point_in_mask(encoded, 50, 50)
+    assert not is_point_in_mask(encoded, 150, 150)
+
+def test_transform_encoded_mask():
+    encoded = encode_mask(np.ones((2, 2)), [10, 10, 20, 30])
+    transformed = transform_encoded_mask(encoded, scale=2, offset_x=5, offset_y=1)
+    assert transformed['box'] == [25, 21, 45, 61]
+    assert transformed['counts'] == encoded['counts']
+    assert encoded['box'] == [10, 10, 20, 30]
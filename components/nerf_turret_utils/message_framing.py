@@ -0,0 +1,96 @@
+import json
+import struct
+from typing import Any, List
+
+
+HEADER = struct.Struct('>I') # The payload length as a 4 byte big endian unsigned integer
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+
+def encode_message(payload: bytes) -> bytes:
+    """
+    Frames a payload with a length prefix so it can be sent over a stream socket.
+
+    Args:
+        payload: The bytes of the message.
+
+    Returns:
+        The 4 byte big endian payload length followed by the payload.
+
+    Example:
+        >>> encode_message(b'hi')
+        b'\\x00\\x00\\x00\\x02hi'
+    """
+    assert len(payload) <= MAX_MESSAGE_SIZE, f'messages can be at most {MAX_MESSAGE_SIZE} bytes'
+    return HEADER.pack(len(payload)) + payload
+
+
+def encode_json_message(data: Any) -> bytes:
+    """
+    Serializes data as UTF-8 JSON and frames it with a length prefix.
+
+    Args:
+        data: The JSON serializable data.
+
+    Returns:
+        The framed message.
+    """
+    return encode_message(json.dumps(data).encode('utf-8'))
+
+
+class MessageDecoder:
+    """Splits a byte stream of length prefixed messages back into messages.
+
+    Stream sockets do not keep message boundaries, so one `recv` can return part of a message or
+    several messages at once. The decoder buffers the bytes it is fed and returns every message
+    that is complete so far.
+    """
+
+    def __init__(self, max_message_size: int = MAX_MESSAGE_SIZE) -> None:
+        """
+        Args:
+            max_message_size: The largest payload accepted, to fail fast on a corrupt stream instead of buffering forever.
+        """
+        self.max_message_size = max_message_size
+        self._buffer = bytearray()
+
+
+    @property
+    def buffered_bytes(self) -> int:
+        """The amount of bytes of incomplete messages waiting for the rest of their data"""
+        return len(self._buffer)
+
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """
+        Adds received bytes and takes out the messages they complete.
+
+        Args:
+            data: The bytes received from the stream.
+
+        Returns:
+            The payloads of the completed messages in the order they were sent.
+
+        Raises:
+            ValueError: If a message is larger than the maximum message size.
+        """
+        self._buffer += data
+        messages = []
+        offset = 0
+        while len(self._buffer) - offset >= HEADER.size:
+            (size,) = HEADER.unpack_from(self._buffer, offset)
+            if size > self.max_message_size:
+                raise ValueError(f'Message of {size} bytes is larger than the maximum of {self.max_message_size} bytes')
+            end = offset + HEADER.size + size
+            if end > len(self._buffer):
+                break
+            messages.append(bytes(self._buffer[offset + HEADER.size:end]))
+            offset = end
+
+        del self._buffer[:offset]
+        return messages
+
+
+    def reset(self) -> None:
+        """Drops any partially received message, e.g. after reconnecting"""
+        self._buffer.clear()
@@ -0,0 +1,81 @@
+from .message_framing import HEADER, MessageDecoder, encode_json_message, encode_message
+import json
+import random
+import socket
+import threading
+import pytest
+
+
+def test_encode_message():
+    assert encode_message(b'hi') == b'\x00\x00\x00\x02hi'
+    assert encode_message(b'') == b'\x00\x00\x00\x00'
+
+def test_decode_multiple_messages_in_one_read():
+    decoder = MessageDecoder()
+    assert decoder.feed(encode_message(b'one') + encode_message(b'') + encode_message(b'three')) == [b'one', b'', b'three']
+    assert decoder.buffered_bytes == 0
+
+def test_decode_partial_reads():
+    decoder = MessageDecoder()
+    data = encode_message(b'hello') + encode_message(b'world')
+    messages = []
+    for byte in data:
+        messages += decoder.feed(bytes([byte]))
+    assert messages == [b'hello', b'world']
+
+def test_decode_keeps_incomplete_message():
+    decoder = MessageDecoder()
+    data = encode_message(b'hello')
+    assert decoder.feed(data[:HEADER.size + 2]) == []
+    assert decoder.buffered_bytes == HEADER.size + 2
+    assert decoder.feed(data[HEADER.size + 2:]) == [b'hello']
+
+def test_decode_rejects_oversized_message():
+    decoder = MessageDecoder(max_message_size=4)
+    with pytest.raises(ValueError):
+        decoder.feed(encode_message(b'too long'))
+
+def test_reset_drops_partial_message():
+    decoder = MessageDecoder()
+    decoder.feed(encode_message(b'hello')[:3])
+    decoder.reset()
+    assert decoder.feed(encode_message(b'next')) == [b'next']
+
+
+def test_stress_large_target_lists_at_high_rate():
+    message_count = 300
+    rng = random.Random(0)
+    sent = [
+        {
+            'targets': [{'type': 'person', 'box': [rng.random() * 640 for _ in range(4)]} for _ in range(rng.randint(0, 400))],
+            'heading_vect': [320, 240],
+            'view_dimensions': [640, 480],
+            'index': index,
+        }
+        for index in range(message_count)
+    ]
+    sender, receiver = socket.socketpair()
+
+    def send_all():
+        # Send back to back without waiting so several messages share a read
+        for data in sent:
+            sender.sendall(encode_json_message(data))
+        sender.close()
+
+    thread = threading.Thread(target=send_all)
+    thread.start()
+
+    decoder = MessageDecoder()
+    received = []
+    receiver.settimeout(10)
+    while True:
+        data = receiver.recv(rng.choice([1, 7, 1024, 65536]))
+        if not data:
+            break
+        received += [json.loads(message) for message in decoder.feed(data)]
+    thread.join()
+    receiver.close()
+
+    assert len(received) == message_count
+    assert received == sent
+    assert decoder.buffered_bytes == 0
@@ -0,0 +1,165 @@
+from typing import Union
+
+
+# def limit_value(value: Union[int,float], minimum=-90, maximum=90):
+def limit_value(value: Union[int,float], minimum:Union[int,float], maximum: Union[int,float]) -> Union[int,float]:
+    """Limits the value to the min and max values"""
+    if value < minimum:
+        return minimum
+    elif value > maximum:
+        return maximum
+    else:
+        return value
+
+
+def encode(azimuth: int, is_clockwise: bool, speed: int, is_firing: bool) -> bytes:
+    """
+    Encodes a motor command as two bytes.
+
+    Parameters:
+        azimuth (int): The azimuth of the motor, from 0 to 180.
+        is_clockwise (bool): Whether the motor should turn clockwise (True) or counterclockwise (False).
+            Default is True.
+        speed (int): The speed of the motor, from 0 (off) to 10 (maximum speed).
+            Default is 0.
+        is_firing (bool): Whether the motor should be fired (True) or not (False).
+            Default is False.
+
+    Returns:
+        bytes: Two bytes representing the encoded motor command.
+
+    Example:
+        >>> encode(90, True, 5)
+        b'\x5f\x08'
+    """
+    assert type(speed) == int, "Speed must be an integer"
+    assert type(azimuth) == int, "azimuth must be an integer"
+    assert type(is_clockwise) == bool, "is_clockwise must be an bool"
+    assert type(is_firing) == bool, "is_firing must be an is_firing"
+    
+    azimuth_byte = encode_azimuth_val_to_byte(azimuth)  # Scale the azimuth value to fit in a byte (0-255)
+    encoded_value = encode_vals_to_byte(is_clockwise, speed, is_firing)  # Encode the other values into a single byte
+    return bytes([azimuth_byte, encoded_value ])
+
+
+def encode_vals_to_byte(is_clockwise: bool, speed: int, is_firing: bool):
+    """
+    Encodes motor command values as a single byte.
+
+    This function takes in three values that define a motor command: a boolean value
+    indicating whether the motor should turn clockwise (`is_clockwise`), an integer
+    value representing the speed of the motor (`speed`), and a boolean value indicating
+    whether the motor should be fired (`is_firing`). These values are encoded into a
+    single byte using bitwise operations, and the resulting byte is returned.
+
+    Parameters:
+        is_clockwise (bool): Whether the motor should turn clockwise (True) or counterclockwise (False).
+        speed (int): The speed of the motor, from 0 (off) to 10 (maximum speed).
+        is_firing (bool): Whether the motor should be fired (True) or not (False).
+
+    Returns:
+        int: A single byte representing the encoded motor command.
+
+    Example:
+        >>> encode_vals_to_byte(True, 5, False)
+        160
+    """
+    encoded_value = 0b00000000
+    if is_clockwise:
+        encoded_value |= (1 << 7)  # Set the 8th bit to 1 for clockwise
+        
+    if is_firing:
+        encoded_value |= (1 << 6)  # Set the 7th bit to 1 for is_firing
+        
+    encoded_value |= (speed & 0b00001111)  # Mask the lower 1-4(4) bits for speed (0-10)
+   
+    return encoded_value
+
+
+def decode_byte_to_motor_vals(encoded_value: int):
+    """
+    Decodes a byte value to motor values in Python.
+
+    Args:
+        encoded_value (int): An integer representing the byte value to decode.
+
+    Returns:
+        dict: A dictionary with the decoded motor values, including keys for 'is_clockwise', 'speed', and 'is_firing'.
+
+    Example:
+        >>> decode_byte_to_motor_vals(0b10101000)
+        {'is_clockwise': True, 'speed': 8, 'is_firing': False}
+    """
+    is_clockwise = bool((encoded_value & 0b10000000) >> 7)  # Check the 8th bit for clockwise
+    is_firing = bool((encoded_value & 0b01000000) >> 6)  # Check the 7th bit for is_firing
+    speed = (encoded_value & 0b00001111) # Mask the lower 4 bits for speed (0-10)
+    
+    return { 'is_clockwise': is_clockwise, 'speed': speed, 'is_firing': is_firing }
+
+
+def encode_azimuth_val_to_byte(azimuth: int) -> int:
+    """
+    Encodes an azimuth value as a single byte.
+
+    The input azimuth value is first converted to a range of 0-180 degrees using the
+    `limit_value()` function. The resulting angle is then scaled to fit in a single
+    byte (0-255) and rounded to the nearest integer.
+
+    Parameters:
+        azimuth (int): The azimuth value to encode, in degrees.
+
+    Returns:
+        int: A single byte representing the encoded azimuth value.
+
+    Example:
+        >>> encode_azimuth_val_to_byte(90)
+        143
+    """
+    # Convert the input angle to a range of 0-180 degrees so it can fit in a byte rather than a signed value
+    azimuth_degrees = round(limit_value(azimuth, -90, 90) + 90) 
+    return azimuth_degrees
+
+
+def decode_byte_to_azimuth(byte: int) -> int: 
+    """
+    Decodes a byte value to an azimuth in Python.
+
+    Args:
+        byte (int): An integer representing the byte value to decode.
+
+    Returns:
+        int: The azimuth value encoded in the lower 4 bits of the byte.
+
+    Example:
+        >>> decode_byte_to_azimuth(0b01010100)
+        4
+    """
+    return (byte & 0b11111111) - 90  # Mask the lower 4 bits for azimuth (0-180)
+
+def decode(encoded_motor_command: bytes) -> dict:
+    """
+    Decodes a two-byte motor command and returns its values as a dictionary.
+
+    Parameters:
+        encoded_motor_command (bytes): Two bytes representing the encoded motor command.
+
+    Returns:
+        dict: A dictionary containing the decoded values of the motor command.
+
+    Example:
+        >>> decode(b'\x5f\x08')
+        {'azimuth': 90, 'is_clockwise': True, 'speed': 5, 'is_firing': False}
+    """
+    assert len(encoded_motor_command) == 2, "Encoded motor command must be two bytes long"
+    
+    azimuth_byte, encoded_value = encoded_motor_command
+    
+    decoded_motor_vals = decode_byte_to_motor_vals(encoded_value)
+    
+    
+    return { 
+        'azimuth': decode_byte_to_azimuth(azimuth_byte), 
+        'is_clockwise': decoded_motor_vals['is_clockwise'], 
+        'speed': decoded_motor_vals['speed'], 
+        'is_firing': decoded_motor_vals['is_firing'] 
+    }
@@ -0,0 +1,109 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+import tempfile
+import threading
+import time
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler
+from typing import List
+import numpy as np
+from nerf_turret_utils.message_framing import MessageDecoder, encode_message
+from nerf_turret_utils.socket_utils import create_connection, create_http_connection, create_http_server, create_server_socket
+
+
+class EmptyHandler(BaseHTTPRequestHandler):
+    """Answers every POST like the serial driver, without a serial port"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('content-length', 0)))
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def echo(host: str, port: int, ready: threading.Event) -> None:
+    """Echoes the framed messages of one client back to it"""
+    server = create_server_socket(host, port)
+    ready.set()
+    connection, _ = server.accept()
+    decoder = MessageDecoder()
+    while True:
+        data = connection.recv(65536)
+        if not data:
+            break
+        for message in decoder.feed(data):
+            connection.sendall(encode_message(message))
+    connection.close()
+    server.close()
+
+
+def ping_pong(host: str, port: int, payload: bytes, rounds: int) -> List[float]:
+    """Measures the round trip times in seconds of framed messages through an echo server"""
+    ready = threading.Event()
+    thread = threading.Thread(target=echo, args=(host, port, ready), daemon=True)
+    thread.start()
+    ready.wait()
+
+    connection = create_connection(host, port)
+    decoder = MessageDecoder()
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        connection.sendall(encode_message(payload))
+        messages: list = []
+        while not messages:
+            messages = decoder.feed(connection.recv(65536))
+        times.append(time.perf_counter() - start)
+    connection.close()
+    thread.join()
+    return times
+
+
+def http_posts(host: str, port: int, payload: bytes, rounds: int) -> List[float]:
+    """Measures the times in seconds of HTTP posts like the AI controller sends to the serial driver"""
+    server = create_http_server(host, port, EmptyHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server_port = 0 if host.startswith('unix://') else server.server_address[1]
+
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        connection = create_http_connection(host, server_port)
+        connection.request('POST', '/', body=payload, headers={'Content-Type': 'application/json'})
+        connection.getresponse().read()
+        connection.close()
+        times.append(time.perf_counter() - start)
+    server.shutdown()
+    server.server_close()
+    return times
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser(description="Compares the round trip latency of TCP on localhost and Unix domain sockets")
+    parser.add_argument("--rounds", "-r", help="The amount of round trips per measurement", type=int, default=2000)
+    parser.add_argument("--payload-sizes", "-ps", help="The message sizes in bytes to send", nargs='+', type=int, default=[64, 1024, 16384])
+    parser.add_argument("--port", "-p", help="The TCP port to use on localhost", type=int, default=17565)
+    args = parser.parse_args()
+
+    socket_dir = tempfile.mkdtemp()
+    transports = [('TCP', 'localhost', args.port), ('Unix', f'unix://{socket_dir}/benchmark.sock', 0)]
+
+    print("| Link | Payload | Transport | p50 | p99 |")
+    print("|---|---|---|---|---|")
+    for payload_size in args.payload_sizes:
+        payload = b'x' * payload_size
+        for name, host, port in transports:
+            times = np.array(ping_pong(host, port, payload, args.rounds)) * 1e6
+            print(f"| ping-pong | {payload_size}B | {name} | {np.percentile(times, 50):.1f}µs | {np.percentile(times, 99):.1f}µs |")
+
+    payload = b'{"azimuth_angle": 1.5, "is_clockwise": false, "speed": 3, "is_firing": false}'
+    for name, host, port in transports:
+        times = np.array(http_posts(host, port, payload, args.rounds // 4)) * 1e6
+        print(f"| HTTP post | {len(payload)}B | {name} | {np.percentile(times, 50):.1f}µs | {np.percentile(times, 99):.1f}µs |")
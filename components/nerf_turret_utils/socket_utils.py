@@ -0,0 +1,169 @@
+import http.client
+import os
+import socket
+from http.server import HTTPServer, ThreadingHTTPServer
+from socketserver import ThreadingMixIn
+from typing import Callable, Optional, Tuple
+
+
+UNIX_PREFIX = 'unix://'
+
+
+def get_unix_path(host: str) -> Optional[str]:
+    """
+    Gets the socket file path of a `unix://` host.
+
+    Args:
+        host: A hostname like 'localhost' or a Unix domain socket address like 'unix:///tmp/turret.sock'.
+
+    Returns:
+        The socket file path, or None if the host is not a Unix domain socket address.
+
+    Example:
+        >>> get_unix_path('unix:///tmp/turret.sock')
+        '/tmp/turret.sock'
+    """
+    return host[len(UNIX_PREFIX):] if host.startswith(UNIX_PREFIX) else None
+
+
+def format_address(host: str, port: int) -> str:
+    """Formats a host and port for the logs, the port is left out for Unix domain sockets"""
+    return host if get_unix_path(host) else f'{host}:{port}'
+
+
+def create_connection(host: str, port: int) -> socket.socket:
+    """
+    Connects a stream socket over TCP, or over a Unix domain socket for a `unix://` host.
+
+    Args:
+        host: The hostname or `unix://` socket path to connect to.
+        port: The TCP port, ignored for Unix domain sockets.
+
+    Returns:
+        The connected socket.
+    """
+    path = get_unix_path(host)
+    if path is None:
+        return socket.create_connection((host, port))
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(path)
+    except OSError:
+        connection.close()
+        raise
+    return connection
+
+
+def create_server_socket(host: str, port: int) -> socket.socket:
+    """
+    Creates a listening stream socket over TCP, or over a Unix domain socket for a `unix://` host.
+
+    Args:
+        host: The hostname or `unix://` socket path to listen on.
+        port: The TCP port, ignored for Unix domain sockets.
+
+    Returns:
+        The listening socket.
+    """
+    path = get_unix_path(host)
+    if path is None:
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1) # Rebind right after the last process stopped
+        server.bind((host, port))
+    else:
+        remove_stale_socket(path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+    server.listen()
+    return server
+
+
+def remove_stale_socket(path: str) -> None:
+    """Removes a socket file left over from a process that did not shut down cleanly"""
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """An HTTP connection over a Unix domain socket"""
+
+    def __init__(self, path: str, timeout: Optional[float] = None) -> None:
+        """
+        Args:
+            path: The socket file path of the HTTP server.
+            timeout: The socket timeout in seconds.
+        """
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class UnixHTTPServer(ThreadingMixIn, HTTPServer):
+    """An HTTP server on a Unix domain socket, handling every connection in its own thread"""
+
+    address_family = socket.AF_UNIX
+    daemon_threads = True
+
+
+    def server_bind(self) -> None:
+        remove_stale_socket(self.server_address) # type: ignore
+        self.socket.bind(self.server_address)
+        self.server_address = self.socket.getsockname()
+        self.server_name = 'localhost'
+        self.server_port = 0
+
+
+    def get_request(self) -> Tuple[socket.socket, Tuple[str, int]]:
+        # Unix domain clients have no address, but the request handlers log one
+        request, _ = self.socket.accept()
+        return request, ('unix', 0)
+
+
+    def server_close(self) -> None:
+        super().server_close()
+        remove_stale_socket(self.server_address) # type: ignore
+
+
+def create_http_connection(host: str, port: int, timeout: Optional[float] = None) -> http.client.HTTPConnection:
+    """
+    Creates an HTTP connection over TCP, or over a Unix domain socket for a `unix://` host.
+
+    Args:
+        host: The hostname or `unix://` socket path of the server.
+        port: The TCP port, ignored for Unix domain sockets.
+        timeout: The socket timeout in seconds.
+
+    Returns:
+        The connection, which connects on the first request.
+    """
+    path = get_unix_path(host)
+    if path is None:
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+    return UnixHTTPConnection(path, timeout=timeout)
+
+
+def create_http_server(host: str, port: int, handler: Callable) -> HTTPServer:
+    """
+    Creates an HTTP server over TCP, or over a Unix domain socket for a `unix://` host.
+
+    Every connection is handled in its own thread, so a client that keeps its connection alive
+    does not block the other clients.
+
+    Args:
+        host: The hostname or `unix://` socket path to listen on.
+        port: The TCP port, ignored for Unix domain sockets.
+        handler: The request handler class or factory.
+
+    Returns:
+        The bound server.
+    """
+    path = get_unix_path(host)
+    if path is None:
+        return ThreadingHTTPServer((host, int(port)), handler)
+    return UnixHTTPServer(path, handler) # type: ignore
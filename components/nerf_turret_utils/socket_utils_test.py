@@ -0,0 +1,69 @@
+from .socket_utils import create_connection, create_http_connection, create_http_server, create_server_socket, format_address, get_unix_path
+from http.server import BaseHTTPRequestHandler
+import os
+import threading
+import pytest
+
+
+class EchoHandler(BaseHTTPRequestHandler):
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('content-length', 0)))
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        self.log_date_time_string() # Make sure logging works without a client address
+        self.address_string()
+
+
+def test_get_unix_path():
+    assert get_unix_path('unix:///tmp/turret.sock') == '/tmp/turret.sock'
+    assert get_unix_path('localhost') is None
+
+def test_format_address():
+    assert format_address('localhost', 5565) == 'localhost:5565'
+    assert format_address('unix:///tmp/turret.sock', 5565) == 'unix:///tmp/turret.sock'
+
+
+@pytest.mark.parametrize('unix', [False, True])
+def test_stream_round_trip(tmp_path, unix):
+    host = f'unix://{tmp_path}/stream.sock' if unix else 'localhost'
+    server = create_server_socket(host, 0)
+    port = 0 if unix else server.getsockname()[1]
+
+    client = create_connection(host, port)
+    connection, _ = server.accept()
+    client.sendall(b'ping')
+    assert connection.recv(4) == b'ping'
+
+    for sock in (client, connection, server):
+        sock.close()
+
+def test_unix_server_replaces_stale_socket_file(tmp_path):
+    path = f'{tmp_path}/stale.sock'
+    open(path, 'w').close()
+    server = create_server_socket(f'unix://{path}', 0)
+    server.close()
+
+
+@pytest.mark.parametrize('unix', [False, True])
+def test_http_round_trip(tmp_path, unix):
+    host = f'unix://{tmp_path}/http.sock' if unix else 'localhost'
+    server = create_http_server(host, 0, EchoHandler)
+    port = 0 if unix else server.server_address[1]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    connection = create_http_connection(host, port, timeout=2)
+    for body in (b'{"speed": 1}', b'{"speed": 2}'):
+        connection.request('POST', '/', body=body)
+        response = connection.getresponse()
+        assert response.status == 200
+        assert response.read() == body
+    connection.close()
+
+    server.shutdown()
+    server.server_close()
+    assert not unix or not os.path.exists(f'{tmp_path}/http.sock')
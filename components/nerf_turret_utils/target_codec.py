@@ -0,0 +1,194 @@
+import json
+import struct
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+
+
+VERSION = 2
+ENCODINGS = ['json', 'binary']
+HEADER = struct.Struct('>BIddHHHHH') # version, frame id, capture time, publish time, heading x, heading y, view width, view height, target count
+RECORD = np.dtype([('class_id', '>u2'), ('target_id', '>i2'), ('box', '>f4', (4,))]) # target_id is -1 without an id
+
+
+def is_json_payload(payload: bytes) -> bool:
+    """Whether a message payload is JSON rather than a binary targets message"""
+    return payload[:1] == b'{'
+
+
+class TargetCodec:
+    """Encodes the camera vision targets messages as fixed layout binary records.
+
+    A message is a header with the frame id, capture and publish times, heading vector and view
+    dimensions followed by one 20 byte record per target holding the class id, target id and box.
+    The class and target names are exchanged once when connecting (see `hello`), so the records only
+    hold indexes into those tables. The version byte
+    comes first and is never `{`, so binary and JSON messages can be told apart on the same stream.
+    Messages the records can not hold, e.g. with segmentation masks, are sent as JSON.
+    """
+
+    def __init__(self, class_names: Sequence[str], target_ids: Sequence[str] = ()) -> None:
+        """
+        Args:
+            class_names: The names of the target types that can be encoded.
+            target_ids: The ids of the known targets that can be encoded.
+        """
+        assert len(class_names) < 2 ** 16 and len(target_ids) < 2 ** 15, 'too many class names or target ids'
+        self.class_names = list(class_names)
+        self.target_ids = list(target_ids)
+        self._class_indexes = {name: index for index, name in enumerate(self.class_names)}
+        self._target_indexes = {target_id: index for index, target_id in enumerate(self.target_ids)}
+
+
+    def hello(self, encodings: Sequence[str] = ENCODINGS) -> dict:
+        """
+        Creates the message that offers the encodings and tables to the receiver when connecting.
+
+        Args:
+            encodings: The encodings the sender can use.
+
+        Returns:
+            The hello message to send as JSON.
+        """
+        return {'hello': {'version': VERSION, 'encodings': list(encodings), 'class_names': self.class_names, 'target_ids': self.target_ids}}
+
+
+    @classmethod
+    def from_hello(cls, hello: dict) -> 'TargetCodec':
+        """
+        Creates the codec of the sender from its hello message.
+
+        Args:
+            hello: The message created with `hello`.
+
+        Returns:
+            A codec with the class names and target ids of the sender.
+
+        Raises:
+            ValueError: If the sender uses an unknown version.
+        """
+        details = hello['hello']
+        if details.get('version') != VERSION:
+            raise ValueError(f"Unsupported target codec version {details.get('version')}")
+        return cls(details['class_names'], details.get('target_ids', []))
+
+
+    def can_encode(self, data: Dict[str, Any]) -> bool:
+        """Whether a targets message can be encoded as binary without losing anything"""
+        if 'heading_vect' not in data or 'view_dimensions' not in data:
+            return False
+        for target in data['targets']:
+            if set(target) - {'box', 'type', 'id'} or target['type'] not in self._class_indexes:
+                return False
+            if target.get('id') is not None and target['id'] not in self._target_indexes:
+                return False
+        return True
+
+
+    def encode(self, data: Dict[str, Any]) -> bytes:
+        """
+        Encodes a targets message as binary.
+
+        Args:
+            data: A message with the 'targets', 'heading_vect' and 'view_dimensions' that `can_encode` accepts.
+                The 'frame_id', 'capture_time' and 'publish_time' are encoded as 0 when missing.
+
+        Returns:
+            The binary payload.
+        """
+        targets = data['targets']
+        records = np.empty(len(targets), dtype=RECORD)
+        for index, target in enumerate(targets):
+            target_id = target.get('id')
+            records[index] = (
+                self._class_indexes[target['type']],
+                -1 if target_id is None else self._target_indexes[target_id],
+                target['box'],
+            )
+        heading_x, heading_y = data['heading_vect']
+        view_width, view_height = data['view_dimensions']
+        header = HEADER.pack(
+            VERSION,
+            data.get('frame_id', 0),
+            data.get('capture_time', 0),
+            data.get('publish_time', 0),
+            int(heading_x),
+            int(heading_y),
+            int(view_width),
+            int(view_height),
+            len(targets),
+        )
+        return header + records.tobytes()
+
+
+    def decode(self, payload: bytes) -> Dict[str, Any]:
+        """
+        Decodes a binary targets message.
+
+        Args:
+            payload: The binary payload created with `encode`.
+
+        Returns:
+            The message with the same 'frame_id', 'capture_time', 'publish_time', 'targets', 'heading_vect' and
+            'view_dimensions' as JSON would give.
+
+        Raises:
+            ValueError: If the payload has an unknown version or the wrong size.
+        """
+        version, frame_id, capture_time, publish_time, heading_x, heading_y, view_width, view_height, count = HEADER.unpack_from(payload)
+        if version != VERSION:
+            raise ValueError(f'Unsupported target codec version {version}')
+        if len(payload) != HEADER.size + count * RECORD.itemsize:
+            raise ValueError(f'Expected {count} targets but got {len(payload) - HEADER.size} bytes of records')
+
+        records = np.frombuffer(payload, dtype=RECORD, count=count, offset=HEADER.size)
+        targets: List[dict] = []
+        for class_id, target_id, box in zip(records['class_id'].tolist(), records['target_id'].tolist(), records['box'].tolist()):
+            target = {'box': box, 'type': self.class_names[class_id]}
+            if target_id >= 0:
+                target['id'] = self.target_ids[target_id]
+            targets.append(target)
+        return {
+            'frame_id': frame_id,
+            'capture_time': capture_time,
+            'publish_time': publish_time,
+            'targets': targets,
+            'heading_vect': [heading_x, heading_y],
+            'view_dimensions': [view_width, view_height],
+        }
+
+
+def encode_targets_message(data: Dict[str, Any], codec: Optional[TargetCodec] = None) -> bytes:
+    """
+    Encodes a targets message as binary when a codec is given and can hold it, and as JSON otherwise.
+
+    Args:
+        data: The targets message.
+        codec: The negotiated binary codec, or None to always use JSON.
+
+    Returns:
+        The message payload.
+    """
+    if codec and codec.can_encode(data):
+        return codec.encode(data)
+    return json.dumps(data).encode('utf-8')
+
+
+def decode_targets_message(payload: bytes, codec: Optional[TargetCodec] = None) -> Dict[str, Any]:
+    """
+    Decodes a JSON or binary message payload.
+
+    Args:
+        payload: The message payload.
+        codec: The codec created from the hello of the sender, needed for binary messages.
+
+    Returns:
+        The decoded message.
+
+    Raises:
+        ValueError: If the message is binary and there is no codec, or it can not be decoded.
+    """
+    if is_json_payload(payload):
+        return json.loads(payload.decode('utf-8'))
+    if codec is None:
+        raise ValueError('Received a binary message without a codec, the sender did not send a hello')
+    return codec.decode(payload)
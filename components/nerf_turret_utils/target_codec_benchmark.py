@@ -0,0 +1,63 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+import json
+import random
+import timeit
+from argparse import ArgumentParser
+from typing import Any, Callable, Dict
+from nerf_turret_utils.target_codec import TargetCodec
+
+
+CLASS_NAMES = ['face', 'person', 'car', 'dog', 'cat']
+
+
+def make_message(target_count: int, rng: random.Random) -> Dict[str, Any]:
+    """Creates a targets message like the camera vision sends at 640x480"""
+    targets = []
+    for _ in range(target_count):
+        left, top = rng.uniform(0, 600), rng.uniform(0, 440)
+        targets.append({'box': [left, top, left + rng.uniform(10, 200), top + rng.uniform(10, 300)], 'type': rng.choice(CLASS_NAMES)})
+    return {
+        'frame_id': 1234,
+        'capture_time': 1700000000.125,
+        'publish_time': 1700000000.15,
+        'targets': targets,
+        'heading_vect': [320, 240],
+        'view_dimensions': [640, 480],
+    }
+
+
+def time_per_call(function: Callable[[], Any], runs: int) -> float:
+    """The average time in microseconds of a call"""
+    return timeit.timeit(function, number=runs) / runs * 1e6
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser(description="Compares the size and encode/decode time of the JSON and binary targets messages")
+    parser.add_argument("--target-counts", "-tc", help="The amounts of targets per message to measure", nargs='+', type=int, default=[0, 1, 5, 20, 100])
+    parser.add_argument("--runs", "-r", help="The amount of times each message is encoded and decoded", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    codec = TargetCodec(CLASS_NAMES)
+
+    print("| Targets | JSON bytes | Binary bytes | JSON encode | Binary encode | JSON decode | Binary decode |")
+    print("|---|---|---|---|---|---|---|")
+    for target_count in args.target_counts:
+        message = make_message(target_count, rng)
+        json_payload = json.dumps(message).encode('utf-8')
+        binary_payload = codec.encode(message)
+
+        json_encode = time_per_call(lambda: json.dumps(message).encode('utf-8'), args.runs)
+        binary_encode = time_per_call(lambda: codec.encode(message), args.runs)
+        json_decode = time_per_call(lambda: json.loads(json_payload.decode('utf-8')), args.runs)
+        binary_decode = time_per_call(lambda: codec.decode(binary_payload), args.runs)
+
+        print(
+            f"| {target_count} | {len(json_payload)} | {len(binary_payload)} "
+            f"| {json_encode:.1f}µs | {binary_encode:.1f}µs | {json_decode:.1f}µs | {binary_decode:.1f}µs |"
+        )
@@ -0,0 +1,85 @@
+from .target_codec import HEADER, RECORD, TargetCodec, decode_targets_message, encode_targets_message, is_json_payload
+import json
+import pytest
+
+
+CLASS_NAMES = ['face', 'person', 'dog']
+
+def make_message(targets):
+    return {
+        'frame_id': 42,
+        'capture_time': 1700000000.125,
+        'publish_time': 1700000000.15,
+        'targets': targets,
+        'heading_vect': [320, 240],
+        'view_dimensions': [640, 480],
+    }
+
+
+def test_binary_round_trip():
+    codec = TargetCodec(CLASS_NAMES, ['elon_musk'])
+    message = make_message([
+        {'box': [10.0, 20.0, 110.5, 220.25], 'type': 'person'},
+        {'box': [1.0, 2.0, 3.0, 4.0], 'type': 'face', 'id': 'elon_musk'},
+        {'box': [5.0, 6.0, 7.0, 8.0], 'type': 'face', 'id': None},
+    ])
+    payload = codec.encode(message)
+    assert len(payload) == HEADER.size + 3 * RECORD.itemsize
+    assert not is_json_payload(payload)
+
+    decoded = codec.decode(payload)
+    message['targets'][2].pop('id')
+    assert decoded == message
+
+def test_missing_frame_details_are_encoded_as_zero():
+    codec = TargetCodec(CLASS_NAMES)
+    decoded = codec.decode(codec.encode({'targets': [], 'heading_vect': [320, 240], 'view_dimensions': [640, 480]}))
+    assert (decoded['frame_id'], decoded['capture_time'], decoded['publish_time']) == (0, 0, 0)
+
+def test_binary_is_smaller_than_json():
+    codec = TargetCodec(CLASS_NAMES)
+    message = make_message([{'box': [100.0, 200.0, 300.0, 400.0], 'type': 'person'}] * 20)
+    assert len(codec.encode(message)) < len(json.dumps(message)) / 2
+
+def test_cannot_encode_masks_unknown_types_or_missing_view():
+    codec = TargetCodec(CLASS_NAMES, ['elon_musk'])
+    assert codec.can_encode(make_message([]))
+    assert not codec.can_encode(make_message([{'box': [0, 0, 1, 1], 'type': 'person', 'mask': {}}]))
+    assert not codec.can_encode(make_message([{'box': [0, 0, 1, 1], 'type': 'cat'}]))
+    assert not codec.can_encode(make_message([{'box': [0, 0, 1, 1], 'type': 'face', 'id': 'someone'}]))
+    assert not codec.can_encode({'targets': []})
+
+def test_masks_fall_back_to_json():
+    codec = TargetCodec(CLASS_NAMES)
+    message = make_message([{'box': [0, 0, 2, 2], 'type': 'person', 'mask': {'box': [0, 0, 2, 2], 'size': [1, 1], 'counts': [0, 1]}}])
+    payload = encode_targets_message(message, codec)
+    assert is_json_payload(payload)
+    assert decode_targets_message(payload, codec) == message
+
+def test_decode_json_without_codec():
+    assert decode_targets_message(b'{"targets": []}') == {'targets': []}
+
+def test_decode_binary_without_codec_fails():
+    payload = TargetCodec(CLASS_NAMES).encode(make_message([]))
+    with pytest.raises(ValueError):
+        decode_targets_message(payload)
+
+def test_decode_rejects_truncated_payload():
+    codec = TargetCodec(CLASS_NAMES)
+    payload = codec.encode(make_message([{'box': [0, 0, 1, 1], 'type': 'dog'}]))
+    with pytest.raises(ValueError):
+        codec.decode(payload[:-1])
+
+def test_hello_round_trip():
+    codec = TargetCodec(CLASS_NAMES, ['elon_musk'])
+    hello = json.loads(json.dumps(codec.hello()))
+    assert hello['hello']['encodings'] == ['json', 'binary']
+    received = TargetCodec.from_hello(hello)
+    assert received.class_names == CLASS_NAMES
+    assert received.target_ids == ['elon_musk']
+
+def test_hello_with_unknown_version_fails():
+    hello = TargetCodec(CLASS_NAMES).hello()
+    hello['hello']['version'] = 99
+    with pytest.raises(ValueError):
+        TargetCodec.from_hello(hello)
@@ -0,0 +1,133 @@
+import logging
+import socket
+import threading
+from typing import List, Optional
+from serial import Serial
+from serial_driver_server import DriverStatus
+from serial_driver_utils import decode, encode
+
+
+COMMAND_SIZE = 2 # The commands are the 2 bytes written to the Arduino as they are
+MAX_AZIMUTH = 90 # The largest azimuth angle one command can hold
+
+
+def merge_commands(commands: List[bytes]) -> List[bytes]:
+    """
+    Merges commands into the newest one.
+
+    The Arduino turns the azimuth by the angle of every command, so the angles of the older commands
+    are added to the newest one instead of being dropped. The direction, speed and firing of the older
+    commands are replaced by the newest one.
+
+    Args:
+        commands: The 2 byte commands, oldest first.
+
+    Returns:
+        The newest command with the total azimuth angle, split over more commands if one can not hold it.
+    """
+    newest = decode(commands[-1])
+    remaining = sum(decode(command)['azimuth'] for command in commands)
+    merged = []
+    while True:
+        azimuth = max(-MAX_AZIMUTH, min(remaining, MAX_AZIMUTH))
+        merged.append(encode(azimuth, newest['is_clockwise'], newest['speed'], newest['is_firing']))
+        remaining -= azimuth
+        if not remaining:
+            return merged
+
+
+class BinaryCommandServer:
+    """Forwards the 2 byte commands of persistent stream connections to the serial port.
+
+    The controllers send the same bytes that are written to the Arduino, so there is no HTTP or JSON
+    to parse and no response to wait for. When several commands arrived since the last read they are
+    merged into the newest one, see `merge_commands`, so the azimuth turns by all of them.
+    """
+
+    def __init__(self, server_socket: socket.socket, serial_inst: Serial, status: Optional[DriverStatus] = None, fastest_speed: int = 10) -> None:
+        """
+        Args:
+            server_socket: The listening socket, see `create_server_socket`.
+            serial_inst: The serial port of the Arduino.
+            status: The status shared with the HTTP server to report on `GET /status`.
+            fastest_speed: The maximum elevation speed to accept.
+        """
+        self.server_socket = server_socket
+        self.serial_inst = serial_inst
+        self.status = status or DriverStatus()
+        self.fastest_speed = fastest_speed
+        self.written_count = 0
+        self.skipped_count = 0
+
+
+    def serve_forever(self) -> None:
+        """Accepts controllers until the server socket is closed, each in its own thread"""
+        while True:
+            try:
+                connection, _ = self.server_socket.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.handle, args=(connection,), daemon=True).start()
+
+
+    def handle(self, connection: socket.socket) -> None:
+        """
+        Forwards the commands of one controller until it disconnects.
+
+        Args:
+            connection: The connected stream socket of the controller.
+        """
+        buffer = b''
+        with connection:
+            while True:
+                try:
+                    data = connection.recv(4096)
+                except OSError:
+                    return
+                if not data:
+                    return
+                buffer += data
+                complete = len(buffer) - len(buffer) % COMMAND_SIZE
+                if not complete:
+                    continue
+                commands = [buffer[start:start + COMMAND_SIZE] for start in range(0, complete, COMMAND_SIZE)]
+                buffer = buffer[complete:]
+                try:
+                    merged = merge_commands(commands)
+                    with self.status.write_lock:
+                        self.skipped_count += len(commands) - len(merged)
+                        for command in merged:
+                            self.write(command)
+                except Exception as e:
+                    logging.error("An exception was thrown:" + str(e) + " " + str(type(e)))
+                    return
+
+
+    def write(self, command: bytes) -> None:
+        """
+        Writes one command to the serial port and records it on the status.
+
+        Args:
+            command: The 2 byte command.
+        """
+        values = decode(command)
+        if values['speed'] > self.fastest_speed:
+            logging.error(f"Received a speed that was outside the max({self.fastest_speed}) bound: {values['speed']}")
+            return
+        self.serial_inst.write(command)
+        self.written_count += 1
+        self.status.update({
+            'azimuth_angle': values['azimuth'],
+            'is_clockwise': values['is_clockwise'],
+            'speed': values['speed'],
+            'is_firing': values['is_firing'],
+        })
+
+
+    def shutdown(self) -> None:
+        """Stops accepting controllers"""
+        try:
+            self.server_socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.server_socket.close()
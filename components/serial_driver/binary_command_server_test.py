@@ -0,0 +1,89 @@
+import socket
+import threading
+import time
+import pytest
+
+from binary_command_server import BinaryCommandServer, merge_commands
+from serial_driver_server import DriverStatus
+from serial_driver_utils import decode, encode
+
+
+class FakeSerial:
+
+    def __init__(self, write_lock=None):
+        self.written = []
+        self.write_lock = write_lock
+
+    def write(self, data):
+        assert self.write_lock is None or self.write_lock.locked()
+        self.written.append(data)
+
+
+def wait_for(condition, timeout=2):
+    end = time.time() + timeout
+    while not condition() and time.time() < end:
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def server():
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('localhost', 0))
+    listener.listen()
+    status = DriverStatus()
+    server = BinaryCommandServer(listener, FakeSerial(status.write_lock), status=status) # Shares the lock of the serial port with the HTTP server
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+
+def test_forwards_commands_to_the_serial_port(server):
+    with socket.create_connection(server.server_socket.getsockname()) as connection:
+        connection.sendall(encode(10, True, 4, False))
+        wait_for(lambda: server.written_count == 1)
+        connection.sendall(encode(-10, False, 0, True))
+        wait_for(lambda: server.written_count == 2)
+
+    assert server.serial_inst.written == [encode(10, True, 4, False), encode(-10, False, 0, True)]
+    assert server.status.controller_state == {'azimuth_angle': -10, 'is_clockwise': False, 'speed': 0, 'is_firing': True}
+
+def test_merges_the_pending_commands_into_the_newest(server):
+    connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    connection.connect(server.server_socket.getsockname())
+    commands = [encode(azimuth, True, 1, False) for azimuth in range(5)]
+    # The last command is split, its first byte has to wait for the second one
+    connection.sendall(b''.join(commands) + encode(20, True, 1, False)[:1])
+    wait_for(lambda: server.written_count == 1)
+    connection.sendall(encode(20, True, 1, False)[1:])
+    wait_for(lambda: server.written_count == 2)
+    connection.close()
+
+    assert server.serial_inst.written == [encode(10, True, 1, False), encode(20, True, 1, False)]
+    assert server.skipped_count == 4
+
+def test_merging_keeps_the_total_azimuth_turn():
+    commands = [encode(40, True, 2, False), encode(-5, False, 3, False), encode(60, True, 1, True), encode(30, True, 4, True)]
+    merged = merge_commands(commands)
+    assert [decode(command)['azimuth'] for command in merged] == [90, 35]
+    assert all(command[1:] == commands[-1][1:] for command in merged) # The rest of the state is the newest
+    assert merge_commands([encode(0, True, 0, False)] * 3) == [encode(0, True, 0, False)]
+
+def test_turns_the_azimuth_by_every_pending_command(server):
+    connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    connection.connect(server.server_socket.getsockname())
+    commands = [encode(azimuth, True, 1, False) for azimuth in (30, -10, 45, 50, 20)]
+    connection.sendall(b''.join(commands))
+    wait_for(lambda: sum(decode(command)['azimuth'] for command in server.serial_inst.written) == 135)
+    connection.close()
+
+    assert sum(decode(command)['azimuth'] for command in server.serial_inst.written) == 135
+    assert server.written_count + server.skipped_count == len(commands)
+
+def test_rejects_speeds_above_the_fastest(server):
+    server.fastest_speed = 5
+    with socket.create_connection(server.server_socket.getsockname()) as connection:
+        connection.sendall(encode(0, True, 9, False))
+        time.sleep(0.1)
+        connection.sendall(encode(0, True, 5, False))
+        wait_for(lambda: server.written_count == 1)
+    assert server.serial_inst.written == [encode(0, True, 5, False)]
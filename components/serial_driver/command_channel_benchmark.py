@@ -0,0 +1,104 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
+
+import logging
+import tempfile
+import threading
+import time
+from argparse import ArgumentParser
+from typing import Callable, List, Tuple
+import numpy as np
+import requests
+from ai_controller.command_channel import BinaryCommandChannel, HTTPCommandChannel
+from nerf_turret_utils.socket_utils import create_http_server, create_server_socket
+from binary_command_server import BinaryCommandServer
+from serial_driver_server import DriverStatus, SerialDriverServer
+
+
+class SignallingSerial:
+    """Stands in for the serial port of the Arduino and signals every write"""
+
+    def __init__(self) -> None:
+        self.written = threading.Event()
+
+    def write(self, data: bytes) -> None:
+        self.written.set()
+
+
+class QuietSerialDriverServer(SerialDriverServer):
+    """The serial driver request handler without the access log on stderr"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+def measure(send: Callable[[dict], None], serial_inst: SignallingSerial, commands: int) -> Tuple[float, List[float]]:
+    """
+    Sends the commands one after the other, each once the previous one reached the serial port.
+
+    Returns:
+        The commands per second and the latency in seconds of each command from sending it until it was written to the serial port.
+    """
+    state = {'azimuth_angle': 1.5, 'is_clockwise': False, 'speed': 3, 'is_firing': False, 'frame_id': 1, 'capture_time': time.time()}
+    times = []
+    start = time.perf_counter()
+    for _ in range(commands):
+        serial_inst.written.clear()
+        sent = time.perf_counter()
+        send(state)
+        serial_inst.written.wait()
+        times.append(time.perf_counter() - sent)
+    return commands / (time.perf_counter() - start), times
+
+
+if __name__ == '__main__':
+
+    parser = ArgumentParser(description="Compares how many commands per second the AI controller can send to the serial driver over each command channel")
+    parser.add_argument("--commands", "-c", help="The amount of commands to send per channel", type=int, default=2000)
+    parser.add_argument("--port", "-p", help="The TCP port of the HTTP server on localhost", type=int, default=17565)
+    parser.add_argument("--binary-port", "-bp", help="The TCP port of the binary command stream on localhost", type=int, default=17566)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    socket_dir = tempfile.mkdtemp()
+    serial_inst = SignallingSerial()
+    status = DriverStatus()
+
+    http_servers = []
+    binary_servers = []
+    for host, port in (('localhost', args.port), (f'unix://{socket_dir}/serial_driver.sock', 0)):
+        server = create_http_server(host, port, lambda *a, **kwargs: QuietSerialDriverServer(
+            serial_inst=serial_inst, slowest_speed=0, fasted_speed=10, status=status, *a, **kwargs))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        http_servers.append(server)
+    for host, port in (('localhost', args.binary_port), (f'unix://{socket_dir}/serial_driver_binary.sock', 0)):
+        binary_server = BinaryCommandServer(create_server_socket(host, port), serial_inst, status=status) # type: ignore
+        threading.Thread(target=binary_server.serve_forever, daemon=True).start()
+        binary_servers.append(binary_server)
+
+    session = requests.Session()
+    channels = [
+        ('requests.post per command', 'TCP', lambda state: requests.post(f'http://localhost:{args.port}', json=state)),
+        ('requests.Session', 'TCP', lambda state: session.post(f'http://localhost:{args.port}', json=state)),
+        ('http', 'TCP', HTTPCommandChannel('localhost', args.port, keep_alive=False).send),
+        ('keep-alive', 'TCP', HTTPCommandChannel('localhost', args.port).send),
+        ('keep-alive', 'Unix', HTTPCommandChannel(f'unix://{socket_dir}/serial_driver.sock', 0).send),
+        ('binary', 'TCP', BinaryCommandChannel('localhost', args.binary_port).send),
+        ('binary', 'Unix', BinaryCommandChannel(f'unix://{socket_dir}/serial_driver_binary.sock', 0).send),
+    ]
+
+    print("| Channel | Transport | Commands/s | p50 | p99 |")
+    print("|---|---|---|---|---|")
+    for name, transport, send in channels:
+        commands = args.commands // 4 if name.startswith('requests.post') else args.commands
+        rate, times = measure(send, serial_inst, commands)
+        latencies = np.array(times) * 1e6
+        print(f"| {name} | {transport} | {rate:.0f} | {np.percentile(latencies, 50):.1f}µs | {np.percentile(latencies, 99):.1f}µs |")
+
+    for server in http_servers:
+        server.shutdown()
+        server.server_close()
+    for binary_server in binary_servers:
+        binary_server.shutdown()
@@ -2,6 +2,7 @@ import argparse
 import logging
 import os
 import sys
+import threading
 from http.server import HTTPServer
 import serial
 import serial.tools.list_ports
@@ -9,15 +10,19 @@ from typing import Optional
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)) + '/..')
 
-from serial_driver_server import SerialDriverServer
+from serial_driver_server import DriverStatus, SerialDriverServer
+from binary_command_server import BinaryCommandServer
 from serial_driver_utils import map_log_level
+from nerf_turret_utils.socket_utils import create_http_server, create_server_socket, format_address, get_unix_path
     
 
 parser = argparse.ArgumentParser()
 parser.add_argument("--set-port-man", action="store_true",dest="is_port_man", help="Set the serial port manually instead of using the default port through the command line prompt.")
 parser.add_argument("--port", help="Set the http server port.", default=5565)
 parser.add_argument("--baud", help="Set the Baud Rate of the serial communication.", default=9600)
-parser.add_argument("--host", help="Set the http server hostname.", default="localhost")
+parser.add_argument("--host", help="Set the http server hostname, or a unix:///path/to.sock address to serve on a Unix domain socket.", default="localhost")
+parser.add_argument("--binary-port", "-bp", help="Also accept the 2 byte commands as a persistent stream on this port, e.g. 5566. Disabled if not set.", default=None, type=int)
+parser.add_argument("--binary-host", "-bh", help="Set the hostname of the binary command stream, or a unix:///path/to.sock address to listen on a Unix domain socket.", default="localhost")
 parser.add_argument("--log-level", "-ll" ,help="Set the logging level by integer value.", default=logging.WARNING, type=map_log_level)
 parser.add_argument("--delay", "-d",help="Delay to rate the data is sent to the Arduino in seconds", default=0, type=int)
 
@@ -28,6 +33,7 @@ logging.basicConfig(level=args.log_level)
 logging.debug(f"\nArgs: {args}\n")
 
 webServer:Optional[HTTPServer] = None
+binaryServer:Optional[BinaryCommandServer] = None
 serialInst:Optional[serial.Serial] = None
 
 ## For the elevation stepper motor speed ordinal values
@@ -74,16 +80,29 @@ try:
     
     if __name__ == "__main__":
 
-        webServer = HTTPServer(
-            (args.host, args.port),
+        status = DriverStatus() # Shared by all requests
+        webServer = create_http_server(
+            args.host, 
+            args.port,
             lambda *args, **kwargs: SerialDriverServer(
                 serial_inst=serialInst, 
                 slowest_speed=SLOWEST_EL_SPEED, 
                 fasted_speed=FASTEST_EL_SPEED, 
+                status=status,
                 *args, **kwargs
                 ))
         
-        print("Server started http://%s:%s" % (args.host, args.port))
+        print("Server started http://%s" % format_address(args.host, args.port))
+
+        if args.binary_port is not None or get_unix_path(args.binary_host):
+            binaryServer = BinaryCommandServer(
+                create_server_socket(args.binary_host, args.binary_port or 0),
+                serialInst,
+                status=status,
+                fastest_speed=FASTEST_EL_SPEED,
+            )
+            threading.Thread(target=binaryServer.serve_forever, daemon=True).start()
+            print("Binary command stream started on %s" % format_address(args.binary_host, args.binary_port))
 
         webServer.serve_forever()
       
@@ -93,5 +112,6 @@ except Exception as e:
     print(e)
     if serialInst: serialInst.close()
     if webServer: webServer.server_close()
+    if binaryServer: binaryServer.shutdown()
     logging.error("Server stopped and Serial Port closed")
     raise e
@@ -1,15 +1,58 @@
 import logging
+import threading
 from http.server import BaseHTTPRequestHandler
+from typing import Optional
 from serial_driver_utils import encode
 from serial import Serial
+from nerf_turret_utils.data_age import AgeTracker, get_age_ms
 import time
 import json
 
+
+class DriverStatus:
+    """The latest controller state the driver forwarded to the serial port and how old its camera frame was"""
+    
+    def __init__(self) -> None:
+        # Held while writing a command to the serial port and recording it, so the 2 byte commands of
+        # concurrent HTTP requests and binary streams never interleave
+        self.write_lock = threading.Lock()
+        self.age = AgeTracker()
+        self.controller_state: Optional[dict] = None
+        self.controller_age_ms: Optional[float] = None
+        
+        
+    def update(self, controller_state: dict, now: Optional[float] = None) -> None:
+        """
+        Records a controller state that was written to the serial port.
+
+        Args:
+            controller_state: The controller state with the optional 'frame_id', 'capture_time' and 'controller_time'.
+            now: The current unix time in seconds, `time.time()` if not given.
+        """
+        self.controller_state = controller_state
+        self.age.update(controller_state.get('frame_id'), controller_state.get('capture_time'), now)
+        self.controller_age_ms = get_age_ms(controller_state.get('controller_time'), now)
+        
+        
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            The age of the latest frame as in `AgeTracker.summary`, how long ago the controller sent the latest state and the state itself.
+        """
+        return {
+            **self.age.summary(),
+            'controller_age_ms': self.controller_age_ms,
+            'controller_state': self.controller_state,
+        }
+
 class SerialDriverServer(BaseHTTPRequestHandler):
     
+    protocol_version = 'HTTP/1.1' # Keep the connection of a controller open between its commands, every response needs a Content-Length
+    
     def __init__(self, *args, **kwargs):
         keys_used = ['serial_inst', 'slowest_speed', 'fasted_speed']
         self.properties = {}
+        self.status: DriverStatus = kwargs.pop('status', None) or DriverStatus() # Shared between the requests to report on GET /status
         for key in keys_used:
             if key not in kwargs:
                 raise Exception(f"Missing required key: {key}")
@@ -21,12 +64,12 @@ class SerialDriverServer(BaseHTTPRequestHandler):
 
         
     def do_GET(self):
-        # Send a response
-        self.send_response(200)
-        self.end_headers()
+        if self.path == '/status':
+            self.respond(200, json.dumps(self.status.to_dict()).encode(), 'application/json')
+            return
         
         # Send the response data
-        self.wfile.write(b"""
+        self.respond(200, b"""
                             Send a POST request to this endpoint with JSON data with the key 'speed' and a value between speed min 0 and max 10.
                             The json can also have a key of 'isClockwise' with a value of true or false for the direction of the motor.
                             """)
@@ -50,11 +93,8 @@ class SerialDriverServer(BaseHTTPRequestHandler):
         serial_inst: Serial = self.properties.get('serial_inst')# type: ignore
         
         if speed_in and (speed_in < slowest_speed or speed_in > self.properties.get('fasted_speed')):
-                # Send a response
-                self.send_response(400)
-                self.end_headers()
                 # Send the bad request data
-                self.wfile.write(f"""
+                self.respond(400, f"""
                 Received a speed that was outside the min({slowest_speed}) max({fasted_speed}) bounds: {speed_in}
                 """.encode())
                 return
@@ -66,21 +106,28 @@ class SerialDriverServer(BaseHTTPRequestHandler):
         logging.debug("Encoded Message HEX: " + str(encoded_message) + "  BINARY: " + str(bin(encoded_message[0])) + " " + str(bin(encoded_message[1])))
         try:
 
-            serial_inst.write(encoded_message)
+            with self.status.write_lock:
+                serial_inst.write(encoded_message)
+                self.status.update(json_data)
+            logging.debug(f"Frame {self.status.age.frame_id} is {self.status.age.age_ms}ms old when forwarded")
             # # Send a response
-            self.send_response(200)
-            self.end_headers()
+            self.respond(200)
             
         except Exception as e:
             logging.error("An exception was thrown:" + str(e) + " " + str(type(e)))
             if serial_inst: serial_inst.close()
             logging.error("SerialDriverServer stopped and Serial Port closed")
-            self.send_response(500)
-            self.end_headers()
+            self.respond(500)
         finally: 
             # Record the time taken to process the frame
             logging.debug("Frame processed in " + str(time.time() - start_time) + " seconds")
 
 
-        
-        
+    def respond(self, code: int, body: bytes = b'', content_type: Optional[str] = None) -> None:
+        """Sends a response with its Content-Length, so the connection can be reused for the next request"""
+        self.send_response(code)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
@@ -0,0 +1,80 @@
+import json
+import threading
+from http.client import HTTPConnection
+from http.server import HTTPServer
+import pytest
+
+from serial_driver_server import DriverStatus, SerialDriverServer
+
+
+class FakeSerial:
+
+    def __init__(self, write_lock=None):
+        self.written = []
+        self.write_lock = write_lock
+
+    def write(self, data):
+        assert self.write_lock is None or self.write_lock.locked()
+        self.written.append(data)
+
+
+def test_status_tracks_the_frame_age():
+    status = DriverStatus()
+    status.update({'speed': 0, 'frame_id': 3, 'capture_time': 10.0, 'controller_time': 10.05}, now=10.1)
+
+    result = status.to_dict()
+    assert result['frame_id'] == 3
+    assert result['age_ms'] == pytest.approx(100)
+    assert result['controller_age_ms'] == pytest.approx(50)
+    assert result['controller_state']['speed'] == 0
+
+def test_status_without_timestamps():
+    status = DriverStatus()
+    status.update({'speed': 0})
+    assert status.to_dict()['age_ms'] is None
+
+
+def test_get_status_after_post():
+    status = DriverStatus()
+    serial_inst = FakeSerial(status.write_lock) # The binary command server writes to the same port
+    server = HTTPServer(('localhost', 0), lambda *args, **kwargs: SerialDriverServer(
+        serial_inst=serial_inst, slowest_speed=0, fasted_speed=10, status=status, *args, **kwargs))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    connection = HTTPConnection('localhost', server.server_address[1], timeout=2)
+    state = {'azimuth_angle': 2, 'is_clockwise': True, 'speed': 3, 'is_firing': False, 'frame_id': 9, 'capture_time': 1.0}
+    connection.request('POST', '/', body=json.dumps(state))
+    assert connection.getresponse().status == 200
+    connection.close()
+
+    connection = HTTPConnection('localhost', server.server_address[1], timeout=2)
+    connection.request('GET', '/status')
+    result = json.loads(connection.getresponse().read())
+    connection.close()
+    server.shutdown()
+    server.server_close()
+
+    assert len(serial_inst.written) == 1
+    assert result['frame_id'] == 9
+    assert result['age_ms'] > 0
+
+def test_keeps_the_connection_alive_between_posts():
+    serial_inst = FakeSerial()
+    server = HTTPServer(('localhost', 0), lambda *args, **kwargs: SerialDriverServer(
+        serial_inst=serial_inst, slowest_speed=0, fasted_speed=10, *args, **kwargs))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    connection = HTTPConnection('localhost', server.server_address[1], timeout=2)
+    for speed in (1, 2, 11):
+        connection.request('POST', '/', body=json.dumps({'speed': speed, 'is_firing': False}))
+        response = connection.getresponse()
+        response.read()
+        assert not response.will_close
+    connection.close()
+    server.shutdown()
+    server.server_close()
+
+    assert response.status == 400
+    assert len(serial_inst.written) == 2